@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Batch analysis benchmark: throughput of python -m storyloom.batch over an
+archive of .story files at 1, 2, 4 and 8 worker processes
+
+Run: python benchmarks/bench_batch.py [projects] [words]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import make_project
+from storyloom.batch import find_projects, run_batch
+from storyloom.services.project_service import ProjectService
+
+
+def main():
+    projects = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    words = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    print("=" * 60)
+    print(f"Batch analysis benchmark ({projects} projects of {words:,} words, {os.cpu_count()} CPUs)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        for i in range(projects):
+            project = make_project(words, characters=200, locations=50, scenes=0, seed=i)
+            project.file_path = os.path.join(tmp, f"book{i}.story")
+            service.save_project(project)
+        paths = find_projects(tmp)
+
+        base = None
+        for workers in (1, 2, 4, 8):
+            output = os.path.join(tmp, f"results{workers}.jsonl")
+            t0 = time.perf_counter()
+            run_batch(paths, output, workers, resume=False)
+            elapsed = time.perf_counter() - t0
+            base = base or elapsed
+            print(f"  {workers} worker(s): {elapsed:6.2f} s  {projects / elapsed:6.1f} files/s  "
+                  f"speedup {base / elapsed:4.2f}x")
+
+
+if __name__ == "__main__":
+    main()
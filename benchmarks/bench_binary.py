@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Binary container vs JSON .story: save/load time and file size
+
+Run: python benchmarks/bench_binary.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import make_project
+from storyloom.services.project_service import ProjectService
+from storyloom.storage.binary_format import read_binary_metadata
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    print("=" * 60)
+    print("Binary vs JSON benchmark (500k words, 20k entities)")
+    print("=" * 60)
+
+    project = make_project(words=500_000, characters=10_000, locations=5_000, scenes=5_000)
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        paths = {
+            'json pretty': os.path.join(tmp, "bench_pretty.story"),
+            'json compact': os.path.join(tmp, "bench.story"),
+            'binary': os.path.join(tmp, "bench.storyb"),
+        }
+        for label, path in paths.items():
+            save = timed(lambda: service.export_project(path, project, pretty=label == 'json pretty'))
+            load = timed(lambda: service._read_project(path))
+            size = os.path.getsize(path) / 1e6
+            print(f"  {label:<13} save {save:8.1f} ms   load {load:8.1f} ms   {size:6.1f} MB")
+
+        meta = timed(lambda: read_binary_metadata(paths['binary']), repeat=20)
+        print(f"  binary header only:              {meta:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Co-occurrence benchmark: full build over 1M words, re-analysis after
+editing one scene or adding a character, and reopening a saved project
+with its counts
+
+Run: python benchmarks/bench_cooccurrence.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import NAMES, PLACES, make_text
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+from storyloom.models.project import Project
+from storyloom.models.scene import Scene
+from storyloom.services.cooccurrence import PARAGRAPH, SCENE, CooccurrenceBuilder
+from storyloom.services.mention_index import MentionIndex
+from storyloom.services.project_service import ProjectService
+
+
+def make_story(words: int, scenes: int) -> Project:
+    text = make_text(words)
+    step = len(text) // scenes
+    project = Project(title="Co-occurrence")
+    project.characters = [Character(name=name) for name in NAMES]
+    project.locations = [Location(name=name) for name in PLACES]
+    project.scenes = [Scene(title=f"Scene {i}", content=text[i * step:(i + 1) * step]) for i in range(scenes)]
+    return project
+
+
+def main():
+    print("=" * 60)
+    print("Co-occurrence benchmark (1M words, 1,000 scenes)")
+    print("=" * 60)
+
+    project = make_story(1_000_000, 1_000)
+    index = MentionIndex()
+    index.sync(project)
+
+    for window in (PARAGRAPH, SCENE, 50):
+        builder = CooccurrenceBuilder(index, window=window)
+        start = time.perf_counter()
+        builder.build(project)
+        built = time.perf_counter()
+
+        scene = project.scenes[500]
+        original = scene.content
+        scene.content = original + " Frodo and Gandalf reached Bree."
+        builder.build(project)
+        updated = time.perf_counter()
+        scene.content = original
+        builder.build(project)
+
+        # A newly detected character, mentioned in one scene only
+        scene.content = original + " Tom Bombadil sang."
+        builder.build(project)
+        recounts = builder.recounts
+        index.add("bombadil", "Tom Bombadil")
+        added = time.perf_counter()
+        builder.build(project)
+        rebuilt = time.perf_counter()
+        recounts = builder.recounts - recounts
+        index.remove("bombadil")
+        scene.content = original
+        builder.build(project)
+
+        print(f"  window {str(window):>9}: full build {(built - start) * 1000:7.0f} ms   "
+              f"one scene edited {(updated - built) * 1000:6.1f} ms   "
+              f"character added {(rebuilt - added) * 1000:6.1f} ms "
+              f"({recounts} recounted, {builder.graph.edge_count} edges)")
+
+    print()
+    print("Reopen after save (paragraph window)")
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        service.current_project = project
+        project.file_path = os.path.join(tmp, "cooccurrence.story")
+        service.set_cooccurrence_window(PARAGRAPH)
+        service.build_relationships()
+        service.save_project(force=True)
+
+        for lazy in (False, True):
+            reopened = ProjectService(tmp)
+            start = time.perf_counter()
+            reopened.open_project(project.file_path, lazy=lazy)
+            opened = time.perf_counter()
+            reopened.build_relationships()
+            built = time.perf_counter()
+            print(f"  lazy={lazy!s:5}: open {(opened - start) * 1000:6.0f} ms   "
+                  f"relationships {(built - opened) * 1000:6.1f} ms   "
+                  f"({reopened.cooccurrence.recounts} units re-analyzed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Character detection benchmark: detect_characters_in_text on a 2M-word
+manuscript, serially and split at paragraph boundaries across 1, 2, 4 and
+8 worker processes
+
+Run: python benchmarks/bench_detection.py [words]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import make_text
+from storyloom.services import project_service as project_service_module
+from storyloom.services.project_service import ProjectService
+
+
+def main():
+    words = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    text = make_text(words)
+    print("=" * 60)
+    print(f"Character detection benchmark ({words:,} words, {len(text) / 1e6:.1f} MB, "
+          f"{os.cpu_count()} CPUs)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        service.create_project("Detection")
+
+        def timed(workers):
+            times = []
+            for _ in range(3):
+                t0 = time.perf_counter()
+                names = [c.name for c in service.detect_characters_in_text(text, workers=workers)]
+                times.append(time.perf_counter() - t0)
+            return statistics.median(times), names
+
+        serial, expected = timed(1)
+        print(f"  1 worker(s): {serial * 1000:7.0f} ms  ({len(expected)} names, serial scan)")
+        project_service_module.PARALLEL_DETECTION_MIN = 0
+        for workers in (2, 4, 8):
+            elapsed, names = timed(workers)
+            assert names == expected
+            print(f"  {workers} worker(s): {elapsed * 1000:7.0f} ms  speedup {serial / elapsed:4.2f}x")
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
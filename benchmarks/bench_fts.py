@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+FTS5 search benchmark: database save with the sync triggers, then search
+on a lazily opened project (no bodies loaded) vs the in-memory index
+
+Run: python benchmarks/bench_fts.py
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import make_project
+from storyloom.services.project_service import ProjectService
+
+QUERIES = ["storm", "galadriel", "storm gandalf", '"the forest"', "rem*", "dragon"]
+
+
+def median_ms(fn, repeat: int = 20) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000
+
+
+def main():
+    print("=" * 60)
+    print("FTS5 search benchmark (1M words, 1,000 scenes)")
+    print("=" * 60)
+
+    project = make_project(1_000_000, characters=2_000, locations=2_000, scenes=1_000)
+    project.content = ""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search.storydb")
+        service = ProjectService(tmp)
+        t0 = time.perf_counter()
+        service.export_project(path, project)
+        print(f"  save to database (FTS kept in sync by triggers): {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+        lazy = ProjectService(tmp)
+        lazy.open_project(path, lazy=True)
+        memory = ProjectService(tmp)
+        memory.open_project(path)
+        memory.current_project.mark_clean()
+        memory.current_project.file_path = ""  # force the in-memory index
+        t0 = time.perf_counter()
+        memory.search("warmup")
+        print(f"  in-memory index build: {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+        print()
+        print(f"  {'query':<18} {'FTS5 (lazy)':>12} {'in-memory':>12}")
+        for query in QUERIES:
+            fts = median_ms(lambda: lazy.search(query))
+            mem = median_ms(lambda: memory.search(query))
+            print(f"  {query:<18} {fts:9.2f} ms {mem:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
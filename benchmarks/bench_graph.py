@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+StoryGraph benchmark suite: 100k nodes, 1M edges
+
+Run: python benchmarks/bench_graph.py [nodes] [edges]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import fixtures  # noqa: F401  (puts storyloom on the path)
+from storyloom.graph.story_graph import StoryGraph
+
+
+def timed(label: str, fn, per: int = 1):
+    """Run fn once and report the time per ``per`` operations"""
+    start = time.perf_counter()
+    result = fn()
+    elapsed = (time.perf_counter() - start) / per
+    unit, scale = ("ms", 1000) if elapsed < 10 else ("s", 1)
+    print(f"  {label:<34} {elapsed * scale:10.2f} {unit}")
+    return result
+
+
+def rss_mb() -> float:
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return float('nan')
+
+
+def main():
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    edges = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    print("=" * 60)
+    print(f"StoryGraph benchmark ({nodes:,} nodes, {edges:,} edges)")
+    print("=" * 60)
+
+    rng = random.Random(0)
+    ids = [f"entity-{i}" for i in range(nodes)]
+    types = ["co_occurs", "visits", "rival"]
+    pairs = [(rng.randrange(nodes), rng.randrange(nodes)) for _ in range(edges)]
+    pairs = [(ids[a], ids[b], types[(a + b) % 3]) for a, b in pairs if a != b]
+
+    graph = StoryGraph()
+    before = rss_mb()
+
+    def build():
+        for a, b, t in pairs:
+            graph.add_weight(a, b, t)
+
+    timed(f"build ({len(pairs):,} add_weight calls)", build)
+    print(f"  {'edges after dedup':<34} {graph.edge_count:10,}")
+    print(f"  {'peak RSS growth':<34} {rss_mb() - before:10.0f} MB")
+
+    queries = [(ids[rng.randrange(nodes)], ids[rng.randrange(nodes)]) for _ in range(100)]
+    timed("shortest_path (avg of 100)", lambda: [graph.shortest_path(a, b) for a, b in queries], 100)
+    timed("shortest_path typed (avg of 10)",
+          lambda: [graph.shortest_path(a, b, "visits") for a, b in queries[:10]], 10)
+    timed("neighborhood k=2 (avg of 100)", lambda: [graph.neighborhood(a, 2) for a, _ in queries], 100)
+    timed("has_edge (100k lookups)", lambda: [graph.has_edge(a, b) for a, b in queries * 1000])
+    timed("connected_components", graph.connected_components)
+    timed("degree_centrality", graph.degree_centrality)
+    timed("remove 10k edges", lambda: [graph.remove_edge(a, b) for a, b, _ in pairs[:10_000]])
+    timed("remove 1k nodes", lambda: [graph.remove_node(i) for i in ids[:1_000]])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Undo history benchmark: memory held per undo step while editing a 5 MB
+manuscript - single keystrokes, coalesced typing, 10 KB pastes and
+character edits - measured with tracemalloc against the 5 MB a full copy
+of the content per step would cost
+
+Run: python benchmarks/bench_history.py [megabytes]
+"""
+
+import dataclasses
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import make_text
+from storyloom.models.character import Character
+from storyloom.services.project_service import ProjectService
+
+
+def measure(service, label, steps, action):
+    """Run action steps times and report the history's growth per step"""
+    service.history.reset()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    for i in range(steps):
+        action(i)
+    elapsed = time.perf_counter() - t0
+    # Keep only what the history holds: the content itself is joined from the rope on demand
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    count = len(service.history)
+    print(f"  {label:<28} {count:6,} steps  {held / max(count, 1):9,.0f} B/step measured"
+          f"  {service.history.size / max(count, 1):9,.0f} B/step estimated  {elapsed / steps * 1e6:6.0f} us/edit")
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    text = make_text(int(megabytes * 1e6) // 5)
+    text = (text * (int(megabytes * 1e6) // len(text) + 1))[:int(megabytes * 1e6)]
+    rng = random.Random(0)
+
+    print("=" * 60)
+    print(f"Undo history benchmark ({len(text) / 1e6:.1f} MB manuscript; "
+          f"a full copy per step would be {len(text):,} B/step)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = service.create_project("History")
+        service.update_project_content(text)
+        service.update_project_content(edits=[(0, 0, " ")])
+
+        def keystroke(i):
+            position = rng.randrange(min(1_000_000, len(text)))
+            service.update_project_content(edits=[(position, position, "x")])
+
+        service.history.coalesce_seconds = 0
+        measure(service, "single keystrokes", 10_000, keystroke)
+
+        service.history.coalesce_seconds = 60
+        start = 1_000
+        measure(service, "typing (coalesced)", 10_000,
+                lambda i: service.update_project_content(edits=[(start + i, start + i, "y")]))
+
+        service.history.coalesce_seconds = 0
+        paste = make_text(2_000, seed=1)[:10_000]
+        stride = len(text) // 100
+        measure(service, "10 KB pastes", 100,
+                lambda i: service.update_project_content(edits=[(i * stride, i * stride, paste)]))
+
+        characters = [Character(name=f"Character {i}", description="A " * 200) for i in range(1_000)]
+        for character in characters:
+            service.add_character(character)
+
+        def rename(i):
+            character = dataclasses.replace(characters[i % len(characters)], name=f"Renamed {i}")
+            characters[i % len(characters)] = character
+            service.update_character(character)
+
+        measure(service, "character renames", 1_000, rename)
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
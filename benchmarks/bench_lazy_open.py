@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Open benchmark: eager vs lazy body loading (time to first interactive, peak RSS)
+
+Each measurement runs in a fresh process so peak RSS is not shared.
+Run: python benchmarks/bench_lazy_open.py [megabytes]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'storyloom_core'))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    if resource is None:
+        return float('nan')
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+
+
+def generate(path: str, megabytes: int) -> None:
+    from fixtures import make_project
+    from storyloom.services.project_service import ProjectService
+
+    words = megabytes * 1024 * 1024 // 6
+    project = make_project(words=words, characters=500, locations=200, scenes=2_000)
+    project.content = project.content[:200_000]
+    project.file_path = path
+    ProjectService(os.path.dirname(path)).save_project(project)
+
+
+def measure(path: str, mode: str) -> None:
+    from storyloom.services.project_service import ProjectService
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    service = ProjectService(os.path.dirname(path))
+    project = service.open_project(path, lazy=(mode == "lazy"))
+    titles = [s.title for s in project.scenes]
+    first = project.scenes[0].content
+    interactive = time.perf_counter() - start
+    print(f"  {mode:5} {os.path.splitext(path)[1]:9} first interactive {interactive * 1000:8.1f} ms | "
+          f"peak RSS {peak_rss_mb():7.1f} MB (interpreter {baseline:.1f} MB) | "
+          f"{len(titles)} scenes, first body {len(first)} chars")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        {"generate": lambda: generate(sys.argv[3], int(sys.argv[4])),
+         "measure": lambda: measure(sys.argv[3], sys.argv[4])}[sys.argv[2]]()
+        return
+
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    print("=" * 60)
+    print(f"Lazy open benchmark ({megabytes} MB of scene bodies)")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("serial.story", "serial.storydb"):
+            path = os.path.join(tmp, name)
+            subprocess.run([sys.executable, __file__, "--child", "generate", path, str(megabytes)], check=True)
+            print(f"\n{name}: {os.path.getsize(path) / 1e6:.0f} MB on disk")
+            for mode in ("eager", "lazy"):
+                subprocess.run([sys.executable, __file__, "--child", "measure", path, mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Memory of 100k entities: slotted models vs the previous plain dataclasses
+
+Run: python benchmarks/bench_model_memory.py
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import fixtures  # noqa: F401  (puts storyloom on the path)
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+from storyloom.models.relationship import Relationship
+from storyloom.models.scene import Scene
+
+N = 100_000
+
+
+# The models as they were before __slots__, for comparison
+_MISSING = object()
+
+
+class DictTracked:
+    _dirty = True
+
+    def __setattr__(self, name, value):
+        if not name.startswith('_'):
+            old = self.__dict__.get(name, _MISSING)
+            if old is not value and old != value:
+                object.__setattr__(self, '_dirty', True)
+        super().__setattr__(name, value)
+
+
+@dataclass
+class PlainCharacter(DictTracked):
+    id: str = field(default_factory=lambda: str(uuid4()))
+    name: str = ""
+    role: str = ""
+    description: str = ""
+    goals: List[str] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.now)
+    updated_at: datetime = field(default_factory=datetime.now)
+
+
+@dataclass
+class PlainLocation(DictTracked):
+    id: str = field(default_factory=lambda: str(uuid4()))
+    name: str = ""
+    type: str = ""
+    description: str = ""
+    created_at: datetime = field(default_factory=datetime.now)
+    updated_at: datetime = field(default_factory=datetime.now)
+
+
+@dataclass
+class PlainScene(DictTracked):
+    id: str = field(default_factory=lambda: str(uuid4()))
+    title: str = ""
+    summary: str = ""
+    content: str = ""
+    character_ids: List[str] = field(default_factory=list)
+    location_id: Optional[str] = None
+    order_index: int = 0
+    created_at: datetime = field(default_factory=datetime.now)
+    updated_at: datetime = field(default_factory=datetime.now)
+
+
+@dataclass
+class PlainRelationship:
+    id: str = field(default_factory=lambda: str(uuid4()))
+    source_id: str = ""
+    target_id: str = ""
+    type: str = ""
+    description: str = ""
+    created_at: datetime = field(default_factory=datetime.now)
+    updated_at: datetime = field(default_factory=datetime.now)
+
+
+def measure(build) -> float:
+    """MB retained by the result of build()"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained / 1e6
+
+
+def main():
+    print("=" * 60)
+    print(f"Model memory benchmark ({N:,} entities each)")
+    print("=" * 60)
+
+    # Ids as they arrive from a file: a fresh string object per reference
+    ids = [str(uuid4()) for _ in range(1_000)]
+
+    def ref(i: int) -> str:
+        return ids[i % len(ids)].encode().decode()
+
+    cases = [
+        ("characters", lambda: [PlainCharacter(name=f"Name {i}", role="extra") for i in range(N)],
+         lambda: [Character(name=f"Name {i}", role="extra") for i in range(N)]),
+        ("locations", lambda: [PlainLocation(name=f"Place {i}") for i in range(N)],
+         lambda: [Location(name=f"Place {i}") for i in range(N)]),
+        ("scenes (3 refs)",
+         lambda: [PlainScene(title=f"Scene {i}", character_ids=[ref(i), ref(i + 1), ref(i + 2)])
+                  for i in range(N)],
+         lambda: [Scene(title=f"Scene {i}", character_ids=[ref(i), ref(i + 1), ref(i + 2)])
+                  for i in range(N)]),
+        ("relationships",
+         lambda: [PlainRelationship(source_id=ref(i), target_id=ref(i * 7)) for i in range(N)],
+         lambda: [Relationship(source_id=ref(i), target_id=ref(i * 7)) for i in range(N)]),
+    ]
+
+    for label, plain, slotted in cases:
+        before = measure(plain)
+        after = measure(slotted)
+        print(f"  {label:<16} dataclass {before:7.1f} MB   slotted {after:7.1f} MB   "
+              f"({100 * (1 - after / before):.0f}% less)", flush=True)
+
+
+if __name__ == "__main__":
+    main()
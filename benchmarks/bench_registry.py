@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for EntityRegistry lookups versus the old linear list scans
+
+Run: python benchmarks/bench_registry.py
+"""
+
+import sys
+import os
+import timeit
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'storyloom_core'))
+
+from storyloom.models.character import Character
+from storyloom.models.registry import EntityRegistry
+
+LOOKUPS = 2000
+
+
+def per_op_us(stmt, number: int) -> float:
+    return timeit.timeit(stmt, number=number) / number * 1e6
+
+
+def bench(size: int) -> None:
+    characters = [Character(name=f"Name {i}") for i in range(size)]
+    registry = EntityRegistry(characters)
+    probe = characters[size // 2]
+
+    scan_name = per_op_us(lambda: any(c.name == probe.name for c in characters), 20)
+    scan_id = per_op_us(lambda: next(c for c in characters if c.id == probe.id), 20)
+    by_name = per_op_us(lambda: registry.has_name(probe.name), LOOKUPS)
+    by_id = per_op_us(lambda: registry.get(probe.id), LOOKUPS)
+
+    def rename():
+        probe.name = "Renamed" if probe.name != "Renamed" else f"Name {size // 2}"
+        registry.reindex(probe)
+
+    reindex = per_op_us(rename, LOOKUPS)
+
+    print(f"\n{size:,} entities")
+    print(f"  name lookup:  list scan {scan_name:10.1f} us | registry {by_name:6.2f} us")
+    print(f"  id lookup:    list scan {scan_id:10.1f} us | registry {by_id:6.2f} us")
+    print(f"  rename + reindex:                    {reindex:6.2f} us")
+
+
+def main():
+    print("=" * 60)
+    print("EntityRegistry lookup benchmark")
+    print("=" * 60)
+    for size in (10_000, 100_000):
+        bench(size)
+
+
+if __name__ == "__main__":
+    main()
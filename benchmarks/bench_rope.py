@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Text buffer benchmark: 10k random edits (typing-sized inserts and deletes)
+on a 5 MB manuscript, as str slicing (what replacing Project.content
+wholesale costs) versus Rope edits and update_project_content(edits=...)
+
+Run: python benchmarks/bench_rope.py [megabytes] [edits]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import make_text
+from storyloom.services.project_service import ProjectService
+from storyloom.storage.rope import Rope
+
+
+def make_edits(length: int, count: int, seed: int = 0):
+    """Random (start, end, text) edits, each valid for the text the earlier ones produce"""
+    rng = random.Random(seed)
+    edits = []
+    for _ in range(count):
+        start = rng.randrange(length + 1)
+        if rng.random() < 0.7:
+            text = "".join(rng.choice("abcdefgh ") for _ in range(rng.randint(1, 10)))
+            edits.append((start, start, text))
+        else:
+            end = min(start + rng.randint(1, 10), length)
+            text = ""
+            edits.append((start, end, text))
+        length += len(text) - (edits[-1][1] - start)
+    return edits
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    text = make_text(int(megabytes * 1e6) // 5)
+    text = (text * (int(megabytes * 1e6) // len(text) + 1))[:int(megabytes * 1e6)]
+    edits = make_edits(len(text), count)
+
+    print("=" * 60)
+    print(f"Text buffer benchmark ({len(text) / 1e6:.1f} MB, {count:,} random edits)")
+    print("=" * 60)
+
+    t0 = time.perf_counter()
+    expected = text
+    for start, end, insert in edits:
+        expected = expected[:start] + insert + expected[end:]
+    str_time = time.perf_counter() - t0
+    print(f"  str slicing:            {str_time * 1000:8.0f} ms  ({str_time / count * 1e6:7.1f} us/edit)")
+
+    t0 = time.perf_counter()
+    rope = Rope(text)
+    build_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for start, end, insert in edits:
+        rope = rope.replace(start, end, insert)
+    rope_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    joined = str(rope)
+    join_time = time.perf_counter() - t0
+    assert joined == expected
+    print(f"  Rope.replace:           {rope_time * 1000:8.0f} ms  ({rope_time / count * 1e6:7.1f} us/edit)"
+          f"  speedup {str_time / rope_time:5.1f}x")
+    print(f"    (build {build_time * 1000:.0f} ms once, join to str {join_time * 1000:.0f} ms per read)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = service.create_project("Rope")
+        service.update_project_content(text)
+        t0 = time.perf_counter()
+        for edit in edits:
+            service.update_project_content(edits=[edit])
+        service_time = time.perf_counter() - t0
+        assert project.content == expected
+        print(f"  update_project_content: {service_time * 1000:8.0f} ms  ({service_time / count * 1e6:7.1f} us/edit)"
+              f"  speedup {str_time / service_time:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Save-time benchmark: 500k-word project with 5k entities
+
+Run: python benchmarks/bench_save.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import make_project
+from storyloom.services.project_service import ProjectService
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    print("=" * 60)
+    print("Save benchmark (500k words, 5k entities)")
+    print("=" * 60)
+
+    project = make_project(words=500_000, characters=2_000, locations=2_000, scenes=1_000)
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        service.current_project = project
+        project.file_path = os.path.join(tmp, "bench.story")
+
+        def legacy_save():
+            data = service._serialize_project(project)
+            with open(project.file_path, 'w') as f:
+                json.dump(data, f, indent=2, default=str)
+
+        legacy = timed(legacy_save)
+        size_pretty = os.path.getsize(project.file_path)
+        pretty = timed(lambda: service.save_project(force=True, pretty=True))
+        compact = timed(lambda: service.save_project(force=True))
+        size_compact = os.path.getsize(project.file_path)
+        unchanged = timed(lambda: service.save_project(), repeat=20)
+
+        def edit_and_save():
+            project.characters[0].role = "hero" if project.characters[0].role != "hero" else "extra"
+            service.save_project()
+
+        one_edit = timed(edit_and_save)
+
+    print(f"  legacy json.dump(indent=2):   {legacy:8.1f} ms  ({size_pretty / 1e6:.1f} MB)")
+    print(f"  atomic pretty:                {pretty:8.1f} ms")
+    print(f"  atomic compact:               {compact:8.1f} ms  ({size_compact / 1e6:.1f} MB)")
+    print(f"  unchanged (skipped):          {unchanged:8.3f} ms")
+    print(f"  one character edited:         {one_edit:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Scene detection benchmark: splitting and analysing a 1M-word manuscript
+(60 chapters of 3 scenes), then typing into it, inserting a scene break
+and renaming a character - each followed by detect_scenes()
+
+Run: python benchmarks/bench_scenes.py [words]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import NAMES, PLACES, make_text
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+from storyloom.services.project_service import ProjectService
+
+
+def make_manuscript(words: int, chapters: int = 60, scenes: int = 3) -> str:
+    parts = []
+    per_scene = words // (chapters * scenes)
+    for chapter in range(chapters):
+        parts.append(f"Chapter {chapter + 1}\n\n")
+        for scene in range(scenes):
+            if scene:
+                parts.append("\n* * *\n\n")
+            parts.append(make_text(per_scene, seed=chapter * scenes + scene))
+        parts.append("\n\n\n")
+    return "".join(parts)
+
+
+def main():
+    words = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    text = make_manuscript(words)
+    rng = random.Random(0)
+
+    print("=" * 60)
+    print(f"Scene detection benchmark ({words:,} words, {len(text) / 1e6:.1f} MB)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        service.create_project("Scenes")
+        for name in NAMES:
+            service.add_character(Character(name=name))
+        for name in PLACES:
+            service.add_location(Location(name=name))
+        service.update_project_content(text)
+
+        t0 = time.perf_counter()
+        scenes = service.detect_scenes()
+        full = time.perf_counter() - t0
+        print(f"  first detect_scenes:     {full * 1000:8.0f} ms  ({len(scenes)} scenes)")
+
+        segmenter = service.scene_segmenter
+        edits, t_edit, t_detect = 2_000, 0.0, 0.0
+        rescanned = segmenter.rescanned
+        for i in range(edits):
+            position = rng.randrange(len(text))
+            t0 = time.perf_counter()
+            service.update_project_content(edits=[(position, position, "x")])
+            t1 = time.perf_counter()
+            if i % 100 == 0:
+                service.detect_scenes()
+            t_detect += time.perf_counter() - t1
+            t_edit += t1 - t0
+        print(f"  keystroke (edit + resegment): {t_edit / edits * 1e6:5.0f} us/edit  "
+              f"({(segmenter.rescanned - rescanned) / edits:.1f} scenes changed per edit)")
+        print(f"  detect_scenes every 100 keystrokes: {t_detect / (edits / 100) * 1000:6.1f} ms")
+
+        service.detect_scenes()
+        middle = scenes[len(scenes) // 2].start
+        t0 = time.perf_counter()
+        service.update_project_content(edits=[(middle, middle, "Frodo left.\n\n***\n\n")])
+        count = len(service.detect_scenes())
+        print(f"  scene break inserted:    {(time.perf_counter() - t0) * 1000:8.1f} ms  ({count} scenes)")
+
+        frodo = service.find_character("Frodo")
+        frodo.name = "Mr. Frodo"
+        service.update_character(frodo)
+        t0 = time.perf_counter()
+        service.detect_scenes()
+        print(f"  character renamed:       {(time.perf_counter() - t0) * 1000:8.0f} ms  (mentioned in every scene)")
+
+        t0 = time.perf_counter()
+        segmenter.reset(service.current_project.content)
+        segmenter.scenes()
+        print(f"  whole text resegmented:  {(time.perf_counter() - t0) * 1000:8.0f} ms  (analyses reused)")
+
+
+if __name__ == "__main__":
+    main()
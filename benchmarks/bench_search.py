@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Full-text search benchmark: index build time, query latency and
+re-indexing after edits on a 1M-word project whose manuscript lives in
+Project.content (the editor's layout), with 1,000 scenes alongside
+
+Run: python benchmarks/bench_search.py
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import make_project
+from storyloom.services.project_service import ProjectService
+from storyloom.services.search_index import SearchIndex
+
+QUERIES = [
+    "storm",                    # common term
+    "galadriel",                # name
+    "storm gandalf",            # two terms
+    '"the forest"',             # phrase of common words
+    '"whispered the storm"',    # three-word phrase
+    "rem*",                     # prefix
+    "w* rivendell",             # broad prefix plus a term
+    "dragon",                   # no match
+]
+
+
+def main():
+    print("=" * 60)
+    print("Full-text search benchmark (1M words, 1,000 scenes)")
+    print("=" * 60)
+
+    project = make_project(1_000_000, characters=2_000, locations=2_000, scenes=1_000)
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.sync(project)
+    build = time.perf_counter() - start
+    print(f"  build: {build * 1000:.0f} ms for {len(index)} fields "
+          f"({len(project.content) / 1e6:.1f} MB manuscript in Project.content)")
+
+    print()
+    print("  query latency (median of 20, top 20 hits)")
+    for query in QUERIES:
+        times = []
+        for _ in range(20):
+            t0 = time.perf_counter()
+            hits = index.search(query)
+            times.append(time.perf_counter() - t0)
+        print(f"    {query:<24} {statistics.median(times) * 1000:7.2f} ms   ({len(hits)} hits)")
+
+    print()
+    times = []
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        service.current_project = project
+        service.search_index = index
+        for i in range(20):
+            middle = len(project.content) // 2 + i * 1000
+            project.content = project.content[:middle] + "x" + project.content[middle:]
+            t0 = time.perf_counter()
+            service.search("storm gandalf")
+            times.append(time.perf_counter() - t0)
+    print(f"  one-character manuscript edit, then search: {statistics.median(times) * 1000:.1f} ms (median of 20)")
+
+    scene = project.scenes[500]
+    scene.content += " The dragon woke."
+    t0 = time.perf_counter()
+    updated = index.sync(project)
+    print(f"  re-sync after editing one scene: {(time.perf_counter() - t0) * 1000:.1f} ms "
+          f"({updated} field re-indexed)")
+
+
+if __name__ == "__main__":
+    main()
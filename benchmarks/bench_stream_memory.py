@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Peak memory of streamed .story saves and loads versus whole-document json
+
+Save overhead is the traced peak above the project itself; load overhead is
+the peak minus what the loaded project retains. Streaming should stay flat
+as the scene count grows, while json.dumps/json.load grow with the file.
+
+Run: python benchmarks/bench_stream_memory.py
+"""
+
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import make_project
+from storyloom.services.project_service import ProjectService
+
+
+def overhead(fn):
+    """(peak - retained) bytes allocated while running fn, and its result"""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - retained, result
+
+
+def main():
+    print("=" * 60)
+    print("Streaming .story memory benchmark (500 words per scene)")
+    print("=" * 60)
+    print(f"  {'scenes':>7} {'MB':>6} | {'dumps save':>10} {'stream save':>11} | "
+          f"{'json.load':>9} {'stream load':>11}")
+
+    for scenes in (500, 2_000, 8_000):
+        project = make_project(words=scenes * 500, characters=200, locations=100, scenes=scenes)
+        # Keep the text in the scenes only, so the numbers track scene count
+        project.content = ""
+        with tempfile.TemporaryDirectory() as tmp:
+            service = ProjectService(tmp)
+            service.current_project = project
+            path = os.path.join(tmp, "bench.story")
+
+            def dumps_save():
+                encoded = json.dumps(service._serialize_project(project), separators=(',', ':'))
+                with open(path, 'w') as f:
+                    f.write(encoded)
+
+            dumps_save_mb = overhead(dumps_save)[0] / 1e6
+            stream_save_mb = overhead(lambda: service.export_project(path, project))[0] / 1e6
+            size = os.path.getsize(path) / 1e6
+
+            def json_load():
+                with open(path) as f:
+                    return service._deserialize_project(json.load(f))
+
+            json_load_mb = overhead(json_load)[0] / 1e6
+            stream_load_mb = overhead(lambda: service._read_project(path))[0] / 1e6
+
+        print(f"  {scenes:>7} {size:>6.1f} | {dumps_save_mb:>8.1f}MB {stream_save_mb:>9.2f}MB | "
+              f"{json_load_mb:>7.1f}MB {stream_load_mb:>9.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
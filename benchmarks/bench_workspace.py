@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Project listing benchmark: startup listing of 2,000 .story files with and
+without the sidecar metadata index
+
+Run: python benchmarks/bench_workspace.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import make_project
+from storyloom.services.project_service import ProjectService
+from storyloom.services.workspace import Workspace
+
+PROJECTS = 2_000
+
+
+def main():
+    print("=" * 60)
+    print(f"Project listing benchmark ({PROJECTS:,} projects of 20k words)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = make_project(20_000, characters=50, locations=20, scenes=20)
+        for i in range(PROJECTS):
+            project.title = f"Book {i}"
+            project.file_path = os.path.join(tmp, f"book{i}.story")
+            service.save_project(project, force=True)
+
+        t0 = time.perf_counter()
+        for name in os.listdir(tmp):
+            with open(os.path.join(tmp, name)) as f:
+                json.load(f)
+        print(f"  json.load of every file:          {(time.perf_counter() - t0) * 1000:8.1f} ms")
+
+        t0 = time.perf_counter()
+        listed = Workspace(service).summaries()
+        print(f"  first listing (builds the index): {(time.perf_counter() - t0) * 1000:8.1f} ms "
+              f"({len(listed)} projects)")
+
+        t0 = time.perf_counter()
+        workspace = Workspace(service)
+        workspace.summaries()
+        print(f"  startup listing with the index:   {(time.perf_counter() - t0) * 1000:8.1f} ms "
+              f"({workspace.index.reads} files read)")
+
+        t0 = time.perf_counter()
+        workspace.summaries()
+        print(f"  repeated listing:                 {(time.perf_counter() - t0) * 1000:8.1f} ms")
+
+        for i in range(10):
+            project.title = f"Book {i}, revised"
+            project.file_path = os.path.join(tmp, f"book{i}.story")
+            service.save_project(project, force=True)
+        t0 = time.perf_counter()
+        workspace.summaries()
+        print(f"  listing after 10 files changed:   {(time.perf_counter() - t0) * 1000:8.1f} ms "
+              f"({workspace.index.reads} files read)")
+        workspace.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Synthetic projects shared by the benchmark scripts
+"""
+
+import os
+import random
+import sys
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'storyloom_core'))
+
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+from storyloom.models.project import Project
+from storyloom.models.scene import Scene
+
+WORDS = (
+    "the a and of to in was he she it that with for as his her on at by "
+    "forest river night storm blade wind letter fire road ship gate shadow "
+    "walked spoke whispered ran watched remembered fought waited listened"
+).split()
+
+NAMES = [
+    "Aragorn", "Gandalf", "Legolas", "Arwen", "Boromir", "Elrond", "Galadriel",
+    "Samwise", "Frodo", "Eowyn", "Faramir", "Theoden", "Gimli", "Radagast",
+]
+
+PLACES = ["Rivendell", "Gondor", "Rohan", "Moria", "Lorien", "Isengard", "Bree"]
+
+
+def make_text(words: int, seed: int = 0, paragraph_words: int = 120) -> str:
+    """Prose-like text with capitalized names and paragraph breaks"""
+    rng = random.Random(seed)
+    out = []
+    for i in range(words):
+        r = rng.random()
+        if r < 0.04:
+            out.append(rng.choice(NAMES))
+        elif r < 0.05:
+            out.append(rng.choice(PLACES))
+        else:
+            out.append(rng.choice(WORDS))
+        if i % paragraph_words == paragraph_words - 1:
+            out.append("\n\n")
+        elif rng.random() < 0.08:
+            out.append(". ")
+        else:
+            out.append(" ")
+    return "".join(out)
+
+
+def make_project(words: int = 500_000, characters: int = 2_000, locations: int = 2_000,
+                 scenes: int = 1_000, seed: int = 0) -> Project:
+    """Project with ``words`` of content split evenly across ``scenes``"""
+    content = make_text(words, seed)
+    project = Project(title=f"Benchmark {words} words", content=content)
+    project.characters = [
+        Character(name=f"Character {i}", role="extra", description=f"Description of character {i}")
+        for i in range(characters)
+    ]
+    project.locations = [
+        Location(name=f"Location {i}", type="town", description=f"Description of location {i}")
+        for i in range(locations)
+    ]
+    if scenes:
+        step = max(len(content) // scenes, 1)
+        project.scenes = [
+            Scene(title=f"Scene {i}", summary=f"Summary {i}", content=content[i * step:(i + 1) * step],
+                  order_index=i)
+            for i in range(scenes)
+        ]
+    return project
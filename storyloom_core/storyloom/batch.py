@@ -0,0 +1,167 @@
+"""
+Batch analysis of a directory of .story files
+
+Runs character detection, word statistics, mention counts and
+co-occurrence relationships for every project in a process pool and
+appends one JSON line per project to the output as each finishes.
+Re-running with the same output skips projects already analysed (unless
+the file changed since), so an interrupted run resumes where it stopped.
+
+Run: python -m storyloom.batch ARCHIVE_DIR -o results.jsonl [-j WORKERS]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from .services.character_detection import NAME_PATTERN, filter_names
+from .services.project_service import ProjectService
+
+
+def find_projects(directory: str, recursive: bool = False) -> List[str]:
+    """The .story files in directory, sorted by path"""
+    pattern = "**/*.story" if recursive else "*.story"
+    return sorted(str(p) for p in Path(directory).glob(pattern) if p.is_file())
+
+
+def _signature(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def analyze_file(path: str) -> dict:
+    """Analyse one project file; runs in a worker process
+
+    Errors are reported in the record (under "error") rather than raised,
+    so one bad file does not stop the batch.
+    """
+    started = time.perf_counter()
+    mtime_ns, size = _signature(path)
+    record = {'path': path, 'mtime_ns': mtime_ns, 'size': size}
+    try:
+        service = ProjectService(os.path.dirname(path) or ".")
+        project = service._read_project(path)
+        service.activate_project(project)
+        text = project.content
+        names = {c.id: c.name for c in project.characters}
+        names.update((l.id, l.name) for l in project.locations)
+
+        detected = sorted(filter_names(NAME_PATTERN.findall(text)))
+        mentions = service.count_mentions(text)
+        relationships = service.build_relationships()
+        record.update(
+            id=project.id,
+            title=project.title,
+            words=len(text.split()),
+            characters=len(text),
+            paragraphs=sum(1 for p in text.split("\n\n") if p.strip()),
+            scenes=len(project.scenes),
+            scene_words=sum(len(s.content.split()) for s in project.scenes),
+            detected=detected,
+            new_characters=[name for name in detected if not project.characters.has_name(name)],
+            # By id: a character and a location may share a name
+            mentions=[[entity_id, names[entity_id], count] for entity_id, count in mentions.most_common()],
+            cooccurrence=[[names.get(r.source_id, r.source_id), names.get(r.target_id, r.target_id), r.weight]
+                          for r in relationships],
+        )
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['seconds'] = round(time.perf_counter() - started, 4)
+    return record
+
+
+def read_results(output: str) -> Dict[str, dict]:
+    """Records already in an output file, the last one per path (a torn last line is ignored)"""
+    results = {}
+    try:
+        with open(output, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                results[record['path']] = record
+    except FileNotFoundError:
+        pass
+    return results
+
+
+def pending_projects(paths: Iterable[str], results: Dict[str, dict]) -> List[str]:
+    """Paths without a successful record for the file as it is now"""
+    pending = []
+    for path in paths:
+        record = results.get(path)
+        if record is None or 'error' in record or \
+                (record.get('mtime_ns'), record.get('size')) != _signature(path):
+            pending.append(path)
+    return pending
+
+
+def run_batch(paths: List[str], output: str, workers: Optional[int] = None, resume: bool = True,
+              progress=None) -> int:
+    """Analyse paths in a process pool, appending records to output; returns the number analysed"""
+    if resume:
+        paths = pending_projects(paths, read_results(output))
+    elif os.path.exists(output):
+        os.remove(output)
+    if not paths:
+        return 0
+
+    # Start on a fresh line if an earlier run was killed mid-write
+    if os.path.exists(output) and os.path.getsize(output):
+        with open(output, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            torn = f.read(1) != b"\n"
+    else:
+        torn = False
+
+    started = time.perf_counter()
+    done = 0
+    with open(output, 'a', encoding='utf-8') as out, ProcessPoolExecutor(max_workers=workers) as executor:
+        if torn:
+            out.write("\n")
+        futures = [executor.submit(analyze_file, path) for path in paths]
+        for future in as_completed(futures):
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            done += 1
+            if progress:
+                progress(done, len(paths), record, time.perf_counter() - started)
+    return done
+
+
+def _print_progress(done: int, total: int, record: dict, elapsed: float) -> None:
+    status = f"error: {record['error']}" if 'error' in record else f"{record['words']} words"
+    rate = done / elapsed if elapsed else 0.0
+    print(f"[{done}/{total}] {record['path']} ({status}) {rate:.1f} files/s", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m storyloom.batch",
+        description="Analyse every .story file in a directory into a JSON Lines file",
+    )
+    parser.add_argument("directory", help="directory holding .story files")
+    parser.add_argument("-o", "--output", default="analysis.jsonl", help="JSON Lines output (appended to)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="include subdirectories")
+    parser.add_argument("--restart", action="store_true", help="discard earlier results instead of resuming")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args(argv)
+
+    paths = find_projects(args.directory, args.recursive)
+    done = run_batch(paths, args.output, args.workers, resume=not args.restart,
+                     progress=None if args.quiet else _print_progress)
+    if not args.quiet:
+        print(f"Analysed {done} of {len(paths)} projects -> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
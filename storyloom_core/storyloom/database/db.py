@@ -0,0 +1,410 @@
+"""
+SQLite project store - an alternative to monolithic JSON .story files
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+from ..models.project import Project
+from ..models.character import Character
+from ..models.location import Location
+from ..models.scene import Scene
+from ..models.relationship import Relationship
+from ..storage.lazy_content import DEFAULT_MEMORY_BUDGET, SQLiteContentStore, bind_lazy, is_loaded
+from ..services.search_index import SNIPPET_END, SNIPPET_START, SNIPPET_ELLIPSIS, SNIPPET_TOKENS, SearchHit, fts_query
+
+SCHEMA_PATH = Path(__file__).with_name("schema.sql")
+FTS_SCHEMA_PATH = Path(__file__).with_name("fts.sql")
+SQLITE_MAGIC = b"SQLite format 3\x00"
+
+# File extensions ProjectService saves through the database store
+DATABASE_EXTENSIONS = ('.storydb', '.db', '.sqlite')
+
+
+def is_database_file(path: Union[str, Path]) -> bool:
+    """Return True if ``path`` is an SQLite database (by magic bytes)"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(SQLITE_MAGIC)) == SQLITE_MAGIC
+    except OSError:
+        return False
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _datetime(value: Optional[str]) -> datetime:
+    return datetime.fromisoformat(value) if value else datetime.now()
+
+
+def _upsert_sql(table: str, columns: Sequence[str]) -> str:
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "id")
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT(id) DO UPDATE SET {updates}"
+    )
+
+
+_PROJECT_COLUMNS = ("id", "title", "description", "content", "created_at", "updated_at")
+_CHARACTER_COLUMNS = ("id", "project_id", "position", "name", "role", "description", "goals",
+                      "created_at", "updated_at")
+_LOCATION_COLUMNS = ("id", "project_id", "position", "name", "type", "description",
+                     "created_at", "updated_at")
+_SCENE_COLUMNS = ("id", "project_id", "position", "title", "summary", "content", "location_id",
+                  "order_index", "created_at", "updated_at")
+_RELATIONSHIP_COLUMNS = ("id", "project_id", "source_id", "target_id", "type", "description",
+                         "weight", "created_at", "updated_at")
+
+# Full-text tables: (section, FTS table, indexed columns, bm25 column weights)
+_FTS_TABLES = (
+    ("projects", "projects_fts", ("title", "description", "content"), (2.0, 1.5, 1.0)),
+    ("scenes", "scenes_fts", ("title", "summary", "content"), (2.0, 1.5, 1.0)),
+    ("characters", "characters_fts", ("name", "description"), (2.0, 1.0)),
+    ("locations", "locations_fts", ("name", "description"), (2.0, 1.0)),
+)
+
+# Private-use markers let us tell which column a snippet matched in
+_MARK_START, _MARK_END = "\ue000", "\ue001"
+
+
+def _character_row(c: Character, project_id: str, position: int) -> tuple:
+    return (c.id, project_id, position, c.name, c.role, c.description, json.dumps(c.goals),
+            _iso(c.created_at), _iso(c.updated_at))
+
+
+def _location_row(l: Location, project_id: str, position: int) -> tuple:
+    return (l.id, project_id, position, l.name, l.type, l.description,
+            _iso(l.created_at), _iso(l.updated_at))
+
+
+def _scene_row(s: Scene, project_id: str, position: int) -> tuple:
+    return (s.id, project_id, position, s.title, s.summary, s.content, s.location_id,
+            s.order_index, _iso(s.created_at), _iso(s.updated_at))
+
+
+class ProjectDatabase:
+    """SQLite-backed storage for projects and their entities.
+
+    Uses WAL journaling and writes each save as one transaction of batched
+    upserts. Saves are incremental: only dirty or moved entities are
+    written and removed ones are deleted, unless ``full`` is requested.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA_PATH.read_text())
+        self._migrate()
+        self.has_fts = self._create_fts()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "ProjectDatabase":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # Projects
+
+    def list_projects(self) -> List[dict]:
+        """Lightweight listing of stored projects (no content)"""
+        rows = self.conn.execute(
+            "SELECT id, title, created_at, updated_at FROM projects ORDER BY rowid"
+        ).fetchall()
+        return [
+            {'id': r[0], 'title': r[1], 'created_at': r[2], 'updated_at': r[3]}
+            for r in rows
+        ]
+
+    def save_project(self, project: Project, full: bool = False) -> None:
+        """Write ``project`` in a single transaction"""
+        with self.conn:
+            full = self._write_searchable(project, full)
+            if full or project.header_dirty:
+                self._write_relationships(project.id, project.relationships)
+            if project._analysis is None:
+                self.conn.execute("DELETE FROM project_analysis WHERE project_id = ?", (project.id,))
+            else:
+                self.conn.execute(
+                    "INSERT INTO project_analysis (project_id, state) VALUES (?, ?) "
+                    "ON CONFLICT(project_id) DO UPDATE SET state = excluded.state",
+                    (project.id, json.dumps(project._analysis, separators=(',', ':'))),
+                )
+
+    def load_project(self, project_id: Optional[str] = None, lazy: bool = False,
+                     memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Optional[Project]:
+        """Load a project (the first stored one if no id is given)
+
+        With ``lazy`` set, project and scene bodies stay in the database and
+        are fetched on first access through an ``SQLiteContentStore``.
+        """
+        content = "''" if lazy else "content"
+        if project_id is None:
+            row = self.conn.execute(
+                f"SELECT id, title, description, {content}, created_at, updated_at "
+                "FROM projects ORDER BY rowid LIMIT 1"
+            ).fetchone()
+        else:
+            row = self.conn.execute(
+                f"SELECT id, title, description, {content}, created_at, updated_at "
+                "FROM projects WHERE id = ?", (project_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        project_id = row[0]
+
+        characters = [
+            Character(id=r[0], name=r[1], role=r[2] or "", description=r[3] or "",
+                      goals=json.loads(r[4]) if r[4] else [],
+                      created_at=_datetime(r[5]), updated_at=_datetime(r[6]))
+            for r in self.conn.execute(
+                "SELECT id, name, role, description, goals, created_at, updated_at "
+                "FROM characters WHERE project_id = ? ORDER BY position", (project_id,)
+            )
+        ]
+
+        locations = [
+            Location(id=r[0], name=r[1], type=r[2] or "", description=r[3] or "",
+                     created_at=_datetime(r[4]), updated_at=_datetime(r[5]))
+            for r in self.conn.execute(
+                "SELECT id, name, type, description, created_at, updated_at "
+                "FROM locations WHERE project_id = ? ORDER BY position", (project_id,)
+            )
+        ]
+
+        scene_characters: Dict[str, List[str]] = {}
+        for scene_id, character_id in self.conn.execute(
+            "SELECT sc.scene_id, sc.character_id FROM scene_characters sc "
+            "JOIN scenes s ON s.id = sc.scene_id WHERE s.project_id = ? "
+            "ORDER BY sc.scene_id, sc.position", (project_id,)
+        ):
+            scene_characters.setdefault(scene_id, []).append(character_id)
+
+        scenes = [
+            Scene(id=r[0], title=r[1] or "", summary=r[2] or "", content=r[3] or "",
+                  character_ids=scene_characters.get(r[0], []), location_id=r[4],
+                  order_index=r[5] or 0, created_at=_datetime(r[6]), updated_at=_datetime(r[7]))
+            for r in self.conn.execute(
+                f"SELECT id, title, summary, {content}, location_id, order_index, created_at, updated_at "
+                "FROM scenes WHERE project_id = ? ORDER BY position", (project_id,)
+            )
+        ]
+
+        project = Project(
+            id=project_id,
+            title=row[1],
+            description=row[2],
+            content=row[3],
+            characters=characters,
+            locations=locations,
+            scenes=scenes,
+            relationships=self.load_relationships(project_id),
+            created_at=_datetime(row[4]),
+            updated_at=_datetime(row[5]),
+        )
+        analysis = self.conn.execute(
+            "SELECT state FROM project_analysis WHERE project_id = ?", (project_id,)
+        ).fetchone()
+        project._analysis = json.loads(analysis[0]) if analysis else None
+        if lazy:
+            store = SQLiteContentStore(self.path, memory_budget)
+            bind_lazy(project, 'content', store, ('projects', project.id))
+            for scene in project.scenes:
+                bind_lazy(scene, 'content', store, ('scenes', scene.id))
+            project._content_store = store
+        project.mark_clean()
+        return project
+
+    def delete_project(self, project_id: str) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+
+    # Search
+
+    def search(self, query: str, project_id: Optional[str] = None, limit: int = 20) -> List[SearchHit]:
+        """Full-text search with FTS5, best bm25 score first; no bodies are read into Python
+
+        ``query`` uses the SearchIndex syntax (words, "phrases", prefix*).
+        Hits carry a snippet of the best matching column. Empty if this
+        SQLite build has no FTS5.
+        """
+        expression = fts_query(query)
+        if not self.has_fts or not expression:
+            return []
+        if project_id is None:
+            row = self.conn.execute("SELECT id FROM projects ORDER BY rowid LIMIT 1").fetchone()
+            if row is None:
+                return []
+            project_id = row[0]
+
+        ranked = []
+        for section, table, columns, weights in _FTS_TABLES:
+            owner = "b.id" if section == "projects" else "b.project_id"
+            ranked.extend(
+                (-score, section, rowid, entity_id)
+                for entity_id, rowid, score in self.conn.execute(
+                    f"SELECT b.id, b.rowid, bm25({table}, {', '.join(map(str, weights))}) AS score "
+                    f"FROM {table} JOIN {section} b ON b.rowid = {table}.rowid "
+                    f"WHERE {table} MATCH ? AND {owner} = ? ORDER BY score LIMIT ?",
+                    (expression, project_id, limit),
+                )
+            )
+        ranked.sort(key=lambda r: r[0], reverse=True)
+
+        # Snippets only for the hits returned, one query per table
+        ranked = ranked[:limit]
+        snippets = {}
+        for section, table, columns, _ in _FTS_TABLES:
+            rowids = [r[2] for r in ranked if r[1] == section]
+            if not rowids:
+                continue
+            for rowid, *texts in self.conn.execute(
+                "SELECT rowid, " + ", ".join(
+                    f"snippet({table}, {i}, '{_MARK_START}', '{_MARK_END}', '{SNIPPET_ELLIPSIS}', {SNIPPET_TOKENS})"
+                    for i in range(len(columns))
+                ) + f" FROM {table} WHERE {table} MATCH ? AND rowid IN ({', '.join('?' * len(rowids))})",
+                (expression, *rowids),
+            ):
+                snippets[section, rowid] = next(
+                    ((column, text) for column, text in zip(columns, texts) if text and _MARK_START in text),
+                    (columns[-1], texts[-1] or ""),
+                )
+
+        hits = []
+        for score, section, rowid, entity_id in ranked:
+            field, snippet = snippets[section, rowid]
+            snippet = snippet.replace(_MARK_START, SNIPPET_START).replace(_MARK_END, SNIPPET_END)
+            hits.append(SearchHit(section, entity_id, field, score, (), snippet))
+        return hits
+
+    def search_unsaved(self, project: Project, query: str, limit: int = 20) -> List[SearchHit]:
+        """``search`` as if the unsaved changes of ``project`` were saved, leaving the file unchanged
+
+        Only dirty rows are written (so the full-text triggers index them),
+        then the transaction is rolled back. Bodies that are not loaded are
+        not read.
+        """
+        try:
+            self._write_searchable(project, False)
+            return self.search(query, project.id, limit)
+        finally:
+            self.conn.rollback()
+
+    # Relationships
+
+    def save_relationships(self, project_id: str, relationships: Iterable[Relationship]) -> None:
+        """Replace the stored relationships of a project"""
+        with self.conn:
+            self._write_relationships(project_id, relationships)
+
+    def load_relationships(self, project_id: str) -> List[Relationship]:
+        return [
+            Relationship(id=r[0], source_id=r[1], target_id=r[2], type=r[3] or "",
+                         description=r[4] or "", weight=r[5], created_at=_datetime(r[6]),
+                         updated_at=_datetime(r[7]))
+            for r in self.conn.execute(
+                "SELECT id, source_id, target_id, type, description, weight, created_at, updated_at "
+                "FROM relationships WHERE project_id = ? ORDER BY rowid", (project_id,)
+            )
+        ]
+
+    # Internals
+
+    def _create_fts(self) -> bool:
+        """Create the full-text tables (indexing existing rows once); False without FTS5"""
+        existed = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'scenes_fts'"
+        ).fetchone() is not None
+        try:
+            self.conn.executescript(FTS_SCHEMA_PATH.read_text())
+        except sqlite3.OperationalError:
+            return False
+        if not existed:
+            with self.conn:
+                for _, table, _, _ in _FTS_TABLES:
+                    self.conn.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+        return True
+
+    def _write_searchable(self, project: Project, full: bool) -> bool:
+        """Write the header and entities of ``project`` (no commit); returns whether the write was full"""
+        exists = self.conn.execute(
+            "SELECT 1 FROM projects WHERE id = ?", (project.id,)
+        ).fetchone() is not None
+        full = full or not exists
+
+        if full or (project.header_dirty and is_loaded(project, 'content')):
+            self.conn.execute(
+                _upsert_sql("projects", _PROJECT_COLUMNS),
+                (project.id, project.title, project.description, project.content,
+                 _iso(project.created_at), _iso(project.updated_at)),
+            )
+        elif project.header_dirty:
+            # Body still on disk and unchanged - don't load it just to rewrite it
+            self.conn.execute(
+                "UPDATE projects SET title = ?, description = ?, created_at = ?, updated_at = ? "
+                "WHERE id = ?",
+                (project.title, project.description, _iso(project.created_at),
+                 _iso(project.updated_at), project.id),
+            )
+
+        self._sync("characters", _CHARACTER_COLUMNS, project.id, project.characters,
+                   _character_row, full)
+        self._sync("locations", _LOCATION_COLUMNS, project.id, project.locations,
+                   _location_row, full)
+        written = self._sync("scenes", _SCENE_COLUMNS, project.id, project.scenes,
+                             _scene_row, full)
+
+        if written:
+            self.conn.executemany(
+                "DELETE FROM scene_characters WHERE scene_id = ?",
+                ((s.id,) for s in written),
+            )
+            self.conn.executemany(
+                "INSERT INTO scene_characters (scene_id, position, character_id) VALUES (?, ?, ?)",
+                ((s.id, i, cid) for s in written for i, cid in enumerate(s.character_ids)),
+            )
+        return full
+
+    def _write_relationships(self, project_id: str, relationships: Iterable[Relationship]) -> None:
+        self.conn.execute("DELETE FROM relationships WHERE project_id = ?", (project_id,))
+        self.conn.executemany(
+            _upsert_sql("relationships", _RELATIONSHIP_COLUMNS),
+            ((r.id, project_id, r.source_id, r.target_id, r.type, r.description, r.weight,
+              _iso(r.created_at), _iso(r.updated_at)) for r in relationships),
+        )
+
+    def _migrate(self) -> None:
+        """Add columns introduced after a database file was created"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(relationships)")}
+        if "weight" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE relationships ADD COLUMN weight REAL NOT NULL DEFAULT 1")
+
+    def _sync(self, table: str, columns: Sequence[str], project_id: str, entities: Iterable,
+              row: Callable, full: bool) -> list:
+        """Upsert new/dirty rows, renumber moved ones and delete removed ones"""
+        stored = dict(self.conn.execute(
+            f"SELECT id, position FROM {table} WHERE project_id = ?", (project_id,)
+        ))
+        written, rows, moved = [], [], []
+        for position, entity in enumerate(entities):
+            old_position = stored.pop(entity.id, None)
+            if full or old_position is None or entity.dirty:
+                written.append(entity)
+                rows.append(row(entity, project_id, position))
+            elif old_position != position:
+                moved.append((position, entity.id))
+
+        self.conn.executemany(_upsert_sql(table, columns), rows)
+        self.conn.executemany(f"UPDATE {table} SET position = ? WHERE id = ?", moved)
+        self.conn.executemany(f"DELETE FROM {table} WHERE id = ?", ((i,) for i in stored))
+        return written
@@ -0,0 +1,83 @@
+-- Full-text search (SQLite FTS5). External-content tables index the rows
+-- of the base tables without storing a second copy of the text; the
+-- triggers keep them in sync on insert, upsert and delete.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+    title, description, content, content='projects'
+);
+
+CREATE TRIGGER IF NOT EXISTS projects_fts_insert AFTER INSERT ON projects BEGIN
+    INSERT INTO projects_fts(rowid, title, description, content)
+    VALUES (new.rowid, new.title, new.description, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS projects_fts_delete AFTER DELETE ON projects BEGIN
+    INSERT INTO projects_fts(projects_fts, rowid, title, description, content)
+    VALUES ('delete', old.rowid, old.title, old.description, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS projects_fts_update AFTER UPDATE OF title, description, content ON projects BEGIN
+    INSERT INTO projects_fts(projects_fts, rowid, title, description, content)
+    VALUES ('delete', old.rowid, old.title, old.description, old.content);
+    INSERT INTO projects_fts(rowid, title, description, content)
+    VALUES (new.rowid, new.title, new.description, new.content);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS characters_fts USING fts5(
+    name, description, content='characters'
+);
+
+CREATE TRIGGER IF NOT EXISTS characters_fts_insert AFTER INSERT ON characters BEGIN
+    INSERT INTO characters_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS characters_fts_delete AFTER DELETE ON characters BEGIN
+    INSERT INTO characters_fts(characters_fts, rowid, name, description)
+    VALUES ('delete', old.rowid, old.name, old.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS characters_fts_update AFTER UPDATE OF name, description ON characters BEGIN
+    INSERT INTO characters_fts(characters_fts, rowid, name, description)
+    VALUES ('delete', old.rowid, old.name, old.description);
+    INSERT INTO characters_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS locations_fts USING fts5(
+    name, description, content='locations'
+);
+
+CREATE TRIGGER IF NOT EXISTS locations_fts_insert AFTER INSERT ON locations BEGIN
+    INSERT INTO locations_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS locations_fts_delete AFTER DELETE ON locations BEGIN
+    INSERT INTO locations_fts(locations_fts, rowid, name, description)
+    VALUES ('delete', old.rowid, old.name, old.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS locations_fts_update AFTER UPDATE OF name, description ON locations BEGIN
+    INSERT INTO locations_fts(locations_fts, rowid, name, description)
+    VALUES ('delete', old.rowid, old.name, old.description);
+    INSERT INTO locations_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS scenes_fts USING fts5(
+    title, summary, content, content='scenes'
+);
+
+CREATE TRIGGER IF NOT EXISTS scenes_fts_insert AFTER INSERT ON scenes BEGIN
+    INSERT INTO scenes_fts(rowid, title, summary, content)
+    VALUES (new.rowid, new.title, new.summary, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS scenes_fts_delete AFTER DELETE ON scenes BEGIN
+    INSERT INTO scenes_fts(scenes_fts, rowid, title, summary, content)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS scenes_fts_update AFTER UPDATE OF title, summary, content ON scenes BEGIN
+    INSERT INTO scenes_fts(scenes_fts, rowid, title, summary, content)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.content);
+    INSERT INTO scenes_fts(rowid, title, summary, content)
+    VALUES (new.rowid, new.title, new.summary, new.content);
+END;
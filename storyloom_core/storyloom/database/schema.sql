@@ -1,26 +1,83 @@
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    content TEXT NOT NULL DEFAULT '',
+    created_at TEXT,
+    updated_at TEXT
+);
+
 CREATE TABLE IF NOT EXISTS characters (
     id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL DEFAULT 0,
     name TEXT,
     role TEXT,
-    description TEXT
+    description TEXT,
+    goals TEXT,  -- JSON list
+    created_at TEXT,
+    updated_at TEXT
 );
 
+CREATE INDEX IF NOT EXISTS idx_characters_name ON characters(project_id, name);
+CREATE INDEX IF NOT EXISTS idx_characters_position ON characters(project_id, position);
+
+CREATE TABLE IF NOT EXISTS locations (
+    id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL DEFAULT 0,
+    name TEXT,
+    type TEXT,
+    description TEXT,
+    created_at TEXT,
+    updated_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_locations_name ON locations(project_id, name);
+CREATE INDEX IF NOT EXISTS idx_locations_position ON locations(project_id, position);
+
 CREATE TABLE IF NOT EXISTS scenes (
     id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL DEFAULT 0,
     title TEXT,
     summary TEXT,
-    order_index INTEGER
+    content TEXT,
+    location_id TEXT,
+    order_index INTEGER,
+    created_at TEXT,
+    updated_at TEXT
 );
 
+CREATE INDEX IF NOT EXISTS idx_scenes_order ON scenes(project_id, order_index);
+CREATE INDEX IF NOT EXISTS idx_scenes_position ON scenes(project_id, position);
+
 CREATE TABLE IF NOT EXISTS scene_characters (
-    scene_id TEXT,
-    character_id TEXT
+    scene_id TEXT NOT NULL REFERENCES scenes(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    character_id TEXT NOT NULL,
+    PRIMARY KEY (scene_id, position)
 );
 
+CREATE INDEX IF NOT EXISTS idx_scene_characters_character ON scene_characters(character_id);
+
 CREATE TABLE IF NOT EXISTS relationships (
     id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
     source_id TEXT,
     target_id TEXT,
     type TEXT,
-    description TEXT
+    description TEXT,
+    weight REAL NOT NULL DEFAULT 1,
+    created_at TEXT,
+    updated_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_relationships_source ON relationships(project_id, source_id);
+CREATE INDEX IF NOT EXISTS idx_relationships_target ON relationships(project_id, target_id);
+
+-- Saved co-occurrence counts (JSON, see CooccurrenceBuilder.state)
+CREATE TABLE IF NOT EXISTS project_analysis (
+    project_id TEXT PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+    state TEXT NOT NULL
 );
@@ -1,10 +1,354 @@
+"""
+Story graph - an undirected graph of characters, locations and scenes with
+typed, weighted edges and the queries the story views need.
+"""
+
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+DEFAULT_EDGE_TYPE = "related"
+
+# Edge keys pack (low node, high node, type) into one int: node indexes in
+# the upper bits, the type index in the low _TYPE_BITS
+_TYPE_BITS = 16
+_NODE_BITS = 32
+_NODE_MASK = (1 << _NODE_BITS) - 1
+_TYPE_MASK = (1 << _TYPE_BITS) - 1
+
+
 class StoryGraph:
+    """Undirected graph with typed, weighted, de-duplicated edges.
+
+    Node ids are strings (entity ids). Internally nodes are numbered and
+    each keeps a set of neighbour numbers, so adjacency checks and
+    traversal stay O(1) per step; edge weights live in a single dict keyed
+    by a packed int. At most one edge exists per (pair, type): adding it
+    again replaces the weight, ``add_weight`` accumulates instead.
+    """
+
     def __init__(self):
-        self.edges = {}
+        self._index: Dict[str, int] = {}
+        self._nodes: List[Optional[str]] = []
+        self._adj: List[Optional[Set[int]]] = []
+        self._free: List[int] = []
+        self._weights: Dict[int, float] = {}
+        self._reasons: Dict[int, str] = {}
+        self._types: List[str] = []
+        self._type_index: Dict[str, int] = {}
+
+    # Nodes
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._index
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._weights)
+
+    def nodes(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def add_node(self, node_id: str) -> None:
+        self._node(node_id)
+
+    def remove_node(self, node_id: str) -> bool:
+        """Remove a node and every edge touching it"""
+        u = self._index.get(node_id)
+        if u is None:
+            return False
+        for v in list(self._adj[u]):
+            self._remove_pair(u, v)
+        del self._index[node_id]
+        self._nodes[u] = None
+        self._adj[u] = None
+        self._free.append(u)
+        return True
+
+    # Edges
+
+    def add_edge(self, a_id: str, b_id: str, type: str = DEFAULT_EDGE_TYPE, weight: float = 1.0,
+                 reason: str = "") -> None:
+        """Add (or update) the ``type`` edge between two nodes"""
+        if a_id == b_id:
+            raise ValueError("self-loops are not supported")
+        u, v = self._node(a_id), self._node(b_id)
+        key = self._key(u, v, self._type(type))
+        self._weights[key] = weight
+        if reason:
+            self._reasons[key] = reason
+        self._adj[u].add(v)
+        self._adj[v].add(u)
+
+    def add_weight(self, a_id: str, b_id: str, type: str = DEFAULT_EDGE_TYPE, delta: float = 1.0) -> float:
+        """Add ``delta`` to an edge's weight (creating it at ``delta``); returns the new weight
+
+        An edge whose weight drops to zero or below is removed.
+        """
+        if a_id == b_id:
+            raise ValueError("self-loops are not supported")
+        u, v = self._node(a_id), self._node(b_id)
+        key = self._key(u, v, self._type(type))
+        weight = self._weights.get(key, 0.0) + delta
+        if weight <= 0:
+            self._remove_key(key, u, v)
+            return 0.0
+        self._weights[key] = weight
+        self._adj[u].add(v)
+        self._adj[v].add(u)
+        return weight
+
+    def remove_edge(self, a_id: str, b_id: str, type: Optional[str] = None) -> bool:
+        """Remove the ``type`` edge between two nodes, or all of their edges if type is None"""
+        u, v = self._index.get(a_id), self._index.get(b_id)
+        if u is None or v is None or v not in self._adj[u]:
+            return False
+        if type is None:
+            self._remove_pair(u, v)
+            return True
+        t = self._type_index.get(type)
+        if t is None:
+            return False
+        return self._remove_key(self._key(u, v, t), u, v)
+
+    def has_edge(self, a_id: str, b_id: str, type: Optional[str] = None) -> bool:
+        return self.weight(a_id, b_id, type) > 0
+
+    def weight(self, a_id: str, b_id: str, type: Optional[str] = None) -> float:
+        """Weight of the ``type`` edge (summed over all types if type is None), 0 if absent"""
+        u, v = self._index.get(a_id), self._index.get(b_id)
+        if u is None or v is None or v not in self._adj[u]:
+            return 0.0
+        if type is not None:
+            t = self._type_index.get(type)
+            return 0.0 if t is None else self._weights.get(self._key(u, v, t), 0.0)
+        pair = self._key(u, v, 0)
+        return sum(self._weights.get(pair | t, 0.0) for t in range(len(self._types)))
+
+    def edge_types(self, a_id: str, b_id: str) -> List[str]:
+        u, v = self._index.get(a_id), self._index.get(b_id)
+        if u is None or v is None or v not in self._adj[u]:
+            return []
+        pair = self._key(u, v, 0)
+        return [name for t, name in enumerate(self._types) if pair | t in self._weights]
+
+    def edges(self, type: Optional[str] = None) -> Iterator[Tuple[str, str, str, float]]:
+        """Iterate (a_id, b_id, type, weight) over all edges"""
+        t_filter = None if type is None else self._type_index.get(type, -1)
+        nodes, types = self._nodes, self._types
+        for key, weight in self._weights.items():
+            t = key & _TYPE_MASK
+            if t_filter is not None and t != t_filter:
+                continue
+            pair = key >> _TYPE_BITS
+            yield nodes[pair >> _NODE_BITS], nodes[pair & _NODE_MASK], types[t], weight
+
+    def neighbors(self, node_id: str, type: Optional[str] = None) -> Set[str]:
+        u = self._index.get(node_id)
+        if u is None:
+            return set()
+        nodes = self._nodes
+        if type is None:
+            return {nodes[v] for v in self._adj[u]}
+        t = self._type_index.get(type)
+        if t is None:
+            return set()
+        return {nodes[v] for v in self._adj[u] if self._key(u, v, t) in self._weights}
+
+    def degree(self, node_id: str, weighted: bool = False) -> float:
+        """Number of neighbours, or the summed weight of all incident edges"""
+        u = self._index.get(node_id)
+        if u is None:
+            return 0
+        if not weighted:
+            return len(self._adj[u])
+        return sum(self.weight(node_id, self._nodes[v]) for v in self._adj[u])
+
+    # Compatibility with the original list-based API
 
     def connect(self, a_id: str, b_id: str, reason: str = ""):
-        self.edges.setdefault(a_id, []).append((b_id, reason))
-        self.edges.setdefault(b_id, []).append((a_id, reason))
+        self.add_edge(a_id, b_id, reason=reason)
 
     def connections_for(self, entity_id: str):
-        return self.edges.get(entity_id, [])
+        """(neighbour id, reason) for every default-type edge of entity_id"""
+        u = self._index.get(entity_id)
+        t = self._type_index.get(DEFAULT_EDGE_TYPE)
+        if u is None or t is None:
+            return []
+        result = []
+        for v in self._adj[u]:
+            key = self._key(u, v, t)
+            if key in self._weights:
+                result.append((self._nodes[v], self._reasons.get(key, "")))
+        return result
+
+    # Queries
+
+    def shortest_path(self, source_id: str, target_id: str,
+                      type: Optional[str] = None) -> Optional[List[str]]:
+        """Fewest-hops path from source to target (inclusive), or None
+
+        Runs a bidirectional BFS, expanding the smaller frontier each round.
+        """
+        s, g = self._index.get(source_id), self._index.get(target_id)
+        if s is None or g is None:
+            return None
+        if s == g:
+            return [source_id]
+        neighbors = self._neighbor_fn(type)
+        if neighbors is None:
+            return None
+
+        parents_s, parents_g = {s: None}, {g: None}
+        dist_s, dist_g = {s: 0}, {g: 0}
+        front_s, front_g = [s], [g]
+
+        def expand(frontier, parents, dist, other_dist):
+            # One full BFS level; the meeting node closest to the other side wins
+            next_frontier, meet = [], None
+            for u in frontier:
+                d = dist[u] + 1
+                for v in neighbors(u):
+                    if v in parents:
+                        continue
+                    parents[v] = u
+                    dist[v] = d
+                    next_frontier.append(v)
+                    if v in other_dist and (meet is None or other_dist[v] < other_dist[meet]):
+                        meet = v
+            return next_frontier, meet
+
+        while front_s and front_g:
+            if len(front_s) <= len(front_g):
+                front_s, meet = expand(front_s, parents_s, dist_s, dist_g)
+            else:
+                front_g, meet = expand(front_g, parents_g, dist_g, dist_s)
+            if meet is not None:
+                path = []
+                u = meet
+                while u is not None:
+                    path.append(u)
+                    u = parents_s[u]
+                path.reverse()
+                u = parents_g[meet]
+                while u is not None:
+                    path.append(u)
+                    u = parents_g[u]
+                return [self._nodes[u] for u in path]
+        return None
+
+    def neighborhood(self, node_id: str, k: int = 1, type: Optional[str] = None) -> Dict[str, int]:
+        """Nodes within ``k`` hops of node_id, mapped to their hop distance (node itself at 0)"""
+        u = self._index.get(node_id)
+        if u is None:
+            return {}
+        neighbors = self._neighbor_fn(type)
+        dist = {u: 0}
+        frontier = [u]
+        for hop in range(1, k + 1):
+            if neighbors is None or not frontier:
+                break
+            next_frontier = []
+            for x in frontier:
+                for v in neighbors(x):
+                    if v not in dist:
+                        dist[v] = hop
+                        next_frontier.append(v)
+            frontier = next_frontier
+        return {self._nodes[v]: d for v, d in dist.items()}
+
+    def connected_components(self) -> List[Set[str]]:
+        """Node sets of each connected component, largest first"""
+        adj, nodes = self._adj, self._nodes
+        seen = [False] * len(nodes)
+        components = []
+        for start in self._index.values():
+            if seen[start]:
+                continue
+            seen[start] = True
+            component = [start]
+            stack = [start]
+            while stack:
+                for v in adj[stack.pop()]:
+                    if not seen[v]:
+                        seen[v] = True
+                        component.append(v)
+                        stack.append(v)
+            components.append({nodes[u] for u in component})
+        components.sort(key=len, reverse=True)
+        return components
+
+    def degree_centrality(self) -> Dict[str, float]:
+        """Degree of each node divided by the maximum possible degree (n - 1)"""
+        n = len(self._index)
+        scale = 1.0 / (n - 1) if n > 1 else 0.0
+        adj = self._adj
+        return {node_id: len(adj[u]) * scale for node_id, u in self._index.items()}
+
+    # Internals
+
+    def _node(self, node_id: str) -> int:
+        u = self._index.get(node_id)
+        if u is None:
+            if self._free:
+                u = self._free.pop()
+                self._nodes[u] = node_id
+                self._adj[u] = set()
+            else:
+                u = len(self._nodes)
+                self._nodes.append(node_id)
+                self._adj.append(set())
+            self._index[node_id] = u
+        return u
+
+    def _type(self, type: str) -> int:
+        t = self._type_index.get(type)
+        if t is None:
+            if len(self._types) > _TYPE_MASK:
+                raise ValueError("too many edge types")
+            t = self._type_index[type] = len(self._types)
+            self._types.append(type)
+        return t
+
+    @staticmethod
+    def _key(u: int, v: int, t: int) -> int:
+        if u > v:
+            u, v = v, u
+        return (((u << _NODE_BITS) | v) << _TYPE_BITS) | t
+
+    def _remove_key(self, key: int, u: int, v: int) -> bool:
+        if self._weights.pop(key, None) is None:
+            return False
+        self._reasons.pop(key, None)
+        pair = key & ~_TYPE_MASK
+        if not any(pair | t in self._weights for t in range(len(self._types))):
+            self._adj[u].discard(v)
+            self._adj[v].discard(u)
+        return True
+
+    def _remove_pair(self, u: int, v: int) -> None:
+        pair = self._key(u, v, 0)
+        for t in range(len(self._types)):
+            self._weights.pop(pair | t, None)
+            self._reasons.pop(pair | t, None)
+        self._adj[u].discard(v)
+        self._adj[v].discard(u)
+
+    def _neighbor_fn(self, type: Optional[str]):
+        """Neighbour lookup by node number, restricted to one edge type if given"""
+        adj = self._adj
+        if type is None:
+            return adj.__getitem__
+        t = self._type_index.get(type)
+        if t is None:
+            return None
+        weights = self._weights
+
+        def typed(u: int):
+            hi_u = u << _NODE_BITS
+            return [
+                v for v in adj[u]
+                if (((hi_u | v) if u < v else ((v << _NODE_BITS) | u)) << _TYPE_BITS | t) in weights
+            ]
+        return typed
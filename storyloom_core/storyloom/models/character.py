@@ -2,9 +2,13 @@ from dataclasses import dataclass, field
 from uuid import uuid4
 from typing import List
 from datetime import datetime
+from .registry import intern_id
+from .slots import slotted
+from .tracking import DirtyTracked
 
+@slotted
 @dataclass
-class Character:
+class Character(DirtyTracked):
     id: str = field(default_factory=lambda: str(uuid4()))
     name: str = ""
     role: str = ""
@@ -12,4 +16,6 @@ class Character:
     goals: List[str] = field(default_factory=list)
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
-    
\ No newline at end of file
+
+    def __post_init__(self):
+        self.id = intern_id(self.id)
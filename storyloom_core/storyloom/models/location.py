@@ -1,12 +1,19 @@
 from dataclasses import dataclass, field
 from uuid import uuid4
 from datetime import datetime
+from .registry import intern_id
+from .slots import slotted
+from .tracking import DirtyTracked
 
+@slotted
 @dataclass
-class Location:
+class Location(DirtyTracked):
     id: str = field(default_factory=lambda: str(uuid4()))
     name: str = ""
     type: str = ""
     description: str = ""
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
+
+    def __post_init__(self):
+        self.id = intern_id(self.id)
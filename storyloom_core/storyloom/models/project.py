@@ -1,20 +1,63 @@
 from dataclasses import dataclass, field
+from itertools import chain
 from uuid import uuid4
 from datetime import datetime
 from typing import List
 from .character import Character
 from .scene import Scene
 from .location import Location
+from .relationship import Relationship
+from .registry import EntityRegistry
+from .tracking import DirtyTracked
+from ..storage.lazy_content import lazy_text_fields
 
+@lazy_text_fields('content')
 @dataclass
-class Project:
+class Project(DirtyTracked):
     id: str = field(default_factory=lambda: str(uuid4()))
     title: str = "Untitled Project"
     description: str = ""
-    content: str = ""  # Main story text
+    content: str = ""  # Main story text, possibly loaded on demand
     characters: List[Character] = field(default_factory=list)
     scenes: List[Scene] = field(default_factory=list)
     locations: List[Location] = field(default_factory=list)
+    relationships: List[Relationship] = field(default_factory=list)
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
     file_path: str = ""  # Local file path for saving
+
+    def __setattr__(self, name, value):
+        # Characters and locations are always held in indexed registries
+        if name in ('characters', 'locations') and not isinstance(value, EntityRegistry):
+            value = EntityRegistry(value)
+        super().__setattr__(name, value)
+
+    _saved_layout = None
+    _content_store = None  # ContentStore backing lazily loaded bodies, if any
+    _analysis = None  # Saved co-occurrence counts (CooccurrenceBuilder.state), if any
+    _rope = None  # (Rope, str it was joined into) once content is edited through storage.rope
+
+    def _layout(self):
+        return (
+            tuple(c.id for c in self.characters),
+            tuple(l.id for l in self.locations),
+            tuple(s.id for s in self.scenes),
+        )
+
+    @property
+    def header_dirty(self) -> bool:
+        """True if the project's own fields (title, content, ...) changed"""
+        return getattr(self, '_dirty', True)
+
+    @property
+    def dirty(self) -> bool:
+        """True if the project or any of its entities changed since the last save"""
+        if self.header_dirty or self._layout() != self._saved_layout:
+            return True
+        return any(e.dirty for e in chain(self.characters, self.locations, self.scenes))
+
+    def mark_clean(self) -> None:
+        super().mark_clean()
+        for entity in chain(self.characters, self.locations, self.scenes):
+            entity.mark_clean()
+        self._saved_layout = self._layout()
@@ -0,0 +1,164 @@
+import sys
+from typing import Dict, Generic, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def intern_id(value):
+    """Intern an entity id so every reference to it shares one string"""
+    return sys.intern(value) if type(value) is str else value
+
+
+def normalize_name(name: str) -> str:
+    """Key used for name lookups: whitespace-collapsed and case-folded"""
+    return " ".join(name.split()).casefold()
+
+
+class EntityRegistry(Generic[T]):
+    """Ordered collection of entities with id and name indexes.
+
+    Behaves like the plain list ``Project`` used to hold (iteration, len,
+    indexing, append/remove) while keeping id -> entity and
+    normalized name -> id lookups O(1). Insertion order is preserved, so
+    ``ProjectService.get_characters()`` ordering is unchanged.
+
+    Entities are expected to have ``id`` and ``name`` attributes. After
+    renaming an entity in place, call ``reindex`` (``ProjectService`` does
+    this in its update methods). ``version`` increases whenever the set of
+    indexed names changes, so dependent indexes know when to resync.
+    """
+
+    version = 0
+
+    def __init__(self, entities: Iterable[T] = ()):
+        self._by_id: Dict[str, T] = {}
+        self._name_of: Dict[str, str] = {}
+        self._ids_by_name: Dict[str, Dict[str, None]] = {}
+        self._items: Optional[List[T]] = None
+        for entity in entities:
+            self.append(entity)
+
+    # Sequence protocol
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._by_id.values())
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __bool__(self) -> bool:
+        return bool(self._by_id)
+
+    def __getitem__(self, index):
+        return self._list()[index]
+
+    def __contains__(self, entity) -> bool:
+        return self._by_id.get(getattr(entity, "id", None)) is entity
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (EntityRegistry, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"EntityRegistry({list(self)!r})"
+
+    def index(self, entity: T) -> int:
+        return self._list().index(entity)
+
+    # Mutation
+
+    def append(self, entity: T) -> None:
+        """Add an entity; an entity with the same id is replaced in place"""
+        if entity.id in self._by_id:
+            self.replace(entity)
+            return
+        self._by_id[entity.id] = entity
+        self._index_name(entity)
+        self._items = None
+
+    def insert(self, index: int, entity: T) -> None:
+        """Add an entity at a position (O(n), unlike append); an entity with the same id is replaced in place"""
+        if entity.id in self._by_id:
+            self.replace(entity)
+            return
+        entities = list(self._by_id.values())
+        entities.insert(index, entity)
+        self._by_id = {e.id: e for e in entities}
+        self._index_name(entity)
+        self._items = None
+
+    def extend(self, entities: Iterable[T]) -> None:
+        for entity in entities:
+            self.append(entity)
+
+    def replace(self, entity: T) -> bool:
+        """Swap in ``entity`` for the one with the same id, keeping its position"""
+        if entity.id not in self._by_id:
+            return False
+        self._by_id[entity.id] = entity
+        self._items = None
+        self.reindex(entity)
+        return True
+
+    def remove(self, entity: T) -> None:
+        if entity not in self:
+            raise ValueError("entity not in registry")
+        self.discard(entity.id)
+
+    def discard(self, entity_id: str) -> Optional[T]:
+        """Remove and return the entity with ``entity_id`` if present"""
+        entity = self._by_id.pop(entity_id, None)
+        if entity is None:
+            return None
+        self._unindex_name(entity_id)
+        self._items = None
+        return entity
+
+    def clear(self) -> None:
+        self.version += 1
+        self._by_id.clear()
+        self._name_of.clear()
+        self._ids_by_name.clear()
+        self._items = None
+
+    def reindex(self, entity: T) -> None:
+        """Refresh the name index after ``entity`` was renamed in place"""
+        if self._name_of.get(entity.id) != normalize_name(entity.name):
+            self._unindex_name(entity.id)
+            self._index_name(entity)
+
+    # Lookups
+
+    def get(self, entity_id: str) -> Optional[T]:
+        return self._by_id.get(entity_id)
+
+    def find_by_name(self, name: str) -> Optional[T]:
+        """Entity whose normalized name matches ``name``, if any"""
+        ids = self._ids_by_name.get(normalize_name(name))
+        return self._by_id[next(iter(ids))] if ids else None
+
+    def has_name(self, name: str) -> bool:
+        return normalize_name(name) in self._ids_by_name
+
+    # Internals
+
+    def _list(self) -> List[T]:
+        if self._items is None:
+            self._items = list(self._by_id.values())
+        return self._items
+
+    def _index_name(self, entity: T) -> None:
+        key = normalize_name(entity.name)
+        self.version += 1
+        self._name_of[entity.id] = key
+        self._ids_by_name.setdefault(key, {})[entity.id] = None
+
+    def _unindex_name(self, entity_id: str) -> None:
+        key = self._name_of.pop(entity_id, None)
+        self.version += 1
+        ids = self._ids_by_name.get(key)
+        if ids is not None:
+            ids.pop(entity_id, None)
+            if not ids:
+                del self._ids_by_name[key]
@@ -1,7 +1,10 @@
 from dataclasses import dataclass, field
 from uuid import uuid4
 from datetime import datetime
+from .registry import intern_id
+from .slots import slotted
 
+@slotted
 @dataclass
 class Relationship:
     id: str = field(default_factory=lambda: str(uuid4()))
@@ -9,5 +12,12 @@ class Relationship:
     target_id: str = ""
     type: str = ""  # character_location, character_character, etc
     description: str = ""
+    weight: float = 1.0  # e.g. number of shared paragraphs for detected relationships
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
+
+    def __post_init__(self):
+        # Endpoints repeat across relationships; share one string per entity id
+        self.id = intern_id(self.id)
+        self.source_id = intern_id(self.source_id)
+        self.target_id = intern_id(self.target_id)
@@ -2,15 +2,28 @@ from dataclasses import dataclass, field
 from typing import List, Optional
 from uuid import uuid4
 from datetime import datetime
+from .registry import intern_id
+from .slots import slotted
+from .tracking import DirtyTracked
+from ..storage.lazy_content import lazy_text_fields
 
+@lazy_text_fields('content')
+@slotted
 @dataclass
-class Scene:
+class Scene(DirtyTracked):
     id: str = field(default_factory=lambda: str(uuid4()))
     title: str = ""
     summary: str = ""
-    content: str = ""
+    content: str = ""  # Possibly loaded on demand
     character_ids: List[str] = field(default_factory=list)
     location_id: Optional[str] = None
     order_index: int = 0
     created_at: datetime = field(default_factory=datetime.now)
-    updated_at: datetime = field(default_factory=datetime.now)
\ No newline at end of file
+    updated_at: datetime = field(default_factory=datetime.now)
+    _lazy_sources: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _rope: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)  # see storage.rope
+
+    def __post_init__(self):
+        self.id = intern_id(self.id)
+        self.character_ids = [intern_id(i) for i in self.character_ids]
+        self.location_id = intern_id(self.location_id)
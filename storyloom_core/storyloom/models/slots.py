@@ -0,0 +1,32 @@
+"""
+__slots__ for dataclasses on every supported Python version
+"""
+
+import dataclasses
+
+
+def slotted(cls):
+    """Class decorator (applied above ``@dataclass``) giving the class ``__slots__``
+
+    Equivalent to ``@dataclass(slots=True)``, which needs Python 3.10: the
+    class is recreated with one slot per field and no instance ``__dict__``.
+    Slots already declared by a base class (e.g. ``DirtyTracked._dirty``)
+    are not repeated.
+    """
+    names = tuple(f.name for f in dataclasses.fields(cls))
+    inherited = set()
+    for base in cls.__mro__[1:-1]:
+        slots = base.__dict__.get('__slots__', ())
+        inherited.update((slots,) if isinstance(slots, str) else slots)
+
+    namespace = dict(cls.__dict__)
+    namespace['__slots__'] = tuple(name for name in names if name not in inherited)
+    # Field defaults live in the generated __init__; as class attributes they would clash with the slots
+    for name in names:
+        namespace.pop(name, None)
+    namespace.pop('__dict__', None)
+    namespace.pop('__weakref__', None)
+
+    new_cls = type(cls)(cls.__name__, cls.__bases__, namespace)
+    new_cls.__qualname__ = cls.__qualname__
+    return new_cls
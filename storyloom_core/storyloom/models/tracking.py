@@ -0,0 +1,47 @@
+from ..storage.lazy_content import LazyText
+
+_MISSING = object()
+
+
+def _current(obj, name):
+    """Present value of an attribute without loading lazy fields or class defaults"""
+    attr = getattr(type(obj), name, None)
+    if isinstance(attr, LazyText):
+        return attr.peek(obj)
+    try:
+        return obj.__dict__.get(name, _MISSING)
+    except AttributeError:
+        # __slots__ class
+        return getattr(obj, name, _MISSING)
+
+
+class DirtyTracked:
+    """Mixin that flags an object as modified when a public attribute changes.
+
+    Assigning an equal value does not mark the object dirty, and attributes
+    starting with an underscore are ignored. In-place mutation of a list
+    attribute (e.g. ``goals.append``) is not seen; assign a new list instead.
+    Works for both regular and ``__slots__`` dataclasses.
+    """
+
+    __slots__ = ('_dirty',)
+
+    def __setattr__(self, name, value):
+        # Already-dirty objects (including ones still in __init__) skip the comparison
+        if not name.startswith('_') and not getattr(self, '_dirty', True):
+            old = _current(self, name)
+            if old is not value and old != value:
+                object.__setattr__(self, '_dirty', True)
+        super().__setattr__(name, value)
+
+    @property
+    def dirty(self) -> bool:
+        """True if the object changed since it was last saved or loaded"""
+        return getattr(self, '_dirty', True)
+
+    def mark_clean(self) -> None:
+        object.__setattr__(self, '_dirty', False)
+
+    def mark_dirty(self) -> None:
+        """Flag a change made without assigning an attribute (e.g. a rope edit)"""
+        object.__setattr__(self, '_dirty', True)
@@ -0,0 +1,126 @@
+"""
+Analysis Scheduler - debounced background text analysis for the editors
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+from ..models.character import Character
+
+
+@dataclass
+class TextAnalysis:
+    """Result of analysing one revision of the manuscript"""
+    revision: int = 0
+    word_count: int = 0
+    char_count: int = 0
+    new_characters: List[Character] = field(default_factory=list)
+
+
+class AnalysisScheduler:
+    """Coalesces rapid edits and runs text analysis off the UI thread.
+
+    ``submit`` is cheap and safe to call on every key event; the latest text
+    is analysed once no edit has arrived for ``debounce`` seconds. Results
+    are handed to ``on_result`` from the worker thread, so UIs must post them
+    onto their own event loop before touching widgets.
+
+    Without ``start()`` nothing runs in the background and ``poll()`` drives
+    the scheduler, which together with a fake ``clock`` keeps it testable.
+    """
+
+    def __init__(
+        self,
+        analyze: Callable[[str], TextAnalysis],
+        on_result: Callable[[TextAnalysis], None],
+        debounce: float = 0.3,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.analyze = analyze
+        self.on_result = on_result
+        self.debounce = debounce
+        self.clock = clock
+
+        self._cond = threading.Condition()
+        self._pending: Optional[str] = None
+        self._deadline: Optional[float] = None
+        self._revision = 0
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    @property
+    def revision(self) -> int:
+        """Revision number of the most recently submitted text"""
+        return self._revision
+
+    def submit(self, text: str) -> int:
+        """Queue ``text`` for analysis, replacing any pending text"""
+        with self._cond:
+            self._revision += 1
+            self._pending = text
+            self._deadline = self.clock() + self.debounce
+            self._cond.notify()
+            return self._revision
+
+    def pending(self) -> bool:
+        """True if an analysis is waiting for its debounce window"""
+        with self._cond:
+            return self._pending is not None
+
+    def flush(self) -> Optional[TextAnalysis]:
+        """Analyse the pending text now, ignoring the debounce window"""
+        with self._cond:
+            if self._deadline is not None:
+                self._deadline = self.clock()
+        return self.poll()
+
+    def poll(self) -> Optional[TextAnalysis]:
+        """Run the pending analysis if its debounce window has elapsed"""
+        with self._cond:
+            if self._pending is None or self.clock() < self._deadline:
+                return None
+            text, revision = self._pending, self._revision
+            self._pending = None
+            self._deadline = None
+
+        result = self.analyze(text)
+        result.revision = revision
+        self.on_result(result)
+        return result
+
+    def start(self) -> None:
+        """Start the background worker thread"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="storyloom-analysis", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the worker thread, dropping any pending analysis"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running:
+                    if self._pending is not None:
+                        remaining = self._deadline - self.clock()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if not self._running:
+                    return
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error analysing text: {e}")
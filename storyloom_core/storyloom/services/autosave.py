@@ -0,0 +1,375 @@
+"""
+Autosave - an append-only journal of edits kept next to the project file
+
+Edits are recorded as small ops the moment they happen: a content patch
+(replace content[at:end] with text), an entity put (its full record) or
+removal, and header changes. A background thread appends the queued ops
+as JSON lines in batches with one fsync per batch, so the cost of an edit
+depends on the size of the edit, not on the size of the project.
+
+The first line of a journal names its base: the project file as last
+saved, or a full snapshot the journal was compacted into once it grew
+past ``compact_bytes``. After an unclean shutdown ``recover_project``
+reads the base and replays the ops; a base that no longer matches its
+file (the project was saved without this journal since) makes the
+journal stale and it is ignored. Saving the project or closing autosave
+cleanly removes the journal.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, List, Optional, Tuple, Union
+from ..models.project import Project
+from ..storage.atomic import atomic_open
+from ..storage.json_stream import write_json_stream
+from ..storage.lazy_content import DEFAULT_MEMORY_BUDGET
+from ..storage.rope import edit_content
+
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_VERSION = 1
+# Journal bytes after which it is compacted into a full snapshot
+COMPACT_BYTES = 4 * 1024 * 1024
+# Seconds between batched writes
+FLUSH_INTERVAL = 1.0
+
+
+def journal_path(project_path: Union[str, Path]) -> Path:
+    """Journal file of the project at project_path"""
+    path = Path(project_path)
+    return path.with_name(path.name + JOURNAL_SUFFIX)
+
+
+def _snapshot_path(project_path: Union[str, Path], generation: int) -> Path:
+    path = Path(project_path)
+    return path.with_name(f".{path.name}.autosave-{generation}.story")
+
+
+def _remove_snapshots(project_path: Union[str, Path], keep: Optional[Path] = None) -> None:
+    path = Path(project_path)
+    for snapshot in path.parent.glob(f".{path.name}.autosave-*.story"):
+        if snapshot != keep:
+            snapshot.unlink()
+
+
+def _signature(path: Union[str, Path]) -> List[int]:
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _encode(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+def read_journal(path: Union[str, Path]) -> Optional[Tuple[dict, List[dict]]]:
+    """(base, ops) of a journal file, or None if there is none
+
+    A torn last line (the process died mid-write) is ignored.
+    """
+    try:
+        with open(path, 'rb') as f:
+            base = json.loads(f.readline())
+            if base.get('journal') != JOURNAL_VERSION:
+                return None
+            ops = []
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                ops.append(json.loads(line))
+    except (OSError, ValueError):
+        return None
+    return base, ops
+
+
+def _base_source(base: dict, project_path: Union[str, Path]) -> Optional[Path]:
+    """File the journal's ops apply to, if it still holds the state they were recorded against"""
+    source = Path(project_path) if base.get('base') is None else Path(project_path).with_name(base['base'])
+    try:
+        return source if _signature(source) == base.get('signature') else None
+    except OSError:
+        return None
+
+
+def recover_project(service, file_path: str, lazy: bool = False,
+                    memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Optional[Project]:
+    """Rebuild a project from its journal, or None if it has no usable one"""
+    journal = read_journal(journal_path(file_path))
+    if journal is None:
+        return None
+    base, ops = journal
+    source = _base_source(base, file_path)
+    if source is None:
+        return None
+
+    from_file = base.get('base') is None
+    project = service._read_project(str(source), lazy=lazy and from_file, memory_budget=memory_budget)
+    if project.id != base.get('project'):
+        return None
+    project.file_path = file_path
+    if from_file:
+        # A snapshot differs from the saved file, so only a file base starts clean
+        project.mark_clean()
+    apply_ops(service, project, ops)
+    return project
+
+
+def apply_ops(service, project: Project, ops: List[dict]) -> None:
+    """Replay journal ops onto project"""
+    readers = {
+        'characters': service._deserialize_character,
+        'locations': service._deserialize_location,
+        'scenes': service._deserialize_scene,
+    }
+    for op in ops:
+        kind = op['op']
+        if kind == 'content':
+            edit_content(project, op['at'], op['end'], op['text'])
+        elif kind == 'header':
+            project.title = op['title']
+            project.description = op['description']
+        elif kind == 'put':
+            entity = readers[op['section']](op['entity'])
+            if op['section'] != 'scenes':
+                registry = getattr(project, op['section'])
+                if 'index' in op:
+                    registry.insert(op['index'], entity)
+                else:
+                    registry.append(entity)
+            elif any(s.id == entity.id for s in project.scenes):
+                project.scenes = [entity if s.id == entity.id else s for s in project.scenes]
+            else:
+                project.scenes = project.scenes + [entity]
+        elif kind == 'remove':
+            if op['section'] == 'scenes':
+                project.scenes = [s for s in project.scenes if s.id != op['id']]
+            else:
+                getattr(project, op['section']).discard(op['id'])
+        if kind != 'header':
+            project.updated_at = datetime.fromisoformat(op['time'])
+
+
+class Autosave:
+    """Journals the edits of one project at a time on a background thread
+
+    ``ProjectService`` records ops through ``edit``, ``put`` and
+    ``remove`` right after making each change, and moves the journal along
+    in ``start`` (another project became current) and ``saved`` (the file
+    now holds every recorded op). Only projects with a file path are
+    journaled. ``flush`` blocks until the ops recorded so far are on disk.
+    """
+
+    def __init__(self, service, interval: float = FLUSH_INTERVAL, compact_bytes: int = COMPACT_BYTES):
+        self.service = service
+        self.interval = interval
+        self.compact_bytes = compact_bytes
+        self.project: Optional[Project] = None
+        self._header: Optional[Tuple[str, str]] = None
+        self._generation = 0
+        self._size = 0             # bytes in the journal once pending ops are written
+        self._pending: List[tuple] = []
+        self._queued = 0           # items ever queued / written, for flush
+        self._written = 0
+        self._urgent = False
+        self._cond = threading.Condition()
+        self._file = None          # open journal, used by the writer thread only
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    # Recording (caller's thread)
+
+    def start(self, project: Project) -> None:
+        """Journal project from now on, continuing a journal its state was recovered from"""
+        if project is self.project:
+            return
+        if self.project is not None:
+            # A project left with unsaved changes keeps its journal for recovery
+            remove = not self.project.dirty and self.project.file_path != project.file_path
+            self._enqueue(('close', self.project.file_path, remove))
+        self.project = None
+        if not project.file_path or not os.path.exists(project.file_path):
+            return
+        self.project = project
+        self._header = (project.title, project.description)
+
+        journal = read_journal(journal_path(project.file_path))
+        if journal is not None and _base_source(journal[0], project.file_path) is not None \
+                and journal[0].get('project') == project.id:
+            self._generation = journal[0].get('generation', 0)
+            self._size = os.path.getsize(journal_path(project.file_path))
+            self._enqueue(('open', project.file_path, None))
+        else:
+            self._reset(project)
+
+    def saved(self, project: Project) -> None:
+        """The project file was just written, so the journal restarts from it"""
+        if project is self.project:
+            self._reset(project)
+        elif project is self.service.current_project:
+            self.start(project)
+
+    def edit(self, project: Project, start: int, end: int, text: str) -> None:
+        """Record that project's content[start:end] was just replaced by text"""
+        if project is self.project:
+            self._record(op='content', at=start, end=end, text=text)
+
+    def put(self, project: Project, section: str, entity: Any, index: Optional[int] = None) -> None:
+        """Record that an entity of section ('characters', 'locations' or 'scenes') was added or changed
+
+        index is given when a new entity was inserted rather than appended.
+        """
+        if project is self.project:
+            serialize = getattr(self.service, '_serialize_' + section[:-1])
+            if index is None:
+                self._record(op='put', section=section, entity=serialize(entity))
+            else:
+                self._record(op='put', section=section, entity=serialize(entity), index=index)
+
+    def remove(self, project: Project, section: str, entity_id: str) -> None:
+        """Record that an entity of section was removed"""
+        if project is self.project:
+            self._record(op='remove', section=section, id=entity_id)
+
+    def flush(self) -> None:
+        """Block until everything recorded so far is written"""
+        with self._cond:
+            target = self._queued
+            self._urgent = True
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._written >= target)
+
+    def close(self) -> None:
+        """Write what is pending, remove the journal and stop the writer thread"""
+        if self.project is not None:
+            self._enqueue(('close', self.project.file_path, True))
+            self.project = None
+        self._enqueue(('stop',))
+        self.flush()
+        self._thread.join()
+
+    # Internals
+
+    def _record(self, **op) -> None:
+        project = self.project
+        header = (project.title, project.description)
+        if header != self._header:
+            self._header = header
+            self._enqueue(('line', _encode({'op': 'header', 'title': header[0], 'description': header[1]})))
+        op['time'] = datetime.now().isoformat()
+        line = _encode(op)
+        self._enqueue(('line', line))
+        self._size += len(line)
+        if self._size > self.compact_bytes:
+            self._compact(project)
+
+    def _compact(self, project: Project) -> None:
+        """Queue a snapshot of the project as it is now; later ops go to a journal based on it"""
+        # Only references are taken here; the writer thread does the encoding
+        view = SimpleNamespace(
+            id=project.id, title=project.title, description=project.description,
+            content=project.content, created_at=project.created_at, updated_at=project.updated_at,
+            characters=list(project.characters), locations=list(project.locations),
+            scenes=list(project.scenes), relationships=list(project.relationships), _analysis=None,
+        )
+        self._generation += 1
+        self._size = 0
+        self._enqueue(('snapshot', project.file_path, view, self._generation))
+
+    def _reset(self, project: Project) -> None:
+        self._generation = 0
+        self._size = 0
+        self._header = (project.title, project.description)
+        base = {'journal': JOURNAL_VERSION, 'project': project.id, 'base': None,
+                'signature': _signature(project.file_path), 'generation': 0}
+        self._enqueue(('base', project.file_path, base))
+
+    def _enqueue(self, item: tuple) -> None:
+        with self._cond:
+            self._pending.append(item)
+            self._queued += 1
+            if item[0] != 'line':
+                self._urgent = True
+                self._cond.notify_all()
+
+    # Writer thread
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            with self._cond:
+                self._cond.wait_for(lambda: self._urgent, timeout=self.interval)
+                items, self._pending = self._pending, []
+                self._urgent = False
+
+            lines = []
+            for item in items:
+                if item[0] == 'line':
+                    lines.append(item[1])
+                    continue
+                self._write(lines)
+                lines = []
+                if item[0] == 'stop':
+                    running = False
+                else:
+                    try:
+                        getattr(self, '_' + item[0])(*item[1:])
+                    except Exception as e:
+                        print(f"Error updating autosave journal: {e}")
+            self._write(lines)
+
+            with self._cond:
+                self._written += len(items)
+                self._cond.notify_all()
+
+    def _write(self, lines: List[bytes]) -> None:
+        if not lines or self._file is None:
+            return
+        try:
+            self._file.write(b"".join(lines))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except Exception as e:
+            print(f"Error writing autosave journal: {e}")
+
+    def _open(self, project_path: str, base: Optional[dict]) -> None:
+        """Append to the project's journal, starting it afresh from base if given"""
+        self._close_file()
+        path = journal_path(project_path)
+        if base is not None:
+            with atomic_open(path, 'wb') as f:
+                f.write(_encode(base))
+        else:
+            # Drop a torn last line so new ops start on a line of their own
+            with open(path, 'r+b') as f:
+                data = f.read()
+                f.truncate(data.rfind(b"\n") + 1)
+        self._file = open(path, 'ab')
+
+    def _base(self, project_path: str, base: dict) -> None:
+        self._open(project_path, base)
+        _remove_snapshots(project_path)
+
+    def _snapshot(self, project_path: str, view: SimpleNamespace, generation: int) -> None:
+        snapshot = _snapshot_path(project_path, generation)
+        with atomic_open(snapshot, 'wb') as f:
+            write_json_stream(f, self.service._serialize_members(view))
+        base = {'journal': JOURNAL_VERSION, 'project': view.id, 'base': snapshot.name,
+                'signature': _signature(snapshot), 'generation': generation}
+        self._open(project_path, base)
+        _remove_snapshots(project_path, keep=snapshot)
+
+    def _close(self, project_path: str, remove: bool) -> None:
+        self._close_file()
+        if remove:
+            try:
+                journal_path(project_path).unlink()
+            except FileNotFoundError:
+                pass
+            _remove_snapshots(project_path)
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
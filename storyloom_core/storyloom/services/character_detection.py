@@ -0,0 +1,235 @@
+"""
+Character name detection - shared candidate extraction and an incremental
+paragraph-level detector used by the editors while typing.
+"""
+
+import re
+from bisect import bisect_right
+from collections import Counter
+from typing import Iterable, List, Optional, Set, Tuple
+
+# Capitalized words (potential names), optionally joined by whitespace
+NAME_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+
+# Whitespace runs that contain a line break - candidate paragraph splits
+_BREAK_PATTERN = re.compile(r'\s*\n\s*')
+
+_HEAD_WORD = re.compile(r'[A-Z][a-z]+\b')
+
+COMMON_WORDS = frozenset({
+    'The', 'And', 'But', 'That', 'This', 'From', 'With', 'Not',
+    'What', 'When', 'Where', 'Why', 'How', 'Which', 'Who', 'About',
+    'After', 'Before', 'During', 'Without', 'Within', 'Through',
+    'Between', 'Into', 'Over', 'Under', 'Above', 'Below'
+})
+
+
+def is_name(candidate: str) -> bool:
+    """Return True if a regex candidate should be treated as a name"""
+    return candidate not in COMMON_WORDS and len(candidate) > 2
+
+
+def filter_names(candidates: Iterable[str]) -> Set[str]:
+    """Filter common words and short tokens out of raw candidates"""
+    return {n for n in candidates if is_name(n)}
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def is_paragraph_boundary(text: str, pos: int) -> bool:
+    """Return True if ``pos`` splits ``text`` into independently scannable parts.
+
+    A boundary sits right after a whitespace run containing a line break and
+    before a non-whitespace character, and no ``NAME_PATTERN`` match may span
+    it (e.g. "Alice\\n\\nBob" is a single candidate in the full scan).
+    """
+    if pos <= 0 or pos >= len(text) or text[pos].isspace() or not text[pos - 1].isspace():
+        return False
+
+    # Walk back over the whitespace run and make sure it holds a line break
+    ws_start = pos
+    has_break = False
+    while ws_start > 0 and text[ws_start - 1].isspace():
+        ws_start -= 1
+        if text[ws_start] == '\n':
+            has_break = True
+    if not has_break:
+        return False
+
+    # A match can only cross if the next paragraph opens with a capitalized
+    # word and the previous one closes with one
+    if not _HEAD_WORD.match(text, pos):
+        return True
+
+    i = ws_start
+    while i > 0 and 'a' <= text[i - 1] <= 'z':
+        i -= 1
+    if i == ws_start or i == 0 or not 'A' <= text[i - 1] <= 'Z':
+        return True
+    i -= 1
+    return i > 0 and _is_word_char(text[i - 1])
+
+
+def paragraph_boundaries(text: str, start: int = 0, end: Optional[int] = None) -> List[int]:
+    """List the paragraph boundaries of ``text`` strictly inside (start, end)"""
+    end = len(text) if end is None else end
+    bounds = []
+    for m in _BREAK_PATTERN.finditer(text, start, end):
+        pos = m.end()
+        if start < pos < end and is_paragraph_boundary(text, pos):
+            bounds.append(pos)
+    return bounds
+
+
+def count_candidates(text: str, start: int = 0, end: Optional[int] = None) -> Counter:
+    """Count raw ``NAME_PATTERN`` candidates in text[start:end]"""
+    if end is None:
+        end = len(text)
+    return Counter(NAME_PATTERN.findall(text[start:end]))
+
+
+def chunk_ranges(text: str, parts: int) -> List[Tuple[int, int]]:
+    """Split text into about ``parts`` (start, end) ranges at paragraph boundaries
+
+    No ``NAME_PATTERN`` match crosses a paragraph boundary, so scanning the
+    ranges separately finds exactly the candidates of a full scan. Text
+    without a usable boundary near a split point stays in one range.
+    """
+    ranges, start = [], 0
+    for i in range(1, parts):
+        target = max(len(text) * i // parts, start + 1)
+        split = None
+        for m in _BREAK_PATTERN.finditer(text, target):
+            if is_paragraph_boundary(text, m.end()):
+                split = m.end()
+                break
+        if split is None:
+            break
+        if split > start:
+            ranges.append((start, split))
+            start = split
+    ranges.append((start, len(text)))
+    return ranges
+
+
+def _count_chunk(chunk: str) -> Counter:
+    return Counter(NAME_PATTERN.findall(chunk))
+
+
+def count_candidates_parallel(text: str, executor, parts: int) -> Counter:
+    """``count_candidates`` over the whole text, split into ``parts`` chunks scanned by ``executor``
+
+    Chunks end at paragraph boundaries, so the merged counts equal the
+    serial scan's. ``executor`` should be a ProcessPoolExecutor: the regex
+    holds the GIL, so threads would not scan in parallel.
+    """
+    totals = Counter()
+    for counts in executor.map(_count_chunk, [text[a:b] for a, b in chunk_ranges(text, parts)]):
+        totals.update(counts)
+    return totals
+
+
+class IncrementalCharacterDetector:
+    """Keeps per-paragraph name candidate counts for a document.
+
+    Only the paragraphs touched by an edit are re-scanned, so the cost of an
+    update depends on the size of the edit rather than the manuscript.
+    ``ProjectService.detect_characters_in_text`` remains the full-scan
+    reference implementation.
+    """
+
+    def __init__(self, text: str = ""):
+        self.reset(text)
+
+    def reset(self, text: str = "") -> None:
+        """Rescan ``text`` from scratch"""
+        self.text = text
+        self._starts, self._counts = self._scan(text, 0, len(text))
+        self.totals = Counter()
+        for counts in self._counts:
+            self.totals.update(counts)
+
+    @property
+    def paragraph_count(self) -> int:
+        return len(self._counts)
+
+    def names(self) -> Set[str]:
+        """Names currently present in the document"""
+        return {n for n in self.totals if is_name(n)}
+
+    def update(self, new_text: str) -> Set[str]:
+        """Diff ``new_text`` against the previous text and apply the change"""
+        old = self.text
+        if new_text == old:
+            return self.names()
+        start, old_end, new_end = diff_range(old, new_text)
+        return self.apply_edit(start, old_end, new_text[start:new_end])
+
+    def apply_edit(self, start: int, end: int, replacement: str) -> Set[str]:
+        """Replace text[start:end] with ``replacement`` and rescan the touched paragraphs"""
+        old = self.text
+        if not 0 <= start <= end <= len(old):
+            raise ValueError(f"Edit range {start}:{end} outside document of length {len(old)}")
+
+        text = old[:start] + replacement + old[end:]
+        delta = len(replacement) - (end - start)
+        self.text = text
+
+        # Paragraphs touching the edit, plus one neighbour on each side
+        last = len(self._counts) - 1
+        lo = max(bisect_right(self._starts, start) - 1 - 1, 0)
+        hi = min(bisect_right(self._starts, max(end - 1, start)) - 1 + 1, last)
+
+        # Widen until both edges are still real boundaries in the new text
+        while lo > 0 and not is_paragraph_boundary(text, self._starts[lo]):
+            lo -= 1
+        while hi < last and not is_paragraph_boundary(text, self._starts[hi + 1] + delta):
+            hi += 1
+
+        region_start = self._starts[lo]
+        region_end = self._starts[hi + 1] + delta if hi < last else len(text)
+
+        starts, counts = self._scan(text, region_start, region_end)
+        for old_counts in self._counts[lo:hi + 1]:
+            self.totals.subtract(old_counts)
+            # Drop exhausted candidates so the totals don't grow without bound
+            for name in old_counts:
+                if self.totals[name] <= 0:
+                    del self.totals[name]
+        for new_counts in counts:
+            self.totals.update(new_counts)
+
+        tail = [s + delta for s in self._starts[hi + 1:]]
+        self._starts[lo:] = starts + tail
+        self._counts[lo:hi + 1] = counts
+        return self.names()
+
+    @staticmethod
+    def _scan(text: str, start: int, end: int) -> Tuple[List[int], List[Counter]]:
+        starts = [start] + paragraph_boundaries(text, start, end)
+        edges = starts + [end]
+        counts = [count_candidates(text, a, b) for a, b in zip(edges, edges[1:])]
+        return starts, counts
+
+
+def diff_range(old: str, new: str, block: int = 4096) -> Tuple[int, int, int]:
+    """Return (start, old_end, new_end) of the region that differs"""
+    limit = min(len(old), len(new))
+
+    start = 0
+    while start + block <= limit and old[start:start + block] == new[start:start + block]:
+        start += block
+    while start < limit and old[start] == new[start]:
+        start += 1
+
+    limit -= start
+    suffix = 0
+    while suffix + block <= limit and old[len(old) - suffix - block:len(old) - suffix] == \
+            new[len(new) - suffix - block:len(new) - suffix]:
+        suffix += block
+    while suffix < limit and old[len(old) - suffix - 1] == new[len(new) - suffix - 1]:
+        suffix += 1
+
+    return start, len(old) - suffix, len(new) - suffix
@@ -0,0 +1,307 @@
+"""
+Co-occurrence relationships - counts how often characters appear together
+(and at locations) in the story and keeps a StoryGraph of the results.
+"""
+
+import hashlib
+import re
+import uuid
+from bisect import bisect_right
+from collections import Counter, deque
+from itertools import combinations
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, Union
+from ..graph.story_graph import StoryGraph
+from ..models.relationship import Relationship
+from ..storage.lazy_content import is_loaded
+from .mention_index import LOCATION, Mention, MentionIndex
+
+PARAGRAPH = 'paragraph'
+SCENE = 'scene'
+
+# Edge / relationship types
+CHARACTER_CHARACTER = 'character_character'
+CHARACTER_LOCATION = 'character_location'
+
+_PARAGRAPH_BREAK = re.compile(r'\n[ \t\r\f\v]*\n\s*')
+# Start of a whitespace-separated token (lookbehind works across a pos argument)
+_TOKEN_START = re.compile(r'(?<!\S)\S')
+
+# Stable relationship ids, so rebuilding does not churn them
+_RELATIONSHIP_NAMESPACE = uuid.UUID('6f1c52f4-3c1e-4b8a-9d55-0b7e7c1d2a90')
+
+PairCounts = Counter  # (a_id, b_id, type) -> count, with a_id < b_id
+
+# Units are searched for at most this many changed names; beyond that a recount is cheaper
+MAX_NAME_CHECKS = 64
+
+
+def content_digest(text: str) -> str:
+    """Stable hash of a text unit, saved with its counts to detect changes across sessions"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def relationship_id(a_id: str, b_id: str, kind: str) -> str:
+    """Deterministic id of the detected relationship between two entities"""
+    if b_id < a_id:
+        a_id, b_id = b_id, a_id
+    return str(uuid.uuid5(_RELATIONSHIP_NAMESPACE, f"{a_id}|{b_id}|{kind}"))
+
+
+def is_detected(relationship: Relationship) -> bool:
+    """True if the relationship was produced by co-occurrence detection (not added by hand)"""
+    return relationship.id == relationship_id(relationship.source_id, relationship.target_id,
+                                              relationship.type)
+
+
+def _pair(a: Tuple[str, str], b: Tuple[str, str]) -> Optional[Tuple[str, str, str]]:
+    """Canonical (low id, high id, type) for two (entity id, kind) mentions"""
+    (a_id, a_kind), (b_id, b_kind) = a, b
+    if a_id == b_id:
+        return None
+    if a_kind == LOCATION and b_kind == LOCATION:
+        return None
+    kind = CHARACTER_CHARACTER if a_kind == b_kind else CHARACTER_LOCATION
+    return (a_id, b_id, kind) if a_id < b_id else (b_id, a_id, kind)
+
+
+def count_window_pairs(windows: Iterable[Iterable[Tuple[str, str]]]) -> PairCounts:
+    """Count each pair of distinct entities once per window they share"""
+    counts = Counter()
+    for window in windows:
+        present = sorted(set(window))
+        if len(present) > 1:
+            counts.update(p for p in (_pair(a, b) for a, b in combinations(present, 2)) if p)
+    return counts
+
+
+class CooccurrenceBuilder:
+    """Builds weighted co-occurrence edges from text units (project content, scenes).
+
+    ``window`` is ``'paragraph'``, ``'scene'`` (the whole unit) or an int
+    number of tokens for a sliding window. In paragraph and scene mode each
+    pair counts once per window it shares; in token mode each pair of
+    mentions at most ``window`` tokens apart counts once.
+
+    Per-unit counts are kept, so ``update_unit`` applies only the change of
+    one scene to the graph. ``state`` exports them with a content digest per
+    unit and ``restore`` rebuilds the graph from such an export, so a
+    reopened project only rescans the units whose text changed.
+
+    When entities are added, renamed or removed, only the units whose text
+    contains one of the changed names (old or new) are recounted; the rest
+    are checked with a plain substring search.
+    """
+
+    def __init__(self, mention_index: MentionIndex, graph: Optional[StoryGraph] = None,
+                 window: Union[str, int] = PARAGRAPH):
+        if not (window in (PARAGRAPH, SCENE) or (isinstance(window, int) and window > 0)):
+            raise ValueError(f"Unknown co-occurrence window: {window!r}")
+        self.mention_index = mention_index
+        self.graph = graph if graph is not None else StoryGraph()
+        self.window = window
+        # unit key -> [hash(text) or None, content digest or None, counts,
+        #              changed name patterns to look for before trusting the counts, or None]
+        self._units: Dict[Hashable, list] = {}
+        self._index_version = mention_index.version
+        self.recounts = 0
+
+    def count(self, text: str) -> PairCounts:
+        """Pair counts for one text unit"""
+        mentions = self.mention_index.iter_mentions(text)
+        if self.window == SCENE:
+            return count_window_pairs([[(m.entity_id, m.kind) for m in mentions]])
+        if self.window == PARAGRAPH:
+            return count_window_pairs(self._paragraph_windows(text, mentions))
+        return self._sliding_counts(text, mentions)
+
+    def update_unit(self, key: Hashable, text: str) -> bool:
+        """Recount one unit if its text changed; returns True if it was recounted"""
+        self._check_index()
+        previous = self._units.get(key)
+        if previous is not None and self._unchanged(previous, text):
+            return False
+        counts = self.count(text)
+        self.recounts += 1
+        self._apply(previous[2] if previous else None, counts)
+        self._units[key] = [hash(text), content_digest(text), counts, None]
+        return True
+
+    def remove_unit(self, key: Hashable) -> None:
+        previous = self._units.pop(key, None)
+        if previous is not None:
+            self._apply(previous[2], None)
+
+    def build(self, project) -> int:
+        """Bring the graph up to date with the project; returns the number of units recounted
+
+        Lazily loaded bodies that are still on disk are unchanged since they
+        were counted, so they are not fetched.
+        """
+        self._check_index()
+        recounted, keys = 0, set()
+        for key, owner in self._sources(project):
+            keys.add(key)
+            unit = self._units.get(key)
+            if unit is not None and unit[1] is not None and unit[3] is None \
+                    and not is_loaded(owner, 'content'):
+                continue
+            recounted += self.update_unit(key, owner.content)
+        for key in [k for k in self._units if k not in keys]:
+            self.remove_unit(key)
+        return recounted
+
+    def state(self, project) -> Optional[dict]:
+        """Counts of the project's up-to-date units in a JSON-friendly form (see ``restore``)
+
+        Entity ids and pair types are stored once; each unit holds its pairs
+        as a flat list of (id index, id index, type index, count) ints, plus
+        the changed names it still has to be checked for, if any. The
+        indexed names are saved too, so ``restore`` can tell which changed.
+        Returns None if nothing has been counted.
+        """
+        if not self._units:
+            return None
+        ids: Dict[str, int] = {}
+        types = [CHARACTER_CHARACTER, CHARACTER_LOCATION]
+        units = []
+        for (section, ident), owner in self._sources(project):
+            unit = self._units.get((section, ident))
+            if unit is None or unit[1] is None:
+                continue
+            if is_loaded(owner, 'content') and not self._unchanged(unit, owner.content):
+                continue
+            pairs = []
+            for (a, b, kind), n in unit[2].items():
+                pairs += (ids.setdefault(a, len(ids)), ids.setdefault(b, len(ids)), types.index(kind), n)
+            units.append([section, ident, unit[1], pairs] + ([sorted(unit[3])] if unit[3] else []))
+        return {'window': self.window, 'entities': self.mention_index.entries(),
+                'ids': list(ids), 'types': types, 'units': units}
+
+    def restore(self, state: Optional[dict]) -> bool:
+        """Rebuild the graph from a ``state`` export without rescanning any text
+
+        Units are checked for names changed since the export the next time
+        they are built. The export is ignored (returning False) if it was
+        made with another window.
+        """
+        if not state or state.get('window') != self.window:
+            return False
+        entities = state.get('entities')
+        if isinstance(entities, str):
+            # Older exports only saved a signature of the names
+            if entities != self.mention_index.signature():
+                return False
+            changed = frozenset()
+        else:
+            changed = frozenset(self.mention_index.differences(entities))
+        self._check_index()
+        for key in list(self._units):
+            self.remove_unit(key)
+        ids, types = state['ids'], state['types']
+        total = Counter()
+        for section, ident, digest, pairs, *pending in state['units']:
+            it = iter(pairs)
+            counts = Counter({(ids[a], ids[b], types[t]): n for a, b, t, n in zip(it, it, it, it)})
+            pending = changed.union(*pending)
+            self._units[(section, ident)] = [None, digest, counts, pending or None]
+            total.update(counts)
+        self._apply(None, total)
+        return True
+
+    def relationships(self, min_weight: float = 1) -> List[Relationship]:
+        """The graph's co-occurrence edges as Relationships (heaviest first)"""
+        result = []
+        for a_id, b_id, kind, weight in self.graph.edges():
+            if kind not in (CHARACTER_CHARACTER, CHARACTER_LOCATION) or weight < min_weight:
+                continue
+            result.append(Relationship(
+                id=relationship_id(a_id, b_id, kind),
+                source_id=a_id,
+                target_id=b_id,
+                type=kind,
+                description=f"Appear together in {weight:g} {self._window_label()}",
+                weight=weight,
+            ))
+        result.sort(key=lambda r: r.weight, reverse=True)
+        return result
+
+    # Internals
+
+    def _window_label(self) -> str:
+        if isinstance(self.window, int):
+            return f"{self.window}-token windows"
+        return f"{self.window}s"
+
+    @staticmethod
+    def _sources(project):
+        yield ('projects', project.id), project
+        for scene in project.scenes:
+            yield ('scenes', scene.id), scene
+
+    def _unchanged(self, unit: list, text: str) -> bool:
+        # hash() is cached on the str, so unchanged text costs nothing; the
+        # digest is only computed for units restored from a saved state
+        fast = hash(text)
+        if unit[0] != fast:
+            if unit[1] is None or unit[1] != content_digest(text):
+                return False
+            unit[0] = fast
+        # Same text: the counts hold unless a changed name occurs in it
+        if unit[3] is not None:
+            if len(unit[3]) > MAX_NAME_CHECKS or self.mention_index.may_mention(text, unit[3]):
+                return False
+            unit[3] = None
+        return True
+
+    def _check_index(self) -> None:
+        # Added, renamed or removed entities only change the mentions in
+        # units containing one of their names; mark those names for checking
+        version = self.mention_index.version
+        if version == self._index_version:
+            return
+        changed = self.mention_index.changes_since(self._index_version)
+        self._index_version = version
+        for unit in self._units.values():
+            if changed is None:
+                unit[0] = unit[1] = unit[3] = None
+            else:
+                unit[3] = changed if unit[3] is None else unit[3] | changed
+
+    def _apply(self, old: Optional[PairCounts], new: Optional[PairCounts]) -> None:
+        delta = Counter(new) if new else Counter()
+        if old:
+            delta.subtract(old)
+        add_weight = self.graph.add_weight
+        for (a_id, b_id, kind), change in delta.items():
+            if change:
+                add_weight(a_id, b_id, kind, change)
+
+    def _paragraph_windows(self, text: str, mentions: Iterable[Mention]):
+        starts = [0] + [m.end() for m in _PARAGRAPH_BREAK.finditer(text)]
+        current, window = -1, []
+        for m in mentions:
+            paragraph = bisect_right(starts, m.start) - 1
+            if paragraph != current:
+                if window:
+                    yield window
+                current, window = paragraph, []
+            window.append((m.entity_id, m.kind))
+        if window:
+            yield window
+
+    def _sliding_counts(self, text: str, mentions: Iterable[Mention]) -> PairCounts:
+        counts = Counter()
+        recent = deque()  # (token index, (entity id, kind))
+        token, pos = 0, 0
+        for m in mentions:
+            token += len(_TOKEN_START.findall(text, pos, m.start))
+            pos = m.start
+            while recent and token - recent[0][0] > self.window:
+                recent.popleft()
+            entity = (m.entity_id, m.kind)
+            for _, other in recent:
+                pair = _pair(entity, other)
+                if pair:
+                    counts[pair] += 1
+            recent.append((token, entity))
+        return counts
@@ -0,0 +1,259 @@
+"""
+Undo/redo history of project edits
+
+Each step holds the changes of one user action as compact deltas: for
+text, the offset with the removed and inserted strings; for characters
+and locations, snapshots of the entity before and after (shallow copies
+that share every string with the live entity, so a step costs about the
+size of what changed). Consecutive typing or deleting within ``coalesce_seconds`` is
+merged into one step, and the oldest steps are dropped once the history
+holds more than ``memory_limit`` bytes.
+
+``ProjectService`` records into its ``history`` as it makes changes and
+applies the steps in ``undo`` and ``redo``.
+"""
+
+import copy
+import dataclasses
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+# Approximate bytes the history may hold before the oldest steps are dropped
+DEFAULT_MEMORY_LIMIT = 32 * 1024 * 1024
+# Edits closer together than this merge into one step while they are contiguous
+COALESCE_SECONDS = 1.0
+# ... up to this many characters
+COALESCE_MAX = 1024
+
+# Rough bytes of the objects behind one change, besides its strings
+_CHANGE_OVERHEAD = 360
+_ENTITY_OVERHEAD = 200
+
+
+class TextChange(NamedTuple):
+    """content[start:start + len(removed)] was replaced by inserted"""
+    start: int
+    removed: str
+    inserted: str
+
+
+class EntityChange(NamedTuple):
+    """An entity of section went from before to after (None when absent)
+
+    index is its registry position when it was added or removed (None for updates).
+    """
+    section: str
+    entity_id: str
+    before: Any
+    after: Any
+    index: Optional[int]
+
+
+Change = Union[TextChange, EntityChange]
+
+
+class Step:
+    """The changes made by one user action, in order"""
+
+    __slots__ = ('changes', 'size', 'time')
+
+    def __init__(self, changes: List[Change], size: int, when: float):
+        self.changes = changes
+        self.size = size
+        self.time = when
+
+
+def _change_size(change: Change) -> int:
+    if isinstance(change, TextChange):
+        return _CHANGE_OVERHEAD + len(change.removed) + len(change.inserted)
+    # Copies share unchanged strings with each other and the live entity; count the rest
+    before = vars_of(change.before) if change.before is not None else {}
+    after = vars_of(change.after) if change.after is not None else {}
+    size = _CHANGE_OVERHEAD + _ENTITY_OVERHEAD * ((change.before is not None) + (change.after is not None))
+    for name, value in after.items():
+        if isinstance(value, str) and before.get(name) is not value:
+            size += len(value)
+    for name, value in before.items():
+        if isinstance(value, str) and after.get(name) is not value:
+            size += len(value)
+    return size
+
+
+def vars_of(entity) -> Dict[str, Any]:
+    """Public field values of an entity dataclass"""
+    return {f.name: getattr(entity, f.name) for f in dataclasses.fields(entity) if not f.name.startswith('_')}
+
+
+def snapshot(entity):
+    """Shallow copy of an entity with its own copies of list fields (e.g. goals)"""
+    state = copy.copy(entity)
+    for name, value in vars_of(entity).items():
+        if isinstance(value, list):
+            setattr(state, name, list(value))
+    return state
+
+
+def assign(target, state) -> None:
+    """Give target the public field values of state (a snapshot of the same entity)"""
+    for name, value in vars_of(state).items():
+        setattr(target, name, list(value) if isinstance(value, list) else value)
+
+
+def _coalesce(last: TextChange, change: TextChange) -> Optional[TextChange]:
+    """One change equivalent to last followed by change, if they continue each other"""
+    if len(last.removed) + len(last.inserted) + len(change.removed) + len(change.inserted) > COALESCE_MAX:
+        return None
+    if not last.removed and not change.removed and change.start == last.start + len(last.inserted):
+        # Typing
+        return TextChange(last.start, "", last.inserted + change.inserted)
+    if not last.inserted and not change.inserted:
+        if change.start + len(change.removed) == last.start:
+            # Backspace
+            return TextChange(change.start, change.removed + last.removed, "")
+        if change.start == last.start:
+            # Delete
+            return TextChange(last.start, last.removed + change.removed, "")
+    return None
+
+
+class History:
+    """Undo and redo stacks of Steps for one project"""
+
+    def __init__(self, memory_limit: int = DEFAULT_MEMORY_LIMIT, coalesce_seconds: float = COALESCE_SECONDS):
+        self.memory_limit = memory_limit
+        self.coalesce_seconds = coalesce_seconds
+        self._undo: List[Step] = []
+        self._redo: List[Step] = []
+        self._size = 0
+        self._known: Dict[Tuple[str, str], Any] = {}  # (section, id) -> copy as last recorded
+        self._paused = 0
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    @property
+    def size(self) -> int:
+        """Approximate bytes held by both stacks"""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    def reset(self) -> None:
+        """Forget every step (entity states are learnt again as they change)"""
+        self._undo.clear()
+        self._redo.clear()
+        self._size = 0
+        self._known = {}
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """Record nothing inside the block (used while a step is being applied)"""
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+
+    # Recording
+
+    def record_text(self, start: int, removed: str, inserted: str) -> None:
+        """Record that content[start:start + len(removed)] was replaced by inserted"""
+        if self._paused or (not removed and not inserted):
+            return
+        change = TextChange(start, removed, inserted)
+        now = time.monotonic()
+        last = self._undo[-1] if self._undo and not self._redo else None
+        if last is not None and len(last.changes) == 1 and isinstance(last.changes[0], TextChange) \
+                and now - last.time < self.coalesce_seconds:
+            merged = _coalesce(last.changes[0], change)
+            if merged is not None:
+                size = _change_size(merged)
+                self._size += size - last.size
+                last.changes[0], last.size, last.time = merged, size, now
+                self._trim()
+                return
+        self._push([change], now)
+
+    def record_entity(self, section: str, entity: Any, index: Optional[int] = None, added: bool = False,
+                      removed: bool = False, replaced: Any = None) -> None:
+        """Record that entity (of 'characters' or 'locations') was added, updated or removed
+
+        index is the entity's position in its registry when it was added or
+        (before) removed. Its previous state is the one last recorded, else
+        ``replaced`` (the object it took the place of), else - on removal -
+        the entity itself. An update of an entity changed in place that the
+        history has not recorded before only teaches the history its state
+        and is not undoable.
+        """
+        if self._paused:
+            return
+        key = (section, entity.id)
+        before = self._known.pop(key, None)
+        if before is None and removed:
+            before = snapshot(entity)
+        elif before is None and replaced is not None and replaced is not entity:
+            before = snapshot(replaced)
+        after = None if removed else snapshot(entity)
+        if after is not None:
+            self._known[key] = after
+        if before is None and not added:
+            return
+        self._push([EntityChange(section, entity.id, before, after, index)], time.monotonic())
+
+    # Replaying
+
+    def undo(self) -> Optional[Step]:
+        """Move the last step to the redo stack and return it; its changes are to be reverted in reverse order"""
+        if not self._undo:
+            return None
+        step = self._undo.pop()
+        self._redo.append(step)
+        self._track(step, undo=True)
+        return step
+
+    def redo(self) -> Optional[Step]:
+        """Move the last undone step back and return it; its changes are to be applied in order"""
+        if not self._redo:
+            return None
+        step = self._redo.pop()
+        self._undo.append(step)
+        self._track(step, undo=False)
+        return step
+
+    # Internals
+
+    def _push(self, changes: List[Change], now: float) -> None:
+        for step in self._redo:
+            self._size -= step.size
+        self._redo.clear()
+        step = Step(changes, sum(map(_change_size, changes)), now)
+        self._undo.append(step)
+        self._size += step.size
+        self._trim()
+
+    def _trim(self) -> None:
+        """Drop the oldest steps beyond the memory limit (the newest one always stays)"""
+        dropped = 0
+        while self._size > self.memory_limit and len(self._undo) - dropped > 1:
+            self._size -= self._undo[dropped].size
+            dropped += 1
+        if dropped:
+            del self._undo[:dropped]
+
+    def _track(self, step: Step, undo: bool) -> None:
+        """Keep the last known entity states in step with a step being applied"""
+        for change in step.changes:
+            if isinstance(change, EntityChange):
+                state = change.before if undo else change.after
+                key = (change.section, change.entity_id)
+                if state is None:
+                    self._known.pop(key, None)
+                else:
+                    self._known[key] = state
@@ -0,0 +1,331 @@
+"""
+Mention index - finds every mention of known characters and locations in
+one pass over the text with an Aho-Corasick automaton.
+"""
+
+import hashlib
+import re
+from bisect import bisect_right
+from collections import Counter, deque
+from typing import Collection, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+CHARACTER = 'character'
+LOCATION = 'location'
+
+# Name changes remembered for changes_since(); older ones are forgotten
+_MAX_CHANGES = 4096
+
+
+class Mention(NamedTuple):
+    """One occurrence of an entity name: text[start:end]"""
+    start: int
+    end: int
+    entity_id: str
+    kind: str
+
+
+def _pattern_key(name: str) -> str:
+    """Case-folded name with whitespace collapsed to single spaces"""
+    return _fold(" ".join(name.split()))[0]
+
+
+_WHITESPACE = {c: ' ' for c in range(0x80) if chr(c).isspace()}
+_OTHER_SPACE = re.compile(r'[^\S ]')
+_SPACES = re.compile(' +')
+# The only character whose lower() is longer ("İ" -> "i̇"); folded to a plain "i"
+_DOTTED_I = '\u0130'
+
+
+def _fold(text: str) -> Tuple[str, Optional[Tuple[List[int], List[int]]]]:
+    """Lower-case ``text`` and collapse whitespace runs to one space, as names are
+
+    Returns the folded text and, if runs were collapsed, breakpoints
+    (folded offsets, text offsets) for ``_text_offset`` to map offsets back.
+    """
+    if _DOTTED_I in text:
+        text = text.replace(_DOTTED_I, 'i')
+    folded = (text.translate(_WHITESPACE) if text.isascii() else _OTHER_SPACE.sub(' ', text)).lower()
+
+    find = folded.find
+    i = find('  ')
+    if i < 0:
+        return folded, None
+    pieces, folded_at, text_at = [], [0], [0]
+    pos = size = 0
+    while i >= 0:
+        end = _SPACES.match(folded, i).end()
+        pieces.append(folded[pos:i + 1])
+        size += i + 1 - pos
+        folded_at.append(size)
+        text_at.append(end)
+        pos = end
+        i = find('  ', end)
+    pieces.append(folded[pos:])
+    return "".join(pieces), (folded_at, text_at)
+
+
+def _text_offset(breaks: Tuple[List[int], List[int]], offset: int) -> int:
+    """Offset in the original text of a folded-text offset"""
+    folded_at, text_at = breaks
+    k = bisect_right(folded_at, offset) - 1
+    return text_at[k] + (offset - folded_at[k])
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher.
+
+    Patterns can be added and removed at any time; the trie is extended in
+    place and the failure links are recomputed lazily (in time proportional
+    to the total pattern length, never the text) before the next search.
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self._reset()
+        for pattern in patterns:
+            self.add(pattern)
+
+    def _reset(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._depth: List[int] = [0]
+        self._terminal: List[bool] = [False]
+        self._fail: List[int] = [0]
+        self._out: List[int] = [-1]      # nearest terminal state on the failure chain
+        self._nodes: Dict[str, int] = {}  # pattern -> terminal state
+        self._removed = 0
+        self._stale = False
+
+    def __contains__(self, pattern: str) -> bool:
+        return pattern in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def add(self, pattern: str) -> None:
+        if not pattern or pattern in self._nodes:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._depth.append(self._depth[state] + 1)
+                self._terminal.append(False)
+            state = nxt
+        self._terminal[state] = True
+        self._nodes[pattern] = state
+        self._stale = True
+
+    def remove(self, pattern: str) -> None:
+        state = self._nodes.pop(pattern, None)
+        if state is None:
+            return
+        self._terminal[state] = False
+        self._removed += 1
+        self._stale = True
+
+    def _build(self) -> None:
+        if self._removed > max(len(self._nodes), 64):
+            # Mostly dead branches - start over from the live patterns
+            patterns = list(self._nodes)
+            self._reset()
+            for pattern in patterns:
+                self.add(pattern)
+        goto, terminal = self._goto, self._terminal
+        fail = [0] * len(goto)
+        out = [-1] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                f = goto[f].get(ch, 0)
+                fail[nxt] = f if f != nxt else 0
+                out[nxt] = f if terminal[f] else out[f]
+                queue.append(nxt)
+        self._fail, self._out = fail, out
+        self._stale = False
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) of every pattern occurrence, overlaps included"""
+        if self._stale:
+            self._build()
+        goto, fail, out, terminal, depth = self._goto, self._fail, self._out, self._terminal, self._depth
+        root = goto[0]
+        state = 0
+        for i, ch in enumerate(text):
+            if state:
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+            else:
+                state = root.get(ch, 0)
+                if not state:
+                    continue
+            end = i + 1
+            match = state if terminal[state] else out[state]
+            while match > 0:
+                yield end - depth[match], end
+                match = out[match]
+
+
+class MentionIndex:
+    """Finds mentions of the project's characters and locations by name.
+
+    Matching is case-insensitive, treats any whitespace run inside a name as
+    a single space and only accepts whole words. ``sync`` brings the index
+    up to date with a project after entities were added, renamed or removed,
+    touching only the names that changed. ``version`` increases on every
+    change, and ``changes_since`` tells which names changed, so results
+    derived from earlier scans only need redoing where those names occur.
+    """
+
+    version = 0
+
+    def __init__(self):
+        self._automaton = AhoCorasick()
+        self._entities: Dict[str, Tuple[str, str]] = {}     # entity id -> (pattern, kind)
+        self._by_pattern: Dict[str, Dict[str, str]] = {}    # pattern -> {entity id: kind}
+        self._changes: List[str] = []   # pattern added or removed by each version after _changes_base
+        self._changes_base = 0
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def add(self, entity_id: str, name: str, kind: str = CHARACTER) -> None:
+        """Index ``name`` for an entity, replacing any name it had before"""
+        pattern = _pattern_key(name)
+        if self._entities.get(entity_id) == (pattern, kind):
+            return
+        self.remove(entity_id)
+        if not pattern:
+            return
+        self._changed(pattern)
+        self._entities[entity_id] = (pattern, kind)
+        self._by_pattern.setdefault(pattern, {})[entity_id] = kind
+        self._automaton.add(pattern)
+
+    rename = add
+
+    def remove(self, entity_id: str) -> None:
+        entry = self._entities.pop(entity_id, None)
+        if entry is None:
+            return
+        pattern = entry[0]
+        self._changed(pattern)
+        owners = self._by_pattern[pattern]
+        del owners[entity_id]
+        if not owners:
+            del self._by_pattern[pattern]
+            self._automaton.remove(pattern)
+
+    def sync(self, project) -> None:
+        """Match the index to the project's current characters and locations"""
+        current = {c.id: (c.name, CHARACTER) for c in project.characters}
+        current.update((l.id, (l.name, LOCATION)) for l in project.locations)
+        for entity_id in [i for i in self._entities if i not in current]:
+            self.remove(entity_id)
+        for entity_id, (name, kind) in current.items():
+            self.add(entity_id, name, kind)
+
+    def changes_since(self, version: int) -> Optional[FrozenSet[str]]:
+        """Patterns of the names added or removed after ``version`` (None if too long ago)"""
+        if version < self._changes_base:
+            return None
+        return frozenset(self._changes[version - self._changes_base:])
+
+    def entries(self) -> List[List[str]]:
+        """The indexed [entity id, pattern, kind] entries, to save alongside derived results"""
+        return [[entity_id, pattern, kind] for entity_id, (pattern, kind) in self._entities.items()]
+
+    def differences(self, entries: Iterable[List[str]]) -> Set[str]:
+        """Patterns whose entities differ between ``entries()`` output and the index"""
+        saved = {entity_id: (pattern, kind) for entity_id, pattern, kind in entries}
+        changed = set()
+        for entity_id, entry in saved.items():
+            current = self._entities.get(entity_id)
+            if current != entry:
+                changed.add(entry[0])
+                if current is not None:
+                    changed.add(current[0])
+        changed.update(pattern for entity_id, (pattern, _) in self._entities.items() if entity_id not in saved)
+        return changed
+
+    @staticmethod
+    def may_mention(text: str, patterns: Collection[str]) -> bool:
+        """Cheap pre-check: False if no pattern occurs in text at all, whole word or not"""
+        folded = _fold(text)[0]
+        return any(pattern in folded for pattern in patterns)
+
+    def signature(self) -> str:
+        """Digest of the indexed (id, name, kind) entries - equal signatures find equal mentions"""
+        digest = hashlib.blake2b(digest_size=16)
+        for entity_id in sorted(self._entities):
+            pattern, kind = self._entities[entity_id]
+            digest.update(f"{entity_id}\0{pattern}\0{kind}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def iter_mentions(self, text: str, overlapping: bool = False) -> Iterator[Mention]:
+        """Yield mentions in text order
+
+        By default overlapping matches resolve to the leftmost, then longest
+        name ("Mary Jane" rather than "Mary" and "Jane").
+        """
+        folded, breaks = _fold(text)
+        if not overlapping:
+            spans = _leftmost_longest(self._spans(text, folded, breaks))
+        else:
+            spans = sorted(self._spans(text, folded, breaks))
+        by_pattern = self._by_pattern
+        for start, end, pattern in spans:
+            for entity_id, kind in by_pattern[pattern].items():
+                yield Mention(start, end, entity_id, kind)
+
+    def _spans(self, text: str, folded: str, breaks) -> Iterator[Tuple[int, int, str]]:
+        """(start, end, pattern) in text of every whole-word pattern match"""
+        n = len(text)
+        for a, b in self._automaton.iter_matches(folded):
+            if breaks is None:
+                start, end = a, b
+            else:
+                start, end = _text_offset(breaks, a), _text_offset(breaks, b)
+            # Whole words only: reject matches inside a longer word
+            if (start > 0 and _is_word_char(text[start - 1])) or (end < n and _is_word_char(text[end])):
+                continue
+            yield start, end, folded[a:b]
+
+    def _changed(self, pattern: str) -> None:
+        self.version += 1
+        self._changes.append(pattern)
+        if len(self._changes) > _MAX_CHANGES:
+            drop = len(self._changes) // 2
+            del self._changes[:drop]
+            self._changes_base += drop
+
+    def find(self, text: str, overlapping: bool = False) -> List[Mention]:
+        return list(self.iter_mentions(text, overlapping))
+
+    def counts(self, text: str) -> Counter:
+        """Number of mentions per entity id"""
+        return Counter(m.entity_id for m in self.iter_mentions(text))
+
+    def entities_in(self, text: str, kind: Optional[str] = None) -> Set[str]:
+        """Ids of the entities mentioned at least once"""
+        return {m.entity_id for m in self.iter_mentions(text) if kind is None or m.kind == kind}
+
+
+def _leftmost_longest(matches: Iterable[Tuple[int, int, str]]) -> List[Tuple[int, int, str]]:
+    """Resolve overlapping (start, end, pattern) matches, preferring leftmost then longest"""
+    chosen, last_end = [], -1
+    for match in sorted(matches, key=lambda m: (m[0], -m[1])):
+        if match[0] >= last_end:
+            chosen.append(match)
+            last_end = match[1]
+    return chosen
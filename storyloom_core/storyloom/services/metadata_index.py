@@ -0,0 +1,210 @@
+"""
+Sidecar index of project summaries, so listing a projects directory does
+not re-read unchanged project files
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple, Union
+from ..database.db import DATABASE_EXTENSIONS, ProjectDatabase
+from ..storage.binary_format import BINARY_EXTENSIONS, BinaryProjectReader, read_binary_header
+from ..storage.json_stream import Span, StoryFileReader
+
+# File extensions listed as projects
+PROJECT_EXTENSIONS = ('.story',) + BINARY_EXTENSIONS + DATABASE_EXTENSIONS
+
+# Name of the index file kept in the projects directory
+INDEX_FILENAME = ".storyloom-index"
+INDEX_VERSION = 1
+
+_COLUMNS = ("name", "mtime_ns", "size", "id", "title", "word_count", "character_count",
+            "location_count", "scene_count", "created_at", "updated_at")
+
+
+class ProjectSummary(NamedTuple):
+    """What a project listing shows, read without loading the project"""
+    path: str
+    id: str
+    title: str
+    word_count: int
+    character_count: int
+    location_count: int
+    scene_count: int
+    created_at: datetime
+    updated_at: datetime
+
+
+def _timestamp(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value) if value else datetime.fromtimestamp(0)
+
+
+def read_project_summary(path: Union[str, Path]) -> ProjectSummary:
+    """Title, id, counts and timestamps of the project stored at path
+
+    .story files written by this version carry the counts in their header,
+    so only the start of the file is read. Older files are scanned with the
+    bodies left undecoded except the project content, whose words are
+    counted. Binary containers carry the counts in their project header
+    record; databases count their rows.
+    """
+    path = str(path)
+    suffix = Path(path).suffix.lower()
+    if suffix in DATABASE_EXTENSIONS:
+        with ProjectDatabase(path) as db:
+            row = db.conn.execute(
+                "SELECT id, title, content, created_at, updated_at FROM projects ORDER BY rowid LIMIT 1"
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"No project stored in {path}")
+            counts = [db.conn.execute(f"SELECT COUNT(*) FROM {table} WHERE project_id = ?",
+                                      (row[0],)).fetchone()[0]
+                      for table in ("characters", "locations", "scenes")]
+        return ProjectSummary(path, row[0], row[1], len((row[2] or "").split()), *counts,
+                              _timestamp(row[3]), _timestamp(row[4]))
+
+    if suffix in BINARY_EXTENSIONS:
+        reader = read_binary_header(path)
+        if reader.version < 3:
+            # Older containers have no counts in their header
+            reader = BinaryProjectReader.open(path)
+        meta, counts = reader.metadata(), reader.summary_counts()
+        return ProjectSummary(path, meta['id'], meta['title'], counts['words'],
+                              counts['characters'], counts['locations'], counts['scenes'],
+                              meta['created_at'], meta['updated_at'])
+
+    header = {}
+    counts = {'characters': 0, 'locations': 0, 'scenes': 0}
+    with StoryFileReader(path, lazy_keys=('content', 'description')) as reader:
+        for key, value in reader.members(stream_keys=tuple(counts) + ('relationships',)):
+            if key == 'summary':
+                header[key] = value
+                if 'updated_at' in header:
+                    break
+            elif key in counts:
+                counts[key] = sum(1 for _ in value)
+            elif key == 'content':
+                text = reader.text(value) if isinstance(value, Span) else value
+                header['words'] = len(text.split())
+            else:
+                header[key] = value
+    summary = header.get('summary')
+    if summary:
+        words = summary['words']
+        counts = {key: summary[key] for key in counts}
+    else:
+        words = header.get('words', 0)
+    title = header.get('title', 'Untitled Project')
+    return ProjectSummary(path, header['id'], title, words, counts['characters'], counts['locations'],
+                          counts['scenes'], _timestamp(header.get('created_at')),
+                          _timestamp(header.get('updated_at')))
+
+
+class MetadataIndex:
+    """Project summaries of a directory, stored in an SQLite file next to the projects
+
+    Rows are keyed by file name and validated against the file's mtime and
+    size from ``os.scandir``, so a listing only re-reads project files that
+    changed since the last one. The index is a cache: if it can't be read
+    or written, listings still work and just read more files.
+    """
+
+    def __init__(self, directory: Union[str, Path], filename: str = INDEX_FILENAME):
+        self.directory = Path(os.path.abspath(directory))
+        self.path = self.directory / filename
+        self.conn: Optional[sqlite3.Connection] = None
+        self.reads = 0  # project files read by the last refresh
+        self._rows: Optional[Dict[str, Tuple[int, int, ProjectSummary]]] = None
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def refresh(self) -> Dict[str, ProjectSummary]:
+        """Summaries of every readable project file, keyed by path"""
+        stored = dict(self._rows) if self._rows is not None else self._load()
+        found: Dict[str, Tuple[int, int, ProjectSummary]] = {}
+        changed = []
+        self.reads = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if os.path.splitext(entry.name)[1].lower() not in PROJECT_EXTENSIONS or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                row = stored.pop(entry.name, None)
+                if row is None or row[:2] != (stat.st_mtime_ns, stat.st_size):
+                    self.reads += 1
+                    try:
+                        summary = read_project_summary(entry.path)
+                    except Exception as e:
+                        print(f"Error reading project summary {entry.path}: {e}")
+                        continue
+                    row = (stat.st_mtime_ns, stat.st_size, summary)
+                    changed.append((entry.name, row))
+                found[entry.name] = row
+        self._store(changed, stored)
+        self._rows = found
+        return {row[2].path: row[2] for row in found.values()}
+
+    # Internals
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            conn = sqlite3.connect(str(self.path))
+            if conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+                with conn:
+                    conn.execute("DROP TABLE IF EXISTS summaries")
+                    conn.execute(
+                        "CREATE TABLE summaries (name TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, "
+                        "id TEXT, title TEXT, word_count INTEGER, character_count INTEGER, "
+                        "location_count INTEGER, scene_count INTEGER, created_at TEXT, updated_at TEXT)"
+                    )
+                    conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+            self.conn = conn
+        return self.conn
+
+    def _load(self) -> Dict[str, Tuple[int, int, ProjectSummary]]:
+        """Stored rows by file name (empty if the index is missing or unreadable)"""
+        try:
+            rows = self._connect().execute(f"SELECT {', '.join(_COLUMNS)} FROM summaries").fetchall()
+        except sqlite3.Error as e:
+            print(f"Error reading project index {self.path}: {e}")
+            self._discard()
+            return {}
+        directory = str(self.directory)
+        return {
+            name: (mtime, size, ProjectSummary(os.path.join(directory, name), ident, title, words,
+                                               characters, locations, scenes,
+                                               datetime.fromisoformat(created), datetime.fromisoformat(updated)))
+            for name, mtime, size, ident, title, words, characters, locations, scenes, created, updated in rows
+        }
+
+    def _store(self, changed: Iterable[Tuple[str, Tuple[int, int, ProjectSummary]]], removed: Iterable[str]) -> None:
+        rows = [
+            (name, mtime, size, s.id, s.title, s.word_count, s.character_count, s.location_count,
+             s.scene_count, s.created_at.isoformat(), s.updated_at.isoformat())
+            for name, (mtime, size, s) in changed
+        ]
+        removed = [(name,) for name in removed]
+        if not rows and not removed:
+            return
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO summaries ({', '.join(_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(_COLUMNS))})", rows)
+                conn.executemany("DELETE FROM summaries WHERE name = ?", removed)
+        except sqlite3.Error as e:
+            print(f"Error writing project index {self.path}: {e}")
+
+    def _discard(self) -> None:
+        """Replace an unreadable index file with an empty one"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
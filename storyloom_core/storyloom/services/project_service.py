@@ -1,13 +1,51 @@
-import json
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional, List
+from collections import Counter
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
-import re
 from ..models.project import Project
 from ..models.character import Character
 from ..models.scene import Scene
 from ..models.location import Location
+from ..models.relationship import Relationship
+from ..graph.story_graph import StoryGraph
+from ..storage.atomic import atomic_open
+from ..database.db import DATABASE_EXTENSIONS, ProjectDatabase, is_database_file
+from ..storage.binary_format import BINARY_EXTENSIONS, is_binary_project, read_binary_project, write_binary_project
+from ..storage.json_stream import Span, StoryFileReader, write_json_stream
+from ..storage.lazy_content import DEFAULT_MEMORY_BUDGET, JsonContentStore, bind_lazy
+from ..storage.rope import content_rope, edit_content
+from .character_detection import (NAME_PATTERN, IncrementalCharacterDetector, count_candidates_parallel, diff_range,
+                                  filter_names)
+from .analysis_scheduler import TextAnalysis
+from .autosave import COMPACT_BYTES, FLUSH_INTERVAL, Autosave, recover_project
+from .history import History, TextChange, assign, snapshot
+from .mention_index import Mention, MentionIndex
+from .scene_segmenter import DetectedScene, SceneSegmenter
+from .statistics import TextCounts, TextStatistics, WritingSession
+from .cooccurrence import PARAGRAPH, CooccurrenceBuilder, is_detected
+from .search_index import SearchHit, SearchIndex
+
+
+# Below this many characters, detect_characters_in_text scans serially whatever the worker count
+PARALLEL_DETECTION_MIN = 1024 * 1024
+
+
+def project_summary_counts(project: Project) -> dict:
+    """Word and entity counts stored in the header of .story files"""
+    return {
+        'words': len(project.content.split()),
+        'characters': len(project.characters),
+        'locations': len(project.locations),
+        'scenes': len(project.scenes),
+    }
+
+
+def _parse_timestamp(value: Optional[str]) -> datetime:
+    """Parse an ISO timestamp from a project file, defaulting to now"""
+    return datetime.fromisoformat(value) if value else datetime.now()
 
 
 class ProjectService:
@@ -17,28 +55,79 @@ class ProjectService:
         self.projects_dir = Path(projects_dir)
         self.projects_dir.mkdir(exist_ok=True)
         self.current_project: Optional[Project] = None
+        self.character_detector = IncrementalCharacterDetector()
+        # analyze_text runs the detector on a worker while create/open reset it
+        self._detector_lock = threading.Lock()
+        self.mention_index = MentionIndex()
+        self._mention_key = None
+        self.scene_segmenter = SceneSegmenter(self.mention_index)
+        self._segmented = None  # project the scene segmenter follows, once detect_scenes ran
+        self.statistics = TextStatistics()
+        self._counted = None  # project the statistics follow, once counted
+        self._analysis_statistics = TextStatistics()  # of the text last passed to analyze_text
+        self.session = WritingSession()
+        self.story_graph = StoryGraph()
+        self.cooccurrence = CooccurrenceBuilder(self.mention_index, self.story_graph)
+        self.search_index = SearchIndex()
+        self._detection_pool: Optional[ProcessPoolExecutor] = None
+        self._detection_workers = 0
+        self.autosave: Optional[Autosave] = None
+        self.history = History()
+    
+    def enable_autosave(self, interval: float = FLUSH_INTERVAL, compact_bytes: int = COMPACT_BYTES) -> Autosave:
+        """Journal every edit of the current project next to its file (see services.autosave)"""
+        if self.autosave is None:
+            self.autosave = Autosave(self, interval=interval, compact_bytes=compact_bytes)
+            if self.current_project:
+                self.autosave.start(self.current_project)
+        return self.autosave
     
     def create_project(self, title: str = "Untitled Project") -> Project:
         """Create a new project"""
         project = Project(title=title)
-        self.current_project = project
+        self.activate_project(project)
         return project
     
-    def open_project(self, file_path: str) -> Optional[Project]:
-        """Open a project from file"""
+    def open_project(self, file_path: str, lazy: bool = False,
+                     memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Optional[Project]:
+        """Open a project from file (JSON .story, binary .storyb or SQLite database)
+        
+        With lazy set, scene and project bodies stay on disk until first
+        accessed and are evicted again beyond memory_budget characters.
+        Edits an unclean shutdown left in the autosave journal are replayed,
+        so the project comes back with them as unsaved changes.
+        """
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                project = self._deserialize_project(data)
-                project.file_path = file_path
-                self.current_project = project
-                return project
+            project = self._load_project(file_path, lazy=lazy, memory_budget=memory_budget)
+            self._close_content_store()
+            self.activate_project(project)
+            return project
         except Exception as e:
             print(f"Error opening project: {e}")
             return None
     
-    def save_project(self, project: Optional[Project] = None) -> bool:
-        """Save project to file"""
+    def activate_project(self, project: Project) -> None:
+        """Make an already loaded project current
+        
+        The previous project is left as it is (its lazy bodies stay
+        readable), so a Workspace can switch back to it later.
+        """
+        self.current_project = project
+        self.history.reset()
+        if self.autosave:
+            self.autosave.start(project)
+        self._reset_detector()
+        self.search_index = SearchIndex()
+        self.set_cooccurrence_window(self.cooccurrence.window)
+    
+    def save_project(self, project: Optional[Project] = None, force: bool = False, pretty: bool = False) -> bool:
+        """Save project to file
+        
+        Unchanged projects are not rewritten unless force is set. JSON files
+        are replaced atomically, and written compactly unless pretty is set;
+        binary containers (.storyb) are rewritten atomically and database
+        files (.storydb, .db, .sqlite) get an incremental update.
+        """
         proj = project or self.current_project
         if not proj:
             return False
@@ -49,71 +138,378 @@ class ProjectService:
                 filename = f"{proj.title.replace(' ', '_')}.story"
                 proj.file_path = str(self.projects_dir / filename)
             
-            # Create directory if needed
-            Path(proj.file_path).parent.mkdir(parents=True, exist_ok=True)
-            
-            # Serialize and save
-            data = self._serialize_project(proj)
-            with open(proj.file_path, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
+            # Nothing to do if the file already holds this state
+            if not force and not proj.dirty and os.path.exists(proj.file_path):
+                return True
             
+            self._write_project(proj, proj.file_path, pretty=pretty, full=force)
+            proj.mark_clean()
+            if self.autosave:
+                self.autosave.saved(proj)
             return True
         except Exception as e:
             print(f"Error saving project: {e}")
             return False
     
-    def detect_characters_in_text(self, text: str) -> List[Character]:
-        """Auto-detect characters from text content"""
+    def export_project(self, file_path: str, project: Optional[Project] = None, pretty: bool = False) -> bool:
+        """Write a full copy of the project to file_path, in the format its extension implies
+        
+        The project keeps its own file_path, so this converts between the
+        JSON and database formats without switching the project over.
+        """
+        proj = project or self.current_project
+        if not proj:
+            return False
+        
+        try:
+            self._write_project(proj, file_path, pretty=pretty, full=True)
+            return True
+        except Exception as e:
+            print(f"Error exporting project: {e}")
+            return False
+    
+    def _load_project(self, file_path: str, lazy: bool = False,
+                      memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Project:
+        """Read a project for editing, replaying its autosave journal if one was left behind"""
+        project = recover_project(self, file_path, lazy=lazy, memory_budget=memory_budget)
+        if project is None:
+            project = self._read_project(file_path, lazy=lazy, memory_budget=memory_budget)
+            project.file_path = file_path
+            project.mark_clean()
+        return project
+    
+    def _read_project(self, file_path: str, lazy: bool = False,
+                      memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Project:
+        """Load a project in whichever format file_path holds"""
+        if is_database_file(file_path):
+            with ProjectDatabase(file_path) as db:
+                project = db.load_project(lazy=lazy, memory_budget=memory_budget)
+            if project is None:
+                raise ValueError(f"No project stored in {file_path}")
+            return project
+        
+        if is_binary_project(file_path):
+            # Bodies are compressed together, so lazy has no effect here
+            return read_binary_project(file_path)
+        
+        # Stream the file: entities are built one element at a time, and with
+        # lazy set every body stays on disk as a byte span
+        readers = {
+            'characters': self._deserialize_character,
+            'locations': self._deserialize_location,
+            'scenes': self._deserialize_scene,
+            'relationships': self._deserialize_relationship,
+        }
+        header, entities = {}, {key: [] for key in readers}
+        with StoryFileReader(file_path, lazy_keys=('content',) if lazy else ()) as reader:
+            for key, value in reader.members(stream_keys=readers):
+                if key in readers and not isinstance(value, list):
+                    entities[key] = [readers[key](item) for item in value]
+                else:
+                    header[key] = value
+        project = self._deserialize_header(header, **entities)
+        
+        if lazy:
+            store = JsonContentStore(file_path, {}, memory_budget)
+            if isinstance(project.content, Span):
+                store.spans[('projects', project.id)] = project.content
+                bind_lazy(project, 'content', store, ('projects', project.id))
+            for scene in project.scenes:
+                if isinstance(scene.content, Span):
+                    store.spans[('scenes', scene.id)] = scene.content
+                    bind_lazy(scene, 'content', store, ('scenes', scene.id))
+            project._content_store = store
+        return project
+    
+    def _write_project(self, project: Project, file_path: str, pretty: bool = False, full: bool = True) -> None:
+        """Write a project in the format implied by the file extension"""
+        if project is self.current_project:
+            # Saved with the project so reopening only rescans changed scenes
+            project._analysis = self.cooccurrence.state(project)
+        
+        if Path(file_path).suffix.lower() in DATABASE_EXTENSIONS:
+            with ProjectDatabase(file_path) as db:
+                db.save_project(project, full=full)
+            return
+        
+        if Path(file_path).suffix.lower() in BINARY_EXTENSIONS:
+            write_binary_project(project, file_path)
+            return
+        
+        # Entities are encoded one at a time straight into the file
+        with atomic_open(file_path, 'wb') as f:
+            spans = write_json_stream(f, self._serialize_members(project), pretty=pretty,
+                                      root_section='projects')
+        
+        # Lazy bodies read from this file now live at new offsets
+        store = project._content_store
+        if isinstance(store, JsonContentStore) and os.path.samefile(store.path, file_path):
+            store.reindex(spans)
+    
+    def _close_content_store(self) -> None:
+        """Release the lazy content store of the current project, if any"""
+        if self.current_project and self.current_project._content_store:
+            self.current_project._content_store.close()
+    
+    def detect_characters_in_text(self, text: str, workers: int = 1) -> List[Character]:
+        """Auto-detect characters from text content
+        
+        With workers > 1, texts over PARALLEL_DETECTION_MIN characters are
+        split at paragraph boundaries and scanned by a process pool; the
+        result is the same as the serial scan.
+        """
+        if workers > 1 and len(text) >= PARALLEL_DETECTION_MIN:
+            candidates = count_candidates_parallel(text, self._process_pool(workers), workers * 4)
+            return self._new_characters(filter_names(candidates))
+        
         # Find capitalized words (potential names)
-        potential_names = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
+        potential_names = NAME_PATTERN.findall(text)
         
         # Filter common words and duplicates
-        common_words = {
-            'The', 'And', 'But', 'That', 'This', 'From', 'With', 'Not',
-            'What', 'When', 'Where', 'Why', 'How', 'Which', 'Who', 'About',
-            'After', 'Before', 'During', 'Without', 'Within', 'Through',
-            'Between', 'Into', 'Over', 'Under', 'Above', 'Below'
-        }
+        names = filter_names(potential_names)
+        
+        return self._new_characters(names)
+    
+    def _process_pool(self, workers: int) -> ProcessPoolExecutor:
+        """A process pool of the given size, kept for later calls"""
+        if self._detection_pool is None or self._detection_workers != workers:
+            if self._detection_pool is not None:
+                self._detection_pool.shutdown(wait=False)
+            self._detection_pool = ProcessPoolExecutor(max_workers=workers)
+            self._detection_workers = workers
+        return self._detection_pool
+    
+    def close(self) -> None:
+        """Release worker processes and the current project's content store, and stop autosave
         
-        names = list(set(n for n in potential_names if n not in common_words and len(n) > 2))
+        Closing autosave removes the journal: this is a clean shutdown.
+        """
+        if self._detection_pool is not None:
+            self._detection_pool.shutdown()
+            self._detection_pool = None
+        if self.autosave:
+            self.autosave.close()
+            self.autosave = None
+        self._close_content_store()
+    
+    def detect_characters_incremental(self, text: str) -> List[Character]:
+        """Auto-detect characters, re-scanning only the paragraphs that changed
+        
+        Gives the same result as detect_characters_in_text, but the cost is
+        proportional to the edit rather than to the whole manuscript.
+        """
+        with self._detector_lock:
+            names = self.character_detector.update(text)
+        return self._new_characters(names)
+    
+    def _reset_detector(self) -> None:
+        """Forget the previous document's detection state"""
+        with self._detector_lock:
+            self.character_detector.reset()
+            self._analysis_statistics.reset()
+        self._segmented = None
+        self._counted = None
+    
+    def analyze_text(self, text: str) -> TextAnalysis:
+        """Compute editor statistics and newly detected characters for text
         
-        # Check for existing characters
-        existing_names = {c.name for c in self.current_project.characters} if self.current_project else set()
+        Safe to run on an AnalysisScheduler worker; it does not modify the project.
+        The counts are updated from the change since the previous call. text
+        may also be a Rope snapshot of the content, joined here off the UI thread.
+        """
+        if not isinstance(text, str):
+            text = str(text)
+        with self._detector_lock:
+            self._analysis_statistics.update(text)
+            counts = self._analysis_statistics.counts
+        return TextAnalysis(
+            word_count=counts.words,
+            char_count=counts.characters,
+            new_characters=self.detect_characters_incremental(text),
+        )
+    
+    def _new_characters(self, names) -> List[Character]:
+        """Create characters for names not already in the project"""
+        existing = self.current_project.characters if self.current_project else None
         
         # Create new characters
         new_characters = []
         for name in sorted(names):
-            if name not in existing_names:
+            if existing is None or not existing.has_name(name):
                 char = Character(name=name, role="")
                 new_characters.append(char)
         
         return new_characters
     
+    def find_mentions(self, text: Optional[str] = None) -> List[Mention]:
+        """Find mentions of known characters and locations (in the story content by default)"""
+        if not self.current_project:
+            return []
+        if text is None:
+            text = self.current_project.content
+        return self._mentions().find(text)
+    
+    def count_mentions(self, text: Optional[str] = None) -> Counter:
+        """Number of mentions per character/location id"""
+        if not self.current_project:
+            return Counter()
+        if text is None:
+            text = self.current_project.content
+        return self._mentions().counts(text)
+    
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """Full-text search over the story, scenes and character/location descriptions
+        
+        Supports "quoted phrases" and prefix* terms; hits are ranked by BM25
+        and carry a snippet with the matches marked. Projects stored in a
+        database are searched with SQLite FTS5 without loading any bodies;
+        unsaved edits are written in a transaction that is rolled back after
+        the query. Otherwise fields edited since the last search are
+        re-indexed in memory and the rest of the index is reused.
+        """
+        project = self.current_project
+        if not project:
+            return []
+        
+        if project.file_path and is_database_file(project.file_path):
+            with ProjectDatabase(project.file_path) as db:
+                if db.has_fts:
+                    if project.dirty:
+                        return db.search_unsaved(project, query, limit)
+                    return db.search(query, project.id, limit)
+        
+        self.search_index.sync(project)
+        scenes = {s.id: s for s in project.scenes}
+        owners = {'projects': {project.id: project}, 'scenes': scenes,
+                  'characters': project.characters, 'locations': project.locations}
+        index = self.search_index
+        return [
+            hit._replace(snippet=index.snippet(hit[:3], getattr(owners[hit.section].get(hit.entity_id), hit.field),
+                                               hit.positions))
+            for hit in index.search(query, limit)
+        ]
+    
+    def _mentions(self) -> MentionIndex:
+        """The mention index, resynced only if entity names changed since last use"""
+        characters, locations = self.current_project.characters, self.current_project.locations
+        key = (id(characters), characters.version, id(locations), locations.version)
+        if key != self._mention_key:
+            self.mention_index.sync(self.current_project)
+            self._mention_key = key
+        return self.mention_index
+    
+    def set_cooccurrence_window(self, window=PARAGRAPH) -> None:
+        """Choose the co-occurrence window ('paragraph', 'scene' or a token count) and start a fresh graph
+        
+        Counts saved with the current project are reused if they were made
+        with the same window; units mentioning names changed since are
+        rescanned on the next build.
+        """
+        self.story_graph = StoryGraph()
+        self.cooccurrence = CooccurrenceBuilder(self.mention_index, self.story_graph, window)
+        if self.current_project and self.current_project._analysis:
+            self._mentions()
+            self.cooccurrence.restore(self.current_project._analysis)
+    
+    def build_relationships(self, min_weight: float = 1) -> List[Relationship]:
+        """Detect co-occurrence relationships in the story content and scenes
+        
+        Only text units changed since the last call are rescanned, and the
+        results are also available as self.story_graph.
+        """
+        if not self.current_project:
+            return []
+        self._mentions()
+        self.cooccurrence.build(self.current_project)
+        return self._store_relationships(self.cooccurrence.relationships(min_weight))
+    
+    def _store_relationships(self, detected: List[Relationship]) -> List[Relationship]:
+        """Replace the project's detected relationships, keeping hand-made ones
+        
+        Unchanged relationships keep their objects (and timestamps), and the
+        project is only marked modified if something changed.
+        """
+        project = self.current_project
+        previous = {r.id: r for r in project.relationships if is_detected(r)}
+        detected = [
+            previous[r.id] if r.id in previous and previous[r.id].weight == r.weight else r
+            for r in detected
+        ]
+        relationships = [r for r in project.relationships if not is_detected(r)] + detected
+        if [r.id for r in relationships] != [r.id for r in project.relationships] \
+                or any(a is not b for a, b in zip(relationships, project.relationships)):
+            project.relationships = relationships
+        return detected
+    
+    def detect_scenes(self) -> List[DetectedScene]:
+        """Split the story content into scenes at chapter headings, scene breaks and blank-line runs
+        
+        Each scene comes with its word, sentence and paragraph counts, and its Scene lists the
+        characters it mentions (most mentioned first) and its most mentioned
+        location. The first call splits the whole text; after that, content
+        edits resegment only the scenes around them, and only changed scenes
+        (or scenes naming renamed entities) are analysed again. The scenes
+        are not added to project.scenes.
+        """
+        project = self.current_project
+        if not project:
+            return []
+        self._mentions()
+        if self._segmented is not project:
+            self.scene_segmenter.reset(content_rope(project))
+            self._segmented = project
+        return self.scene_segmenter.scenes()
+    
+    def update_scene_relationships(self, scene: Scene) -> None:
+        """Apply one edited scene to the story graph"""
+        if self.current_project:
+            self._mentions()
+            self.cooccurrence.update_unit(('scenes', scene.id), scene.content)
+    
+    def get_entity_name(self, entity_id: str) -> str:
+        """Name of the character or location with entity_id (empty if unknown)"""
+        if not self.current_project:
+            return ""
+        entity = self.current_project.characters.get(entity_id) or self.current_project.locations.get(entity_id)
+        return entity.name if entity else ""
+    
     def add_character(self, character: Character) -> bool:
         """Add character to current project"""
         if self.current_project:
             # Check if character already exists
-            if not any(c.name == character.name for c in self.current_project.characters):
+            if not self.current_project.characters.has_name(character.name):
                 self.current_project.characters.append(character)
+                self._entity_changed('characters', character, added=True)
                 return True
         return False
     
     def remove_character(self, character_id: str) -> bool:
         """Remove character from current project"""
         if self.current_project:
-            self.current_project.characters = [c for c in self.current_project.characters if c.id != character_id]
+            character = self.current_project.characters.get(character_id)
+            if character is not None:
+                self._entity_changed('characters', character, removed=True)
             return True
         return False
     
     def update_character(self, character: Character) -> bool:
         """Update character in current project"""
         if self.current_project:
-            for i, c in enumerate(self.current_project.characters):
-                if c.id == character.id:
-                    self.current_project.characters[i] = character
-                    return True
+            previous = self.current_project.characters.get(character.id)
+            if not self.current_project.characters.replace(character):
+                return False
+            self._entity_changed('characters', character, replaced=previous)
+            return True
         return False
     
+    def get_character(self, character_id: str) -> Optional[Character]:
+        """Look up a character by id"""
+        return self.current_project.characters.get(character_id) if self.current_project else None
+    
+    def find_character(self, name: str) -> Optional[Character]:
+        """Look up a character by name (case and whitespace insensitive)"""
+        return self.current_project.characters.find_by_name(name) if self.current_project else None
+    
     def get_characters(self) -> List[Character]:
         """Get all characters in current project"""
         return self.current_project.characters if self.current_project else []
@@ -122,104 +518,245 @@ class ProjectService:
         """Add location to current project"""
         if self.current_project:
             self.current_project.locations.append(location)
+            self._entity_changed('locations', location, added=True)
+            return True
+        return False
+    
+    def remove_location(self, location_id: str) -> bool:
+        """Remove location from current project"""
+        if self.current_project:
+            location = self.current_project.locations.get(location_id)
+            if location is not None:
+                self._entity_changed('locations', location, removed=True)
+            return True
+        return False
+    
+    def update_location(self, location: Location) -> bool:
+        """Update location in current project"""
+        if self.current_project:
+            previous = self.current_project.locations.get(location.id)
+            if not self.current_project.locations.replace(location):
+                return False
+            self._entity_changed('locations', location, replaced=previous)
             return True
         return False
     
+    def _entity_changed(self, section: str, entity, added: bool = False, removed: bool = False,
+                        inserted_at: Optional[int] = None, replaced=None) -> None:
+        """Record a character or location change in the history and journal (removing it if removed)
+        
+        replaced is the object an updated entity took the place of, if it
+        was not changed in place; the history takes its previous state from it.
+        """
+        registry = getattr(self.current_project, section)
+        if removed:
+            index = registry.index(entity)
+        elif added:
+            index = len(registry) - 1
+        else:
+            index = inserted_at
+        self.history.record_entity(section, entity, index, added=added, removed=removed, replaced=replaced)
+        if removed:
+            registry.discard(entity.id)
+            if self.autosave:
+                self.autosave.remove(self.current_project, section, entity.id)
+        elif self.autosave:
+            self.autosave.put(self.current_project, section, entity, index=inserted_at)
+    
+    def get_location(self, location_id: str) -> Optional[Location]:
+        """Look up a location by id"""
+        return self.current_project.locations.get(location_id) if self.current_project else None
+    
+    def find_location(self, name: str) -> Optional[Location]:
+        """Look up a location by name (case and whitespace insensitive)"""
+        return self.current_project.locations.find_by_name(name) if self.current_project else None
+    
     def get_locations(self) -> List[Location]:
         """Get all locations in current project"""
         return self.current_project.locations if self.current_project else []
     
-    def update_project_content(self, content: str) -> None:
-        """Update main story content"""
-        if self.current_project:
-            self.current_project.content = content
-            self.current_project.updated_at = datetime.now()
+    def update_project_content(self, content: Optional[str] = None,
+                               edits: Iterable[Tuple[int, int, str]] = ()) -> None:
+        """Update main story content, to a whole new text or by (start, end, text) edits
+        
+        Each edit replaces content[start:end] with text, in order, through
+        the project's Rope (storage.rope): it costs O(log n) instead of a
+        copy of the manuscript, and the full text is joined again only when
+        something reads project.content.
+        """
+        project = self.current_project
+        if not project:
+            return
+        self._follow_statistics(project)
+        if content is not None:
+            old = project.content
+            project.content = content
+            start, old_end, new_end = diff_range(old, content)
+            if old_end > start or new_end > start:
+                self._content_edited(start, old[start:old_end], content[start:new_end], content)
+        for start, end, text in edits:
+            removed = content_rope(project)[start:end]
+            rope = edit_content(project, start, end, text)
+            self._content_edited(start, removed, text, rope)
+        project.updated_at = datetime.now()
+    
+    def text_statistics(self) -> TextCounts:
+        """Word, character, sentence and paragraph counts of the story content
+        
+        The content is counted once; after that every content edit updates
+        the counts from the text around it, so this is cheap to call on each
+        keystroke. Words written today are tallied in self.session.
+        """
+        project = self.current_project
+        if not project:
+            return TextCounts()
+        self._follow_statistics(project)
+        return self.statistics.counts
+    
+    def _follow_statistics(self, project: Project) -> None:
+        if self._counted is not project:
+            self.statistics.reset(content_rope(project))
+            self._counted = project
+    
+    def _content_edited(self, start: int, removed: str, inserted: str, content) -> None:
+        """Pass one content edit on to the history, journal, statistics and scene segmenter (content is the new text)"""
+        self.history.record_text(start, removed, inserted)
+        if self.autosave:
+            self.autosave.edit(self.current_project, start, start + len(removed), inserted)
+        if self._segmented is self.current_project:
+            self.scene_segmenter.apply_edit(content, start, start + len(removed), start + len(inserted))
+        if self._counted is self.current_project:
+            self.session.record(self.statistics.apply_edit(content, start, removed, inserted).words)
+    
+    def undo(self) -> bool:
+        """Revert the last edit (text, or a character or location change); False if there is none"""
+        step = self.history.undo() if self.current_project else None
+        if step is None:
+            return False
+        with self.history.paused():
+            for change in reversed(step.changes):
+                self._apply_change(change, undo=True)
+        return True
+    
+    def redo(self) -> bool:
+        """Apply the last undone edit again; False if there is none"""
+        step = self.history.redo() if self.current_project else None
+        if step is None:
+            return False
+        with self.history.paused():
+            for change in step.changes:
+                self._apply_change(change, undo=False)
+        return True
+    
+    def _apply_change(self, change, undo: bool) -> None:
+        if isinstance(change, TextChange):
+            removed, inserted = (change.inserted, change.removed) if undo else (change.removed, change.inserted)
+            self.update_project_content(edits=[(change.start, change.start + len(removed), inserted)])
+            return
+        
+        state = change.before if undo else change.after
+        registry = getattr(self.current_project, change.section)
+        entity = registry.get(change.entity_id)
+        if state is None:
+            if entity is not None:
+                self._entity_changed(change.section, entity, removed=True)
+            return
+        if entity is None:
+            entity = snapshot(state)
+            registry.insert(change.index, entity)
+            self._entity_changed(change.section, entity, inserted_at=change.index)
+        else:
+            # Restored in place, so views holding the entity see the change
+            assign(entity, state)
+            registry.reindex(entity)
+            self._entity_changed(change.section, entity)
     
     def _serialize_project(self, project: Project) -> dict:
         """Serialize project to dict for JSON"""
         return {
-            'id': project.id,
-            'title': project.title,
-            'description': project.description,
-            'content': project.content,
-            'characters': [
-                {
-                    'id': c.id,
-                    'name': c.name,
-                    'role': c.role,
-                    'description': c.description,
-                    'goals': c.goals,
-                    'created_at': c.created_at.isoformat(),
-                    'updated_at': c.updated_at.isoformat(),
-                }
-                for c in project.characters
-            ],
-            'locations': [
-                {
-                    'id': l.id,
-                    'name': l.name,
-                    'type': l.type,
-                    'description': l.description,
-                    'created_at': l.created_at.isoformat(),
-                    'updated_at': l.updated_at.isoformat(),
-                }
-                for l in project.locations
-            ],
-            'scenes': [
-                {
-                    'id': s.id,
-                    'title': s.title,
-                    'summary': s.summary,
-                    'content': s.content,
-                    'character_ids': s.character_ids,
-                    'location_id': s.location_id,
-                    'order_index': s.order_index,
-                    'created_at': s.created_at.isoformat(),
-                    'updated_at': s.updated_at.isoformat(),
-                }
-                for s in project.scenes
-            ],
-            'created_at': project.created_at.isoformat(),
-            'updated_at': project.updated_at.isoformat(),
+            key: list(value) if isinstance(value, Iterator) else value
+            for key, value in self._serialize_members(project)
+        }
+    
+    def _serialize_members(self, project: Project) -> Iterator[Tuple[str, Any]]:
+        """Top-level (key, value) pairs of a .story file, with entity arrays as generators
+        
+        The streaming writer consumes these so only one entity is encoded at a time.
+        """
+        yield 'id', project.id
+        yield 'title', project.title
+        yield 'description', project.description
+        # Header fields come before the bodies so listings only read the file's start
+        yield 'created_at', project.created_at.isoformat()
+        yield 'updated_at', project.updated_at.isoformat()
+        yield 'summary', project_summary_counts(project)
+        yield 'content', project.content
+        yield 'characters', (self._serialize_character(c) for c in project.characters)
+        yield 'locations', (self._serialize_location(l) for l in project.locations)
+        yield 'scenes', (self._serialize_scene(s) for s in project.scenes)
+        yield 'relationships', (self._serialize_relationship(r) for r in project.relationships)
+        if project._analysis:
+            yield 'analysis', project._analysis
+    
+    def _serialize_character(self, c: Character) -> dict:
+        return {
+            'id': c.id,
+            'name': c.name,
+            'role': c.role,
+            'description': c.description,
+            'goals': c.goals,
+            'created_at': c.created_at.isoformat(),
+            'updated_at': c.updated_at.isoformat(),
+        }
+    
+    def _serialize_location(self, l: Location) -> dict:
+        return {
+            'id': l.id,
+            'name': l.name,
+            'type': l.type,
+            'description': l.description,
+            'created_at': l.created_at.isoformat(),
+            'updated_at': l.updated_at.isoformat(),
+        }
+    
+    def _serialize_scene(self, s: Scene) -> dict:
+        return {
+            'id': s.id,
+            'title': s.title,
+            'summary': s.summary,
+            'content': s.content,
+            'character_ids': s.character_ids,
+            'location_id': s.location_id,
+            'order_index': s.order_index,
+            'created_at': s.created_at.isoformat(),
+            'updated_at': s.updated_at.isoformat(),
+        }
+    
+    def _serialize_relationship(self, r: Relationship) -> dict:
+        return {
+            'id': r.id,
+            'source_id': r.source_id,
+            'target_id': r.target_id,
+            'type': r.type,
+            'description': r.description,
+            'weight': r.weight,
+            'created_at': r.created_at.isoformat(),
+            'updated_at': r.updated_at.isoformat(),
         }
     
     def _deserialize_project(self, data: dict) -> Project:
         """Deserialize project from dict"""
-        characters = [
-            Character(
-                id=c['id'],
-                name=c['name'],
-                role=c.get('role', ''),
-                description=c.get('description', ''),
-                goals=c.get('goals', []),
-            )
-            for c in data.get('characters', [])
-        ]
-        
-        locations = [
-            Location(
-                id=l['id'],
-                name=l['name'],
-                type=l.get('type', ''),
-                description=l.get('description', ''),
-            )
-            for l in data.get('locations', [])
-        ]
-        
-        scenes = [
-            Scene(
-                id=s['id'],
-                title=s['title'],
-                summary=s.get('summary', ''),
-                content=s.get('content', ''),
-                character_ids=s.get('character_ids', []),
-                location_id=s.get('location_id'),
-                order_index=s.get('order_index', 0),
-            )
-            for s in data.get('scenes', [])
-        ]
-        
-        return Project(
+        return self._deserialize_header(
+            data,
+            characters=[self._deserialize_character(c) for c in data.get('characters', [])],
+            locations=[self._deserialize_location(l) for l in data.get('locations', [])],
+            scenes=[self._deserialize_scene(s) for s in data.get('scenes', [])],
+            relationships=[self._deserialize_relationship(r) for r in data.get('relationships', [])],
+        )
+    
+    def _deserialize_header(self, data: dict, characters: List[Character], locations: List[Location],
+                            scenes: List[Scene], relationships: List[Relationship] = ()) -> Project:
+        project = Project(
             id=data['id'],
             title=data.get('title', 'Untitled Project'),
             description=data.get('description', ''),
@@ -227,4 +764,55 @@ class ProjectService:
             characters=characters,
             locations=locations,
             scenes=scenes,
+            relationships=list(relationships),
+            created_at=_parse_timestamp(data.get('created_at')),
+            updated_at=_parse_timestamp(data.get('updated_at')),
+        )
+        project._analysis = data.get('analysis')
+        return project
+    
+    def _deserialize_character(self, c: dict) -> Character:
+        return Character(
+            id=c['id'],
+            name=c['name'],
+            role=c.get('role', ''),
+            description=c.get('description', ''),
+            goals=c.get('goals', []),
+            created_at=_parse_timestamp(c.get('created_at')),
+            updated_at=_parse_timestamp(c.get('updated_at')),
+        )
+    
+    def _deserialize_location(self, l: dict) -> Location:
+        return Location(
+            id=l['id'],
+            name=l['name'],
+            type=l.get('type', ''),
+            description=l.get('description', ''),
+            created_at=_parse_timestamp(l.get('created_at')),
+            updated_at=_parse_timestamp(l.get('updated_at')),
+        )
+    
+    def _deserialize_scene(self, s: dict) -> Scene:
+        return Scene(
+            id=s['id'],
+            title=s['title'],
+            summary=s.get('summary', ''),
+            content=s.get('content', ''),
+            character_ids=s.get('character_ids', []),
+            location_id=s.get('location_id'),
+            order_index=s.get('order_index', 0),
+            created_at=_parse_timestamp(s.get('created_at')),
+            updated_at=_parse_timestamp(s.get('updated_at')),
+        )
+    
+    def _deserialize_relationship(self, r: dict) -> Relationship:
+        return Relationship(
+            id=r['id'],
+            source_id=r.get('source_id', ''),
+            target_id=r.get('target_id', ''),
+            type=r.get('type', ''),
+            description=r.get('description', ''),
+            weight=r.get('weight', 1.0),
+            created_at=_parse_timestamp(r.get('created_at')),
+            updated_at=_parse_timestamp(r.get('updated_at')),
         )
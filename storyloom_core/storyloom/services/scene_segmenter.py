@@ -0,0 +1,305 @@
+"""
+Scene segmenter - splits the story content into scenes at chapter headings,
+scene-break markers and runs of blank lines, and keeps the split up to
+date as the text is edited.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from ..models.scene import Scene
+from ..storage.lazy_content import bind_lazy
+from .cooccurrence import MAX_NAME_CHECKS
+from .mention_index import LOCATION, MentionIndex
+from .statistics import TextCounts, count_text
+
+_NUMBER = (r'(?:\d+|[ivxlcdm]+|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen'
+           r'|fourteen|fifteen|sixteen|seventeen|eighteen|nineteen|twenty|thirty|forty|fifty|sixty'
+           r'|seventy|eighty|ninety|hundred)(?:-\w+)?')
+_SUBTITLE = r'(?:[ \t]*[:.–—-][^\n]*)?'
+
+# A scene ends at two or more blank lines, a marker line ("***", "* * *",
+# "---", "#", "§") with any blank lines after it, or a chapter heading,
+# which opens the next scene
+_BREAK = re.compile(
+    r'(?P<gap>(?:^[ \t\r]*\n){2,})'
+    r'|^[ \t]*(?:(?:[*#~=_-][ \t]*){3,}|[#§][ \t]*)\r?(?:\n|\Z)(?:[ \t\r]*\n)*'
+    r'|^(?P<heading>[ \t]*(?:(?:chapter|part|book)[ \t]+' + _NUMBER + '|prologue|epilogue|interlude)' + _SUBTITLE
+    + r'|#{1,3}[ \t]+\S[^\n]*?)[ \t\r]*$',
+    re.MULTILINE | re.IGNORECASE,
+)
+
+# Line starts that may open a break, found quickly before _BREAK is tried there
+_CANDIDATE = re.compile(r'\n(?=[ \t\r]*\n|[ \t]*[*#~=_§-]|[ \t]*(?:chapter|part|book|prologue|epilogue|interlude)\b)',
+                        re.IGNORECASE)
+
+_CONTENT = re.compile(r'\S')
+
+
+class DetectedScene(NamedTuple):
+    """A scene found in the story content: content[start:end]"""
+    scene: Scene
+    start: int
+    end: int
+    counts: TextCounts
+
+    @property
+    def word_count(self) -> int:
+        return self.counts.words
+
+
+def _iter_breaks(text: str, pos: int, endpos: int) -> Iterator[re.Match]:
+    """_BREAK matches of text[pos:endpos], trying only candidate line starts"""
+    match, search = _BREAK.match, _CANDIDATE.search
+    line = pos
+    while True:
+        m = match(text, line, endpos)
+        if m is not None:
+            yield m
+            line = m.end()
+            # Look for the next candidate from the newline that ends the match, if it took one
+            at = line - 1 if line > pos and text[line - 1] == '\n' else line
+        else:
+            at = line
+        candidate = search(text, at, endpos)
+        if candidate is None:
+            return
+        line = candidate.end()
+
+
+def iter_scenes(text: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[Tuple[int, int, str]]:
+    """Yield (start, end, title) of each scene of text[pos:endpos] as it is found
+
+    pos must be at the start of a line. A heading stays at the start of the
+    scene it opens and becomes its title; markers and blank lines belong to
+    neither scene. Scenes with nothing but whitespace (or their heading)
+    are merged into the next one.
+    """
+    endpos = len(text) if endpos is None else endpos
+    start = body = pos
+    title = ""
+    for m in _iter_breaks(text, pos, endpos):
+        if _CONTENT.search(text, body, m.start()):
+            yield start, m.start(), title
+            title = ""
+        heading = m.group('heading')
+        if heading is not None:
+            start, body, title = m.start(), m.end(), heading.strip().lstrip('#').strip()
+        else:
+            body = m.end()
+            if not title:
+                start = body
+    if _CONTENT.search(text, body, endpos):
+        yield start, endpos, title
+
+
+class _Segment:
+    """A scene's length, title and analysis (its start is kept by the segmenter)"""
+
+    __slots__ = ('length', 'head', 'title', 'digest', 'counts', 'character_ids', 'location_id', 'scene')
+
+    def __init__(self, length: int, head: int, title: str, digest: int):
+        self.length = length
+        self.head = head  # offset of the end of the first line
+        self.title = title
+        self.digest = digest
+        self.counts: Optional[TextCounts] = None  # None until analysed
+        self.character_ids: Optional[List[str]] = None  # None until analysed
+        self.location_id: Optional[str] = None
+        self.scene: Optional[Scene] = None
+
+
+class _SceneText:
+    """Lazy source (see ``bind_lazy``) reading a detected scene's content out of the current text"""
+
+    in_memory = True
+
+    def __init__(self, segmenter: "SceneSegmenter"):
+        self.segmenter = segmenter
+
+    def load(self, obj, name: str, key) -> str:
+        return self.segmenter.scene_text(obj.order_index)
+
+
+class SceneSegmenter:
+    """Keeps the scenes of a text and what each of them mentions.
+
+    ``reset`` splits a whole text; ``apply_edit`` then rescans only the
+    scenes around an edit, until the new split lines up with the old one
+    again, and shifts the rest. The text may be a str or a Rope - scenes are
+    read from it by slicing, so a Rope is never joined.
+
+    Each scene is a ``Scene`` whose ``content`` is read from the text on
+    access and whose ``character_ids`` (most mentioned first) and
+    ``location_id`` (the most mentioned location) are filled when
+    ``scenes`` is called, for the scenes changed since. The Scene objects
+    of edited scenes are kept, so views holding them stay valid.
+    """
+
+    def __init__(self, mention_index: MentionIndex):
+        self.mention_index = mention_index
+        self.text: Sequence = ""
+        self._starts: List[int] = []
+        self._segments: List[_Segment] = []
+        self._index_version = mention_index.version
+        self._source = _SceneText(self)
+        self.rescanned = 0  # scenes found with new text (to be analysed again) so far
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    def reset(self, text: Sequence = "") -> None:
+        """Split ``text`` from scratch"""
+        self.text = text
+        full = text if isinstance(text, str) else str(text)
+        new = [(s, e, title, full[s:e]) for s, e, title in iter_scenes(full)]
+        self._splice(0, len(self._segments), new, 0)
+
+    def apply_edit(self, text: Sequence, start: int, end: int, new_end: int) -> range:
+        """Follow an edit that replaced [start, end) of the previous text with text[start:new_end]
+
+        Returns the indexes of the scenes that were rescanned.
+        """
+        starts = self._starts
+        n = len(starts)
+        if not n:
+            self.reset(text)
+            return range(len(self._segments))
+        self.text = text
+        delta = new_end - end
+
+        # A scene's start depends only on the text before the end of its first line
+        k = bisect_right(starts, start) - 1
+        if k > 0 and start <= starts[k] + self._segments[k].head:
+            k -= 1
+        lo = max(k, 0)
+        a = starts[lo] if lo else 0
+        hi = bisect_right(starts, end)
+        while True:
+            # Scenes start at line starts, so the window never cuts a line
+            b = starts[hi] + delta if hi < n else len(text)
+            new, last = self._rescan(text, a, b, new_end, delta, lo, hi)
+            if last is not None or hi == n:
+                break
+            hi = min(hi + max(hi - lo, 1), n)
+        last = n - 1 if last is None else last
+        self._splice(lo, last + 1, new, delta)
+        return range(lo, lo + len(new))
+
+    def _rescan(self, text: Sequence, a: int, b: int, new_end: int, delta: int,
+                lo: int, hi: int) -> Tuple[list, Optional[int]]:
+        """Scenes of text[a:b], up to the first past the edit that ends where an old scene did
+
+        Returns them as (start, end, title, content) and the index of that
+        old scene (None if the split never lined up again). Past the edit,
+        the same break at the same place leaves the scan in the same state,
+        so everything after it is as before. A scene ending at b only ended
+        at a real break if the old scene hi opened with its heading there.
+        """
+        window = text[a:b]
+        starts, segments = self._starts, self._segments
+        closed = hi < len(starts) and segments[hi].title
+        new = []
+        for s, e, title in iter_scenes(window):
+            new.append((a + s, a + e, title, window[s:e]))
+            if a + e > new_end and (a + e < b or closed):
+                old_end = a + e - delta
+                j = bisect_left(starts, old_end) - 1
+                if j >= lo and starts[j] + segments[j].length == old_end:
+                    return new, j
+        return new, None
+
+    def _splice(self, lo: int, hi: int, new: list, delta: int) -> None:
+        """Replace segments [lo, hi) with new (start, end, title, content) scenes and shift the rest by delta"""
+        old = self._segments[lo:hi]
+        known = {(seg.length, seg.digest): seg for seg in old}
+        scenes = [seg.scene for seg in old]
+        segments = []
+        for i, (s, e, title, content) in enumerate(new):
+            digest = hash(content)
+            previous = known.pop((e - s, digest), None)
+            if previous is not None and previous.title == title:
+                seg = previous
+            else:
+                head = content.find('\n')
+                seg = _Segment(e - s, head if head >= 0 else e - s, title, digest)
+                self.rescanned += 1
+            seg.scene = scenes[i] if i < len(scenes) else self._new_scene()
+            segments.append(seg)
+        for scene in scenes[len(new):]:
+            # Gone from the text: detach it from the segmenter
+            scene.content = ""
+
+        starts = self._starts
+        tail = starts[hi:] if not delta else [s + delta for s in starts[hi:]]
+        starts[lo:] = [s for s, *_ in new] + tail
+        self._segments[lo:hi] = segments
+
+        renumber = len(self._segments) if len(new) != len(old) else lo + len(new)
+        for index in range(lo, renumber):
+            self._place(self._segments[index], index)
+
+    def _new_scene(self) -> Scene:
+        scene = Scene()
+        bind_lazy(scene, 'content', self._source, None)
+        return scene
+
+    @staticmethod
+    def _place(seg: _Segment, index: int) -> None:
+        """Bring a segment's Scene up to date with its position, title and analysis"""
+        scene = seg.scene
+        if scene.order_index != index:
+            scene.order_index = index
+        if scene.title != seg.title:
+            scene.title = seg.title
+        if seg.character_ids is not None:
+            if scene.character_ids != seg.character_ids:
+                scene.character_ids = list(seg.character_ids)
+            if scene.location_id != seg.location_id:
+                scene.location_id = seg.location_id
+
+    def scene_text(self, index: int) -> str:
+        """Content of the scene at index"""
+        if not 0 <= index < len(self._segments):
+            return ""
+        start = self._starts[index]
+        return self.text[start:start + self._segments[index].length]
+
+    def scene_at(self, offset: int) -> int:
+        """Index of the scene containing (or preceding) a text offset, -1 if none"""
+        return bisect_right(self._starts, offset) - 1
+
+    def scenes(self) -> List[DetectedScene]:
+        """All scenes in order, analysing the ones changed since the last call"""
+        self._check_index()
+        result = []
+        for index, (start, seg) in enumerate(zip(self._starts, self._segments)):
+            if seg.character_ids is None:
+                self._analyse(seg, self.text[start:start + seg.length])
+                self._place(seg, index)
+            result.append(DetectedScene(seg.scene, start, start + seg.length, seg.counts))
+        return result
+
+    def _analyse(self, seg: _Segment, content: str) -> None:
+        if seg.counts is None:
+            seg.counts = count_text(content)
+        characters, locations = Counter(), Counter()
+        for mention in self.mention_index.iter_mentions(content):
+            (locations if mention.kind == LOCATION else characters)[mention.entity_id] += 1
+        seg.character_ids = [entity_id for entity_id, _ in characters.most_common()]
+        seg.location_id = locations.most_common(1)[0][0] if locations else None
+
+    def _check_index(self) -> None:
+        """Forget the analysis of scenes that may mention names changed in the mention index"""
+        version = self.mention_index.version
+        if version == self._index_version:
+            return
+        changed = self.mention_index.changes_since(self._index_version)
+        self._index_version = version
+        for start, seg in zip(self._starts, self._segments):
+            if seg.character_ids is None:
+                continue
+            if changed is None or len(changed) > MAX_NAME_CHECKS or \
+                    MentionIndex.may_mention(self.text[start:start + seg.length], changed):
+                seg.character_ids = None
@@ -0,0 +1,494 @@
+"""
+Full-text search - an in-memory inverted index with positional postings
+over the manuscript, scenes and entity descriptions.
+"""
+
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+_TOKEN = re.compile(r"\w+")
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+# A prefix term matches at most this many vocabulary terms (most frequent first)
+MAX_PREFIX_EXPANSION = 64
+
+# Snippet markup: matched words are wrapped in the markers, cut text is elided
+SNIPPET_START = "["
+SNIPPET_END = "]"
+SNIPPET_ELLIPSIS = "…"
+SNIPPET_TOKENS = 12
+
+# Fields longer than this (in characters) are indexed in chunks of lines of
+# about _CHUNK_MIN to _CHUNK_MAX characters
+CHUNK_CHARS = 32 * 1024
+_CHUNK_MIN = 4 * 1024
+_CHUNK_MAX = 64 * 1024
+
+
+class SearchHit(NamedTuple):
+    """One matching field; ``positions`` are token indexes of the matched terms"""
+    section: str        # 'projects', 'scenes', 'characters' or 'locations'
+    entity_id: str
+    field: str          # 'content', 'summary', 'description', 'title' or 'name'
+    score: float
+    positions: Tuple[int, ...] = ()
+    snippet: str = ""
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens of text"""
+    tokens = _TOKEN.findall(text)
+    if not tokens:
+        return tokens
+    # One lower() call for all tokens; token boundaries come from the original text
+    return "\0".join(tokens).lower().split("\0")
+
+
+def token_offsets(text: str, positions) -> List[Tuple[int, int]]:
+    """Character (start, end) of the tokens at the given token positions"""
+    wanted = sorted(set(positions))
+    if not wanted:
+        return []
+    spans, i = [], 0
+    for position, m in enumerate(_TOKEN.finditer(text)):
+        if position == wanted[i]:
+            spans.append(m.span())
+            i += 1
+            if i == len(wanted):
+                break
+    return spans
+
+
+def make_snippet(text: str, positions, tokens: int = SNIPPET_TOKENS) -> str:
+    """About ``tokens`` words of text around the first matched position, matches marked"""
+    if not positions:
+        return ""
+    first = min(positions)
+    start = max(first - tokens // 4, 0)
+    marked = set(positions)
+    spans = []
+    for position, m in enumerate(_TOKEN.finditer(text)):
+        if position >= start:
+            spans.append((position, m.start(), m.end()))
+            if len(spans) == tokens:
+                break
+    if not spans:
+        return ""
+    out = [SNIPPET_ELLIPSIS] if start > 0 else []
+    cursor = spans[0][1]
+    for position, a, b in spans:
+        out.append(text[cursor:a])
+        out.append(f"{SNIPPET_START}{text[a:b]}{SNIPPET_END}" if position in marked else text[a:b])
+        cursor = b
+    if _TOKEN.search(text, cursor):
+        out.append(SNIPPET_ELLIPSIS)
+    return "".join(out)
+
+
+def fts_query(query: str) -> str:
+    """The query as an SQLite FTS5 expression with the same meaning (all clauses required)"""
+    parts = []
+    for clause in parse_query(query):
+        phrase = '"' + " ".join(clause.terms) + '"'
+        parts.append(phrase + "*" if clause.prefix else phrase)
+    return " ".join(parts)
+
+
+class _Clause(NamedTuple):
+    terms: Tuple[str, ...]   # phrase words (one for a plain term)
+    prefix: bool
+
+
+def parse_query(query: str) -> List[_Clause]:
+    """Split a query into clauses: words, "quoted phrases" and prefix* words
+
+    A word that tokenizes to several tokens (e.g. "well-known") is a phrase.
+    """
+    clauses = []
+    for m in _QUERY.finditer(query):
+        phrase, word = m.groups()
+        prefix = word is not None and word.endswith('*') and len(word) > 1
+        terms = tuple(tokenize(phrase if phrase is not None else word))
+        if terms:
+            clauses.append(_Clause(terms, prefix and len(terms) == 1))
+    return clauses
+
+
+class _Chunks:
+    """Layout of a long document indexed as chunks of whole lines (in text order)"""
+
+    __slots__ = ('ids', 'hashes', 'lengths', 'terms', 'starts', 'offsets', 'order', 'next_id')
+
+    def __init__(self):
+        self.ids: List[int] = []                # chunk ids, as used in the postings
+        self.hashes: List[int] = []             # hash of each chunk's text
+        self.lengths: List[int] = []            # token count of each chunk
+        self.terms: List[Tuple[str, ...]] = []  # distinct terms of each chunk
+        self.starts: List[int] = []             # character offset of each chunk in the text
+        self.offsets: List[int] = []            # token offset of each chunk in the document
+        self.order: Dict[int, int] = {}         # chunk id -> index in the lists above
+        self.next_id = 0
+
+
+def split_chunks(text: str) -> List[str]:
+    """Split text at line breaks into chunks of roughly CHUNK_CHARS
+
+    Boundaries are chosen by line content (with size limits), so an edit
+    leaves the chunks before and after it unchanged. Joining the chunks
+    with "\\n" gives back the text.
+    """
+    chunks, lines, size = [], [], 0
+    for line in text.split("\n"):
+        lines.append(line)
+        size += len(line) + 1
+        if size >= _CHUNK_MAX or (size >= _CHUNK_MIN and not hash(line) & 7):
+            chunks.append("\n".join(lines))
+            lines, size = [], 0
+    if lines or not chunks:
+        chunks.append("\n".join(lines))
+    return chunks
+
+
+class SearchIndex:
+    """Inverted index of text fields keyed by (section, entity id, field).
+
+    Postings map each term to {document number: array of token positions},
+    so phrase queries check adjacency and hits can be located in the text.
+    Documents are replaced one at a time (``update``); ``sync`` re-indexes
+    only the fields of a project whose text changed. Fields longer than
+    CHUNK_CHARS (the manuscript) are indexed in chunks of lines, with
+    postings {document number: {chunk id: positions}}, so an edit only
+    re-indexes the chunks it touched. Queries rank with BM25 over whole
+    fields and require every clause to match.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, Union[array, Dict[int, array]]]] = {}
+        self._docs: Dict[Hashable, int] = {}          # key -> document number
+        self._keys: List[Optional[Hashable]] = []     # document number -> key
+        self._lengths: List[int] = []                 # document number -> token count
+        self._terms: List[Tuple[str, ...]] = []       # document number -> distinct terms (unchunked)
+        self._hashes: List[Optional[int]] = []        # document number -> hash(text)
+        self._chunks: Dict[int, _Chunks] = {}         # document number -> chunk layout (long fields)
+        self._free: List[int] = []
+        self._total_length = 0
+        self._frequency: Dict[str, int] = {}          # term -> occurrences in all documents
+        self._vocabulary: Optional[List[str]] = None  # sorted terms, rebuilt lazily
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._docs
+
+    # Indexing
+
+    def update(self, key: Hashable, text: str) -> bool:
+        """(Re)index one document; returns False if its text is unchanged"""
+        doc = self._docs.get(key)
+        signature = hash(text)
+        if doc is not None and self._hashes[doc] == signature:
+            return False
+        if doc is None:
+            doc = self._free.pop() if self._free else len(self._keys)
+            if doc == len(self._keys):
+                self._keys.append(None)
+                self._lengths.append(0)
+                self._terms.append(())
+                self._hashes.append(None)
+            self._docs[key] = doc
+            self._keys[doc] = key
+
+        if len(text) > CHUNK_CHARS:
+            self._update_chunks(doc, text)
+        else:
+            self._unindex(doc)
+            self._terms[doc] = self._add_tokens(doc, None, tokenize(text))
+            self._lengths[doc] = self._last_length
+            self._total_length += self._last_length
+        self._hashes[doc] = signature
+        return True
+
+    def remove(self, key: Hashable) -> bool:
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return False
+        self._unindex(doc)
+        self._keys[doc] = None
+        self._hashes[doc] = None
+        self._free.append(doc)
+        return True
+
+    def sync(self, project) -> int:
+        """Index the project's searchable fields; returns the number re-indexed"""
+        fields = {key: text for key, text in _project_fields(project) if text}
+        for key in [k for k in self._docs if k not in fields]:
+            self.remove(key)
+        return sum(self.update(key, text) for key, text in fields.items())
+
+    def snippet(self, key: Hashable, text: str, positions, tokens: int = SNIPPET_TOKENS) -> str:
+        """``make_snippet`` for a hit on the indexed document ``key`` whose text is ``text``
+
+        For chunked documents only the chunk holding the first match is scanned.
+        """
+        doc = self._docs.get(key)
+        chunks = self._chunks.get(doc) if doc is not None else None
+        if chunks is None or not positions:
+            return make_snippet(text, positions, tokens)
+        first = min(positions)
+        i = max(bisect_right(chunks.offsets, first) - 1, 0)
+        offset = chunks.offsets[i]
+        end = chunks.starts[i + 1] - 1 if i + 1 < len(chunks.starts) else len(text)
+        local = [p - offset for p in positions if offset <= p < offset + chunks.lengths[i]]
+        return make_snippet(text[chunks.starts[i]:end], local, tokens)
+
+    # Queries
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """Best-matching fields for query, highest BM25 score first"""
+        clauses = parse_query(query)
+        if not clauses or not self._docs:
+            return []
+
+        # Resolve each clause to {doc: occurrence count} and intersect,
+        # starting from the rarest clause
+        matches = []
+        for clause in clauses:
+            counts, locate = self._match(clause)
+            if not counts:
+                return []
+            matches.append((counts, locate))
+        matches.sort(key=lambda match: len(match[0]))
+        candidates = set(matches[0][0])
+        for counts, _ in matches[1:]:
+            candidates.intersection_update(counts)
+            if not candidates:
+                return []
+
+        n = len(self._docs)
+        avg_length = self._total_length / n if n else 0.0
+        lengths = self._lengths
+        weighted = [(counts, math.log(1 + (n - len(counts) + 0.5) / (len(counts) + 0.5)) * (_K1 + 1))
+                    for counts, _ in matches]
+        scored = []
+        for doc in candidates:
+            norm = _K1 * (1 - _B + _B * lengths[doc] / avg_length) if avg_length else _K1
+            score = 0.0
+            for counts, idf in weighted:
+                tf = counts[doc]
+                score += idf * tf / (tf + norm)
+            scored.append((score, doc))
+
+        # Positions are only gathered for the hits returned
+        hits = []
+        for score, doc in heapq.nlargest(limit, scored):
+            section, entity_id, field = self._keys[doc]
+            positions = sorted({p for _, locate in matches for p in locate(doc)})
+            hits.append(SearchHit(section, entity_id, field, score, tuple(positions)))
+        return hits
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Indexed terms starting with prefix, most frequent first"""
+        return [term for term, _ in self._expand(prefix.lower())[:limit]]
+
+    # Internals
+
+    _last_length = 0
+
+    def _add_tokens(self, doc: int, chunk: Optional[int], tokens: List[str]) -> Tuple[str, ...]:
+        """Post tokens for a document (or one of its chunks); returns the distinct terms"""
+        local: Dict[str, List[int]] = {}
+        for position, token in enumerate(tokens):
+            positions = local.get(token)
+            if positions is None:
+                local[token] = [position]
+            else:
+                positions.append(position)
+
+        postings, frequency = self._postings, self._frequency
+        for term, positions in local.items():
+            entry = postings.get(term)
+            if entry is None:
+                entry = postings[term] = {}
+                frequency[term] = 0
+                self._vocabulary = None
+            if chunk is None:
+                entry[doc] = array('I', positions)
+            else:
+                per_chunk = entry.get(doc)
+                if per_chunk is None:
+                    per_chunk = entry[doc] = {}
+                per_chunk[chunk] = array('I', positions)
+            frequency[term] += len(positions)
+        self._last_length = len(tokens)
+        return tuple(local)
+
+    def _remove_terms(self, doc: int, chunk: Optional[int], terms: Iterable[str]) -> None:
+        postings, frequency = self._postings, self._frequency
+        for term in terms:
+            entry = postings[term]
+            if chunk is None:
+                frequency[term] -= len(entry.pop(doc))
+            else:
+                per_chunk = entry[doc]
+                frequency[term] -= len(per_chunk.pop(chunk))
+                if not per_chunk:
+                    del entry[doc]
+            if not entry:
+                del postings[term]
+                del frequency[term]
+                self._vocabulary = None
+
+    def _unindex(self, doc: int) -> None:
+        chunks = self._chunks.pop(doc, None)
+        if chunks is not None:
+            for chunk, terms in zip(chunks.ids, chunks.terms):
+                self._remove_terms(doc, chunk, terms)
+        else:
+            self._remove_terms(doc, None, self._terms[doc])
+        self._total_length -= self._lengths[doc]
+        self._lengths[doc] = 0
+        self._terms[doc] = ()
+
+    def _update_chunks(self, doc: int, text: str) -> None:
+        """Re-index a long document, replacing only the chunks that changed"""
+        chunks = self._chunks.get(doc)
+        if chunks is None:
+            self._unindex(doc)
+            chunks = self._chunks[doc] = _Chunks()
+        texts = split_chunks(text)
+        hashes = [hash(t) for t in texts]
+
+        # Chunks before and after the edited region are kept
+        old = chunks.hashes
+        limit = min(len(old), len(hashes))
+        head = 0
+        while head < limit and old[head] == hashes[head]:
+            head += 1
+        tail = 0
+        while tail < limit - head and old[len(old) - 1 - tail] == hashes[len(hashes) - 1 - tail]:
+            tail += 1
+
+        for chunk, terms in zip(chunks.ids[head:len(old) - tail], chunks.terms[head:len(old) - tail]):
+            self._remove_terms(doc, chunk, terms)
+        ids, lengths, terms = [], [], []
+        for chunk_text in texts[head:len(texts) - tail]:
+            chunk = chunks.next_id
+            chunks.next_id += 1
+            ids.append(chunk)
+            terms.append(self._add_tokens(doc, chunk, tokenize(chunk_text)))
+            lengths.append(self._last_length)
+        chunks.ids[head:len(old) - tail] = ids
+        chunks.lengths[head:len(old) - tail] = lengths
+        chunks.terms[head:len(old) - tail] = terms
+        chunks.hashes = hashes
+
+        # Offsets of every chunk, in characters and tokens
+        chunks.starts = list(accumulate([0] + [len(t) + 1 for t in texts[:-1]]))
+        chunks.offsets = list(accumulate([0] + chunks.lengths[:-1]))
+        chunks.order = {chunk: i for i, chunk in enumerate(chunks.ids)}
+        length = sum(chunks.lengths)
+        self._total_length += length - self._lengths[doc]
+        self._lengths[doc] = length
+
+    def _positions(self, doc: int, value) -> Iterable[int]:
+        """Document-wide token positions of one posting value"""
+        if type(value) is array:
+            return value
+        chunks = self._chunks[doc]
+        order, offsets = chunks.order, chunks.offsets
+        positions = []
+        for chunk, local in value.items():
+            positions.extend(map(offsets[order[chunk]].__add__, local))
+        return positions
+
+    def _expand(self, prefix: str) -> List[Tuple[str, Dict[int, Union[array, Dict[int, array]]]]]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        found = []
+        i = bisect_left(vocabulary, prefix)
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+            term = vocabulary[i]
+            found.append((term, self._postings[term]))
+            i += 1
+        found.sort(key=lambda item: -self._frequency[item[0]])
+        return found
+
+    def _match(self, clause: _Clause) -> Tuple[Dict[int, int], Callable[[int], Iterable[int]]]:
+        """({doc: occurrences of the clause}, doc -> token positions of the matched words)"""
+        terms = clause.terms
+        if clause.prefix:
+            entries = [entry for _, entry in self._expand(terms[0])[:MAX_PREFIX_EXPANSION]]
+            counts: Dict[int, int] = {}
+            get = counts.get
+            for entry in entries:
+                for doc, value in entry.items():
+                    counts[doc] = get(doc, 0) + _count(value)
+            return counts, lambda doc: [p for entry in entries if doc in entry
+                                        for p in self._positions(doc, entry[doc])]
+
+        entries = []
+        for term in terms:
+            entry = self._postings.get(term)
+            if entry is None:
+                return {}, None
+            entries.append(entry)
+        if len(entries) == 1:
+            entry = entries[0]
+            return ({doc: _count(value) for doc, value in entry.items()},
+                    lambda doc: self._positions(doc, entry[doc]))
+
+        # Phrase: starts p such that terms[i] occurs at p + i for every i
+        docs = set(min(entries, key=len))
+        for entry in entries:
+            docs.intersection_update(entry)
+        # Anchor on the rarest word, then keep the starts every other word confirms
+        frequency = self._frequency
+        order = sorted(range(len(terms)), key=lambda i: frequency[terms[i]])
+        anchor = order[0]
+        found = {}
+        for doc in docs:
+            starts = set(map((-anchor).__add__, self._positions(doc, entries[anchor][doc])))
+            for offset in order[1:]:
+                starts.intersection_update(map((-offset).__add__, self._positions(doc, entries[offset][doc])))
+                if not starts:
+                    break
+            if starts:
+                found[doc] = starts
+        width = len(entries)
+        return ({doc: len(starts) for doc, starts in found.items()},
+                lambda doc: [p + i for p in found[doc] for i in range(width)])
+
+
+def _count(value) -> int:
+    """Occurrences in one posting value (positions, or positions per chunk)"""
+    if type(value) is array:
+        return len(value)
+    return sum(map(len, value.values()))
+
+
+def _project_fields(project) -> Iterator[Tuple[Tuple[str, str, str], str]]:
+    """The fields the database's FTS tables index (see db._FTS_TABLES)"""
+    yield ('projects', project.id, 'title'), project.title
+    yield ('projects', project.id, 'description'), project.description
+    yield ('projects', project.id, 'content'), project.content
+    for scene in project.scenes:
+        yield ('scenes', scene.id, 'title'), scene.title
+        yield ('scenes', scene.id, 'summary'), scene.summary
+        yield ('scenes', scene.id, 'content'), scene.content
+    for character in project.characters:
+        yield ('characters', character.id, 'name'), character.name
+        yield ('characters', character.id, 'description'), character.description
+    for location in project.locations:
+        yield ('locations', location.id, 'name'), location.name
+        yield ('locations', location.id, 'description'), location.description
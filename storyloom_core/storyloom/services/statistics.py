@@ -0,0 +1,170 @@
+"""
+Text statistics - running word, character, sentence and paragraph counts
+kept up to date from edits, and the words written per day.
+
+Words are whitespace-separated tokens, as ``str.split()`` finds them. A
+sentence starts at the first word and after every word ending in ``.``,
+``!``, ``?`` or ``…`` (closing quotes and brackets may follow); a
+paragraph starts at the first word and after every line break. Each count
+is therefore a sum over word starts that depends only on the word before,
+so an edit changes it only around the edit.
+"""
+
+import re
+from datetime import date
+from typing import Callable, NamedTuple, Sequence, Tuple
+from .character_detection import diff_range
+
+# Average silent reading speed of adults, in words per minute
+READING_WPM = 238
+
+_WORD_START = re.compile(r'(?<!\S)\S')
+# Whitespace after a sentence-ending word, up to the next word
+_SENTENCE_BREAK = re.compile(r'[.!?…]["\'’”)\]»]*\s+(?=\S)')
+# Whitespace holding a line break between two words
+_PARAGRAPH_BREAK = re.compile(r'(?<=\S)[^\S\n]*\n\s*(?=\S)')
+
+# Characters read at a time while looking for the words around an edit
+_CHUNK = 64
+
+
+class TextCounts(NamedTuple):
+    """Counts of one text (or the change of an edit)"""
+    words: int = 0
+    characters: int = 0
+    sentences: int = 0
+    paragraphs: int = 0
+
+    @property
+    def reading_minutes(self) -> float:
+        """Estimated reading time at READING_WPM"""
+        return self.words / READING_WPM
+
+
+def _breaks(text: str, pos: int = 0) -> Tuple[int, int, int]:
+    """(word starts from pos, sentence breaks, paragraph breaks) of text"""
+    return (len(_WORD_START.findall(text, pos)), len(_SENTENCE_BREAK.findall(text)),
+            len(_PARAGRAPH_BREAK.findall(text)))
+
+
+def count_text(text: str) -> TextCounts:
+    """Count a whole text from scratch"""
+    words = len(text.split())
+    sentences, paragraphs = len(_SENTENCE_BREAK.findall(text)), len(_PARAGRAPH_BREAK.findall(text))
+    first = 1 if words else 0
+    return TextCounts(words, len(text), sentences + first, paragraphs + first)
+
+
+def _word_before(text: Sequence, pos: int) -> int:
+    """Start of the word before the one touching pos from the left (0 if there is none)"""
+    size = _CHUNK
+    while True:
+        a = max(pos - size, 0)
+        chunk = text[a:pos]
+        i = len(chunk)
+        # Back over the word touching pos, the whitespace before it and the word before that
+        for space in (False, True, False):
+            while i and chunk[i - 1].isspace() == space:
+                i -= 1
+        if i or not a:
+            return a + i
+        size *= 4
+
+
+def _next_word(text: Sequence, pos: int) -> int:
+    """Start of the first word after the one touching pos from the right (len(text) if there is none)"""
+    size, n = _CHUNK, len(text)
+    while True:
+        chunk = text[pos:pos + size]
+        i = 0
+        for space in (False, True):
+            while i < len(chunk) and chunk[i].isspace() == space:
+                i += 1
+        if i < len(chunk) or pos + size >= n:
+            return pos + i
+        size *= 4
+
+
+class TextStatistics:
+    """Running counts of a text, updated from each edit in time independent of the text's length.
+
+    ``apply_edit`` recounts only from the word before an edit to the word
+    after it, in the text before and after the edit, and applies the
+    difference. The text may be a str or a Rope (it is only sliced).
+    ``update`` diffs a new str against the previous one first, for callers
+    that only have the whole text.
+    """
+
+    def __init__(self, text: Sequence = ""):
+        self.reset(text)
+
+    def reset(self, text: Sequence = "") -> None:
+        """Count ``text`` from scratch"""
+        self.text = text
+        counts = count_text(text if isinstance(text, str) else str(text))
+        first = 1 if counts.words else 0
+        self._words, self._characters = counts.words, counts.characters
+        self._sentence_breaks, self._paragraph_breaks = counts.sentences - first, counts.paragraphs - first
+
+    @property
+    def counts(self) -> TextCounts:
+        first = 1 if self._words else 0
+        return TextCounts(self._words, self._characters, self._sentence_breaks + first,
+                          self._paragraph_breaks + first)
+
+    def update(self, new_text: str) -> TextCounts:
+        """Diff ``new_text`` (a str) against the previous text and apply the change"""
+        old = self.text if isinstance(self.text, str) else str(self.text)
+        start, old_end, new_end = diff_range(old, new_text)
+        return self.apply_edit(new_text, start, old[start:old_end], new_text[start:new_end])
+
+    def apply_edit(self, text: Sequence, start: int, removed: str, inserted: str) -> TextCounts:
+        """Follow an edit that replaced ``removed`` at start with ``inserted``; text is the new text
+
+        Returns the change of the counts.
+        """
+        before = self.counts
+        new_end = start + len(inserted)
+        a = _word_before(text, start)
+        b = min(_next_word(text, new_end) + 1, len(text))
+        after = text[a:b]
+        prior = after[:start - a] + removed + after[new_end - a:]
+        # The word at a is unchanged (and only counted when it may be the first)
+        pos = 0 if a == 0 else 1
+        new_words, new_sentences, new_paragraphs = _breaks(after, pos)
+        old_words, old_sentences, old_paragraphs = _breaks(prior, pos)
+
+        self.text = text
+        self._words += new_words - old_words
+        self._characters += len(inserted) - len(removed)
+        self._sentence_breaks += new_sentences - old_sentences
+        self._paragraph_breaks += new_paragraphs - old_paragraphs
+        counts = self.counts
+        return TextCounts(*(x - y for x, y in zip(counts, before)))
+
+
+class WritingSession:
+    """Words written today: the word count changes of edits, tallied per day"""
+
+    def __init__(self, today: Callable[[], date] = date.today):
+        self.today = today
+        self.day = today()
+        self.added = 0
+        self.deleted = 0
+
+    def record(self, words: int) -> None:
+        """Tally an edit that changed the word count by ``words``"""
+        day = self.today()
+        if day != self.day:
+            self.day, self.added, self.deleted = day, 0, 0
+        if words > 0:
+            self.added += words
+        else:
+            self.deleted -= words
+
+    @property
+    def written(self) -> int:
+        """Net words written today"""
+        if self.today() != self.day:
+            return 0
+        return self.added - self.deleted
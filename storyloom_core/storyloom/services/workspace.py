@@ -0,0 +1,164 @@
+"""
+Workspace - the projects in a directory, with an LRU cache of opened
+projects and background preloading so switching between books is instant
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from ..models.project import Project
+from ..storage.lazy_content import is_loaded
+from .metadata_index import MetadataIndex, ProjectSummary
+
+# Characters of text kept in opened projects before the least recently used are dropped
+DEFAULT_CACHE_BUDGET = 64 * 1024 * 1024
+
+
+def project_size(project: Project) -> int:
+    """Characters of text a project holds in memory (bodies still on disk excluded)"""
+    size = len(project.content) if is_loaded(project, 'content') else 0
+    size += len(project.title) + len(project.description)
+    for scene in project.scenes:
+        if is_loaded(scene, 'content'):
+            size += len(scene.content)
+        size += len(scene.title) + len(scene.summary)
+    for entity in chain(project.characters, project.locations):
+        size += len(entity.name) + len(entity.description)
+    return size
+
+
+class Workspace:
+    """Projects of one directory: listings, a bounded cache of open projects and preloading
+
+    ``summaries`` lists every project through a MetadataIndex, so only
+    files changed since the last listing (even in an earlier session) are
+    read. ``open`` makes a
+    project current on the ProjectService, taking it from the cache when
+    possible. Cached projects are dropped least recently used first once
+    they hold more than ``cache_budget`` characters of text or
+    ``max_projects`` projects; the current project and projects with
+    unsaved changes are never dropped (a current project that was never
+    saved has no path and is not kept). ``preload`` reads projects on a
+    background thread so the next ``open`` finds them cached.
+    """
+
+    def __init__(self, service, cache_budget: int = DEFAULT_CACHE_BUDGET, max_projects: int = 8,
+                 lazy: bool = False):
+        self.service = service
+        self.directory = Path(os.path.abspath(service.projects_dir))
+        self.cache_budget = cache_budget
+        self.max_projects = max_projects
+        self.lazy = lazy
+        self._cache: "OrderedDict[str, Tuple[Project, int]]" = OrderedDict()  # path -> (project, size)
+        self.index = MetadataIndex(self.directory)
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # Listing
+
+    def summaries(self) -> List[ProjectSummary]:
+        """Every readable project of the directory, most recently updated first"""
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.index.refresh().values(), key=lambda s: s.updated_at, reverse=True)
+
+    # Opening
+
+    def open(self, path: Union[str, Path]) -> Optional[Project]:
+        """Make the project at path current, reading it only if it isn't cached"""
+        path = os.path.abspath(path)
+        current = self.service.current_project
+        if current is not None and current.file_path and os.path.abspath(current.file_path) == path:
+            return current
+        with self._lock:
+            cached = self._cache.pop(path, None)
+            pending = self._pending.get(path)
+        if cached is not None:
+            project = cached[0]
+        elif pending is not None:
+            project = pending.result()
+        else:
+            project = self._read(path)
+        if project is None:
+            return None
+
+        if current is not None and current is not project and current.file_path:
+            self._remember(current)
+        self.service.activate_project(project)
+        with self._lock:
+            self._cache.pop(path, None)
+        self._evict()
+        return project
+
+    def preload(self, paths: Optional[List[Union[str, Path]]] = None, count: int = 3) -> List[Future]:
+        """Read projects on a background thread (by default the ``count`` most recently updated)"""
+        if paths is None:
+            paths = [summary.path for summary in self.summaries()[:count]]
+        current = self.service.current_project
+        futures = []
+        for path in map(os.path.abspath, paths):
+            with self._lock:
+                if path in self._cache or (current and current.file_path and
+                                           os.path.abspath(current.file_path) == path):
+                    continue
+                future = self._pending.get(path)
+                if future is None:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preload")
+                    future = self._pending[path] = self._executor.submit(self._preload, path)
+            futures.append(future)
+        return futures
+
+    def cached_paths(self) -> List[str]:
+        """Paths of the cached projects, least recently used first"""
+        with self._lock:
+            return list(self._cache)
+
+    def close(self) -> None:
+        """Stop the preloading thread and close the metadata index"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.index.close()
+
+    # Internals
+
+    def _read(self, path: str) -> Optional[Project]:
+        try:
+            return self.service._load_project(path, lazy=self.lazy)
+        except Exception as e:
+            print(f"Error opening project: {e}")
+            return None
+
+    def _preload(self, path: str) -> Optional[Project]:
+        project = self._read(path)
+        with self._lock:
+            self._pending.pop(path, None)
+            if project is not None:
+                self._cache[path] = (project, project_size(project))
+        self._evict()
+        return project
+
+    def _remember(self, project: Project) -> None:
+        with self._lock:
+            self._cache[os.path.abspath(project.file_path)] = (project, project_size(project))
+
+    def _evict(self) -> None:
+        """Drop least recently used projects beyond the budget"""
+        with self._lock:
+            total = sum(size for _, size in self._cache.values())
+            for path in list(self._cache):
+                if total <= self.cache_budget and len(self._cache) <= self.max_projects:
+                    break
+                project, size = self._cache[path]
+                if project is self.service.current_project or project.dirty:
+                    continue
+                del self._cache[path]
+                total -= size
+                if project._content_store:
+                    project._content_store.close()
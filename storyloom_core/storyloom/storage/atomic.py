@@ -0,0 +1,66 @@
+"""
+Atomic file replacement - write to a temp file, fsync, then rename over the target
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Union
+
+
+@contextmanager
+def atomic_open(path: Union[str, Path], mode: str = 'w', encoding: str = 'utf-8') -> Iterator[IO]:
+    """Open a temp file next to ``path`` that replaces it on successful exit.
+
+    Readers see either the old file or the complete new one, never a partial
+    write. If the block raises, the temp file is removed and ``path`` is left
+    untouched.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        # mkstemp creates 0600 files; keep the target's permissions instead
+        try:
+            os.chmod(tmp_path, path.stat().st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        if 'b' in mode:
+            f = os.fdopen(fd, mode)
+        else:
+            f = os.fdopen(fd, mode, encoding=encoding, newline='')
+        with f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(path.parent)
+
+
+def atomic_write(path: Union[str, Path], data: Union[str, bytes]) -> None:
+    """Atomically replace ``path`` with ``data``"""
+    with atomic_open(path, 'wb' if isinstance(data, bytes) else 'w') as f:
+        f.write(data)
+
+
+def _fsync_dir(directory: Path) -> None:
+    # Persist the rename itself; not supported on every platform
+    if os.name != 'posix':
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
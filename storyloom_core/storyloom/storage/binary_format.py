@@ -0,0 +1,454 @@
+"""
+Binary project container - a compact alternative to JSON .story files for
+autosave and quick-open.
+
+Layout (all integers little-endian)::
+
+    header     "STORYBIN" magic, u16 version, u16 section count
+    directory  per section: 4-byte tag, u64 offset, u64 length, u32 flags
+    sections   STRS string table, UIDS 16-byte UUIDs, PROJ project header
+               (with word and entity counts since version 3),
+               CHAR/LOCS/SCEN/RELS fixed-size entity records, TEXT bodies,
+               optional ANLY saved co-occurrence counts (JSON)
+
+Entity records refer to strings and ids by index, so repeated names and
+ids are stored once. The string table is a UTF-8 blob plus the byte offset
+where each string ends, so one string can be decoded on its own (version 1
+files stored lengths in characters instead and are still read).
+Timestamps are microseconds since 1970-01-01 (naive, like the rest of the
+models). Readers use the directory to skip sections;
+``read_binary_metadata`` never touches the (large) TEXT section.
+"""
+
+import json
+import re
+import struct
+import sys
+import zlib
+from array import array
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from pathlib import Path
+from typing import Collection, Dict, List, Optional, Union
+from ..models.project import Project
+from ..models.character import Character
+from ..models.location import Location
+from ..models.scene import Scene
+from ..models.relationship import Relationship
+from .atomic import atomic_write
+
+BINARY_MAGIC = b"STORYBIN"
+BINARY_VERSION = 3
+
+# File extensions ProjectService saves in the binary container
+BINARY_EXTENSIONS = ('.storyb',)
+
+_HEADER = struct.Struct('<8sHH')
+_DIRECTORY_ENTRY = struct.Struct('<4sQQI')
+_FLAG_ZLIB = 1
+
+# Id references: >= 0 indexes UIDS, < 0 is -(string index + 1) for ids that
+# are not canonical UUIDs, _NO_ID stands for None
+_NO_ID = -2 ** 31
+
+_PROJECT = struct.Struct('<iIIIIqq')        # id, title, description, content off/len, created, updated
+_PROJECT_COUNTS = struct.Struct('<IIII')    # words, characters, locations, scenes (follows _PROJECT)
+_CHARACTER = struct.Struct('<iIIIIIqq')     # id, name, role, description, goals start/count, created, updated
+_LOCATION = struct.Struct('<iIIIqq')        # id, name, type, description, created, updated
+_SCENE = struct.Struct('<iIIiqIIIIqq')      # id, title, summary, location, order, content off/len,
+                                            # character ids start/count, created, updated
+_RELATIONSHIP = struct.Struct('<iiiIIdqq')  # id, source, target, type, description, weight, created, updated
+_COUNT = struct.Struct('<I')
+
+_CANONICAL_UUID = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def is_binary_project(path: Union[str, Path]) -> bool:
+    """Return True if ``path`` is a binary project container (by magic bytes)"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    except OSError:
+        return False
+
+
+def _micros(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _datetime(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def _format_uuid(h: str) -> str:
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _pack_array(typecode: str, values) -> bytes:
+    data = array(typecode, values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+
+def _unpack_array(typecode: str, raw) -> array:
+    data = array(typecode)
+    data.frombytes(raw)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data
+
+
+class _TableBuilder:
+    """Interns strings and ids while a project is being encoded"""
+
+    def __init__(self):
+        self.strings: Dict[str, int] = {}
+        self.uuids: Dict[str, int] = {}
+        self.uuid_bytes: List[bytes] = []
+
+    def string(self, value: Optional[str]) -> int:
+        value = value or ""
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def ident(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NO_ID
+        index = self.uuids.get(value)
+        if index is not None:
+            return index
+        if not _CANONICAL_UUID.fullmatch(value):
+            return -self.string(value) - 1
+        index = self.uuids[value] = len(self.uuid_bytes)
+        self.uuid_bytes.append(bytes.fromhex(value.replace('-', '')))
+        return index
+
+
+def encode_binary_project(project: Project, compress_level: int = 1) -> bytes:
+    """Encode ``project`` as a binary container"""
+    tables = _TableBuilder()
+    string, ident = tables.string, tables.ident
+
+    bodies: List[str] = []
+    text_length = 0
+
+    def body(value: str):
+        nonlocal text_length
+        bodies.append(value)
+        start, text_length = text_length, text_length + len(value)
+        return start, len(value)
+
+    content_start, content_length = body(project.content)
+    header = _PROJECT.pack(ident(project.id), string(project.title), string(project.description),
+                           content_start, content_length,
+                           _micros(project.created_at), _micros(project.updated_at))
+    header += _PROJECT_COUNTS.pack(len(project.content.split()), len(project.characters),
+                                   len(project.locations), len(project.scenes))
+
+    goals: List[int] = []
+    characters = [_COUNT.pack(len(project.characters))]
+    for c in project.characters:
+        start = len(goals)
+        goals.extend(string(g) for g in c.goals)
+        characters.append(_CHARACTER.pack(ident(c.id), string(c.name), string(c.role),
+                                          string(c.description), start, len(c.goals),
+                                          _micros(c.created_at), _micros(c.updated_at)))
+    characters.append(_pack_array('I', goals))
+
+    locations = [_COUNT.pack(len(project.locations))]
+    for l in project.locations:
+        locations.append(_LOCATION.pack(ident(l.id), string(l.name), string(l.type),
+                                        string(l.description),
+                                        _micros(l.created_at), _micros(l.updated_at)))
+
+    character_ids: List[int] = []
+    scenes = [_COUNT.pack(len(project.scenes))]
+    for s in project.scenes:
+        start = len(character_ids)
+        character_ids.extend(ident(cid) for cid in s.character_ids)
+        content_start, content_length = body(s.content)
+        scenes.append(_SCENE.pack(ident(s.id), string(s.title), string(s.summary),
+                                  ident(s.location_id), s.order_index, content_start, content_length,
+                                  start, len(s.character_ids),
+                                  _micros(s.created_at), _micros(s.updated_at)))
+    scenes.append(_pack_array('i', character_ids))
+
+    relationships = [_COUNT.pack(len(project.relationships))]
+    for r in project.relationships:
+        relationships.append(_RELATIONSHIP.pack(ident(r.id), ident(r.source_id), ident(r.target_id),
+                                                string(r.type), string(r.description), r.weight,
+                                                _micros(r.created_at), _micros(r.updated_at)))
+
+    # Strings are stored as one UTF-8 blob plus the byte offset where each one ends
+    strings = [value.encode('utf-8') for value in tables.strings]
+    string_table = (_COUNT.pack(len(strings)) + _pack_array('I', accumulate(map(len, strings)))
+                    + b"".join(strings))
+
+    sections = [
+        (b'STRS', zlib.compress(string_table, compress_level), _FLAG_ZLIB),
+        (b'UIDS', b"".join(tables.uuid_bytes), 0),
+        (b'PROJ', header, 0),
+        (b'CHAR', b"".join(characters), 0),
+        (b'LOCS', b"".join(locations), 0),
+        (b'SCEN', b"".join(scenes), 0),
+        (b'RELS', b"".join(relationships), 0),
+        (b'TEXT', zlib.compress("".join(bodies).encode('utf-8'), compress_level), _FLAG_ZLIB),
+    ]
+    if project._analysis:
+        analysis = json.dumps(project._analysis, separators=(',', ':')).encode('utf-8')
+        sections.append((b'ANLY', zlib.compress(analysis, compress_level), _FLAG_ZLIB))
+
+    offset = _HEADER.size + _DIRECTORY_ENTRY.size * len(sections)
+    out = [_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(sections))]
+    for tag, payload, flags in sections:
+        out.append(_DIRECTORY_ENTRY.pack(tag, offset, len(payload), flags))
+        offset += len(payload)
+    out.extend(payload for _, payload, _ in sections)
+    return b"".join(out)
+
+
+def write_binary_project(project: Project, path: Union[str, Path]) -> None:
+    """Atomically replace ``path`` with the binary encoding of ``project``"""
+    atomic_write(path, encode_binary_project(project))
+
+
+class BinaryProjectReader:
+    """Random access to the sections of a binary project container"""
+
+    def __init__(self, data: bytes):
+        magic, version, count = _HEADER.unpack_from(data, 0)
+        if magic != BINARY_MAGIC:
+            raise ValueError("Not a binary project file")
+        if version > BINARY_VERSION:
+            raise ValueError(f"Unsupported binary project version {version}")
+        self.version = version
+        self.data = memoryview(data)
+        self.directory = {}
+        for i in range(count):
+            tag, offset, length, flags = _DIRECTORY_ENTRY.unpack_from(
+                data, _HEADER.size + i * _DIRECTORY_ENTRY.size)
+            self.directory[tag.decode('ascii')] = (offset, length, flags)
+        self._string_table = None
+        self._strings: Optional[List[str]] = None
+        self._uuids: Optional[List[str]] = None
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "BinaryProjectReader":
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def section(self, tag: str):
+        """Raw (decompressed) payload of a section, empty if absent"""
+        if tag not in self.directory:
+            return b""
+        offset, length, flags = self.directory[tag]
+        payload = self.data[offset:offset + length]
+        return zlib.decompress(payload) if flags & _FLAG_ZLIB else payload
+
+    def _string_blob(self):
+        """The string table, decompressed once: (end offsets, blob)"""
+        if self._string_table is None:
+            raw = bytes(self.section('STRS'))
+            count = _COUNT.unpack_from(raw, 0)[0] if raw else 0
+            self._string_table = (_unpack_array('I', raw[4:4 + 4 * count]), raw[4 + 4 * count:])
+        return self._string_table
+
+    @property
+    def strings(self) -> List[str]:
+        if self._strings is None:
+            ends, blob = self._string_blob()
+            if self.version < 2:
+                # Version 1 stored each string's length in characters
+                text, lengths = blob.decode('utf-8'), ends
+                ends = list(accumulate(lengths))
+                self._strings = [text[end - n:end] for end, n in zip(ends, lengths)]
+            else:
+                self._strings = [blob[a:b].decode('utf-8') for a, b in zip([0] + ends.tolist(), ends)]
+        return self._strings
+
+    @property
+    def uuids(self) -> List[str]:
+        if self._uuids is None:
+            raw = bytes(self.section('UIDS'))
+            hexed = raw.hex()
+            self._uuids = [_format_uuid(hexed[i:i + 32]) for i in range(0, len(hexed), 32)]
+        return self._uuids
+
+    def ident(self, ref: int) -> Optional[str]:
+        if ref == _NO_ID:
+            return None
+        return self.uuids[ref] if ref >= 0 else self.strings[-ref - 1]
+
+    def _records(self, tag: str, record: struct.Struct):
+        raw = self.section(tag)
+        if not raw:
+            return [], raw, 0
+        count, = _COUNT.unpack_from(raw, 0)
+        end = _COUNT.size + count * record.size
+        return record.iter_unpack(raw[_COUNT.size:end]), raw, end
+
+    def _string_at(self, index: int) -> str:
+        """One string-table entry, decoding only its own bytes"""
+        if self._strings is not None or self.version < 2:
+            return self.strings[index]
+        ends, blob = self._string_blob()
+        return blob[ends[index - 1] if index else 0:ends[index]].decode('utf-8')
+
+    def _ident_at(self, ref: int) -> Optional[str]:
+        """One id reference, without decoding the whole id table"""
+        if ref == _NO_ID:
+            return None
+        if ref < 0:
+            return self._string_at(-ref - 1)
+        return _format_uuid(bytes(self.section('UIDS')[16 * ref:16 * ref + 16]).hex())
+
+    def metadata(self) -> dict:
+        """Project id, title, description and timestamps (reads no bodies)"""
+        ref, title, description, _, _, created, updated = _PROJECT.unpack_from(self.section('PROJ'))
+        return {
+            'id': self._ident_at(ref),
+            'title': self._string_at(title),
+            'description': self._string_at(description),
+            'created_at': _datetime(created),
+            'updated_at': _datetime(updated),
+        }
+
+    def entity_counts(self) -> Dict[str, int]:
+        """Record count of each entity section (CHAR, LOCS, SCEN, RELS), decoding no records"""
+        counts = {}
+        for tag in ('CHAR', 'LOCS', 'SCEN', 'RELS'):
+            raw = self.section(tag)
+            counts[tag] = _COUNT.unpack_from(raw, 0)[0] if raw else 0
+        return counts
+
+    def summary_counts(self) -> Dict[str, int]:
+        """Word, character, location and scene counts, as project_summary_counts gives them
+
+        Read from the project header; files from before version 3 count the
+        words of the decompressed content instead.
+        """
+        raw = self.section('PROJ')
+        if len(raw) >= _PROJECT.size + _PROJECT_COUNTS.size:
+            return dict(zip(('words', 'characters', 'locations', 'scenes'),
+                            _PROJECT_COUNTS.unpack_from(raw, _PROJECT.size)))
+        counts = self.entity_counts()
+        return {'words': len(self.content().split()), 'characters': counts['CHAR'],
+                'locations': counts['LOCS'], 'scenes': counts['SCEN']}
+
+    def content(self) -> str:
+        """The project's own body, without building any entities"""
+        _, _, _, offset, length, _, _ = _PROJECT.unpack_from(self.section('PROJ'))
+        return bytes(self.section('TEXT')).decode('utf-8')[offset:offset + length]
+
+    def project(self, sections: Optional[Collection[str]] = None) -> Project:
+        """Decode the project; ``sections`` limits which optional sections are read
+
+        Skipped entity sections leave their list empty and skipping TEXT leaves
+        every body empty.
+        """
+        def wanted(tag: str) -> bool:
+            return sections is None or tag in sections
+
+        strings, ident = self.strings, self.ident
+        text = bytes(self.section('TEXT')).decode('utf-8') if wanted('TEXT') else ""
+
+        characters = []
+        if wanted('CHAR'):
+            records, raw, end = self._records('CHAR', _CHARACTER)
+            goals = _unpack_array('I', raw[end:])
+            characters = [
+                Character(id=ident(ref), name=strings[name], role=strings[role],
+                          description=strings[description],
+                          goals=[strings[g] for g in goals[start:start + count]],
+                          created_at=_datetime(created), updated_at=_datetime(updated))
+                for ref, name, role, description, start, count, created, updated in records
+            ]
+
+        locations = []
+        if wanted('LOCS'):
+            records, _, _ = self._records('LOCS', _LOCATION)
+            locations = [
+                Location(id=ident(ref), name=strings[name], type=strings[kind],
+                         description=strings[description],
+                         created_at=_datetime(created), updated_at=_datetime(updated))
+                for ref, name, kind, description, created, updated in records
+            ]
+
+        scenes = []
+        if wanted('SCEN'):
+            records, raw, end = self._records('SCEN', _SCENE)
+            character_ids = [ident(ref) for ref in _unpack_array('i', raw[end:])]
+            scenes = [
+                Scene(id=ident(ref), title=strings[title], summary=strings[summary],
+                      content=text[offset:offset + length],
+                      character_ids=character_ids[start:start + count],
+                      location_id=ident(location), order_index=order,
+                      created_at=_datetime(created), updated_at=_datetime(updated))
+                for (ref, title, summary, location, order, offset, length, start, count,
+                     created, updated) in records
+            ]
+
+        relationships = []
+        if wanted('RELS'):
+            records, _, _ = self._records('RELS', _RELATIONSHIP)
+            relationships = [
+                Relationship(id=ident(ref), source_id=ident(source), target_id=ident(target),
+                             type=strings[kind], description=strings[description], weight=weight,
+                             created_at=_datetime(created), updated_at=_datetime(updated))
+                for ref, source, target, kind, description, weight, created, updated in records
+            ]
+
+        ref, title, description, offset, length, created, updated = _PROJECT.unpack_from(self.section('PROJ'))
+        project = Project(
+            id=ident(ref),
+            title=strings[title],
+            description=strings[description],
+            content=text[offset:offset + length],
+            characters=characters,
+            locations=locations,
+            scenes=scenes,
+            relationships=relationships,
+            created_at=_datetime(created),
+            updated_at=_datetime(updated),
+        )
+        if wanted('ANLY') and 'ANLY' in self.directory:
+            project._analysis = json.loads(bytes(self.section('ANLY')))
+        return project
+
+
+def read_binary_project(path: Union[str, Path], sections: Optional[Collection[str]] = None) -> Project:
+    """Load a project from a binary container"""
+    return BinaryProjectReader.open(path).project(sections)
+
+
+def read_binary_header(path: Union[str, Path]) -> BinaryProjectReader:
+    """A reader over only the file prefix up to the project header's sections
+
+    Its metadata (and, from version 3, summary_counts) can be read; entity
+    and body sections are left on disk.
+    """
+    with open(path, 'rb') as f:
+        prefix = f.read(_HEADER.size)
+        magic, _, count = _HEADER.unpack(prefix)
+        if magic != BINARY_MAGIC:
+            raise ValueError("Not a binary project file")
+        prefix += f.read(count * _DIRECTORY_ENTRY.size)
+        end = len(prefix)
+        for tag, offset, length, _ in _DIRECTORY_ENTRY.iter_unpack(prefix[_HEADER.size:]):
+            if tag in (b'STRS', b'UIDS', b'PROJ'):
+                end = max(end, offset + length)
+        f.seek(0)
+        return BinaryProjectReader(f.read(end))
+
+
+def read_binary_metadata(path: Union[str, Path]) -> dict:
+    """Read only the project header of a binary container"""
+    return read_binary_header(path).metadata()
@@ -0,0 +1,347 @@
+"""
+Streaming JSON for .story files - a byte-level reader that yields one
+member or array element at a time (optionally leaving large string values
+on disk as byte spans) and a writer that encodes entity arrays from
+generators one element at a time.
+"""
+
+import json
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import IO, Any, Collection, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+_WS = re.compile(rb'[ \t\n\r]*')
+_SCALAR = re.compile(rb'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null')
+_STRUCTURE = re.compile(rb'[]["{}]')
+
+_QUOTE, _LBRACE, _RBRACE, _LBRACKET, _RBRACKET, _COMMA, _COLON, _BACKSLASH = b'"{}[],:\\'
+
+# Drop already-scanned pages of a memory-mapped file every this many bytes
+_RELEASE_EVERY = 16 * 1024 * 1024
+
+
+class Span(NamedTuple):
+    """Byte range of an undecoded JSON string literal (quotes included)"""
+    start: int
+    end: int
+
+
+def decode_span(raw: bytes) -> str:
+    """Decode the bytes of a JSON string literal recorded as a ``Span``"""
+    body = raw[1:-1]
+    if b'\\' not in body:
+        return body.decode('utf-8')
+    return json.loads(raw)
+
+
+class JsonScanner:
+    """Recursive-descent JSON reader over a bytes-like buffer (bytes or mmap).
+
+    String values stored under any of ``lazy_keys`` are returned as ``Span``
+    placeholders instead of being decoded, so the caller can fetch them from
+    disk later.
+    """
+
+    def __init__(self, buf, lazy_keys: Collection[str] = ()):
+        self.buf = buf
+        self.lazy_keys = frozenset(lazy_keys)
+        self._released = 0
+
+    def parse(self, pos: int = 0) -> Tuple[Any, int]:
+        """Parse the value starting at ``pos``; returns (value, end)"""
+        return self._value(pos, False)
+
+    def iter_members(self, pos: int = 0, stream_keys: Collection[str] = ()) -> Iterator[Tuple[str, Any]]:
+        """Yield the (key, value) members of the object at ``pos`` one at a time.
+
+        Array values under ``stream_keys`` are yielded as iterators over their
+        items, so only one element is materialized at a time. Such an iterator
+        is drained automatically if the caller moves on without exhausting it.
+        """
+        buf = self.buf
+        pos = self._ws(pos)
+        if pos >= len(buf) or buf[pos] != _LBRACE:
+            raise self._error("expected '{'", pos)
+        pos = self._ws(pos + 1)
+        if buf[pos] == _RBRACE:
+            return
+        while True:
+            if buf[pos] != _QUOTE:
+                raise self._error("expected object key", pos)
+            end = self._string_end(pos)
+            key = decode_span(buf[pos:end])
+            pos = self._ws(end)
+            if buf[pos] != _COLON:
+                raise self._error("expected ':'", pos)
+            pos = self._ws(pos + 1)
+
+            if key in stream_keys and buf[pos] == _LBRACKET:
+                cursor = [pos]
+                items = self._iter_items(cursor)
+                yield key, items
+                for _ in items:
+                    pass
+                pos = cursor[0]
+            else:
+                value, pos = self._value(pos, key in self.lazy_keys)
+                yield key, value
+
+            pos = self._ws(pos)
+            if buf[pos] == _COMMA:
+                pos = self._ws(pos + 1)
+            elif buf[pos] == _RBRACE:
+                return
+            else:
+                raise self._error("expected ',' or '}'", pos)
+
+    def _iter_items(self, cursor: List[int]) -> Iterator[Any]:
+        # cursor[0] tracks the read position so iter_members can resume
+        buf = self.buf
+        pos = self._ws(cursor[0] + 1)
+        if buf[pos] == _RBRACKET:
+            cursor[0] = pos + 1
+            return
+        while True:
+            item, pos = self._value(pos, False)
+            self._release(pos)
+            pos = self._ws(pos)
+            if buf[pos] == _COMMA:
+                cursor[0] = pos + 1
+                yield item
+                pos = cursor[0]
+            elif buf[pos] == _RBRACKET:
+                cursor[0] = pos + 1
+                yield item
+                return
+            else:
+                raise self._error("expected ',' or ']'", pos)
+
+    def _ws(self, pos: int) -> int:
+        return _WS.match(self.buf, pos).end()
+
+    def _error(self, message: str, pos: int) -> ValueError:
+        return ValueError(f"Invalid JSON: {message} at byte {pos}")
+
+    def _string_end(self, pos: int) -> int:
+        """End of the string literal opening at ``pos`` (memchr-speed for long bodies)"""
+        buf = self.buf
+        i = pos + 1
+        while True:
+            j = buf.find(b'"', i)
+            if j < 0:
+                raise self._error("unterminated string", pos)
+            k = j - 1
+            while buf[k] == _BACKSLASH:
+                k -= 1
+            if (j - 1 - k) % 2 == 0:
+                return j + 1
+            i = j + 1
+
+    def _container_end(self, pos: int) -> int:
+        """End of the array/object opening at ``pos``, or -1 if it has a lazy key inside
+
+        Containers without lazy keys are then decoded by ``json.loads`` in
+        one call instead of value by value.
+        """
+        buf, lazy_keys = self.buf, self.lazy_keys
+        search = _STRUCTURE.search
+        depth = 0
+        while True:
+            m = search(buf, pos)
+            if m is None:
+                raise self._error("unexpected end of data", pos)
+            start = m.start()
+            c = buf[start]
+            if c == _QUOTE:
+                pos = self._string_end(start)
+                if lazy_keys:
+                    after = self._ws(pos)
+                    if after < len(buf) and buf[after] == _COLON \
+                            and decode_span(buf[start:pos]) in lazy_keys:
+                        return -1
+            elif c == _LBRACE or c == _LBRACKET:
+                depth += 1
+                pos = start + 1
+            else:
+                depth -= 1
+                pos = start + 1
+                if depth == 0:
+                    return pos
+
+    def _release(self, pos: int) -> None:
+        # Scanned pages of a mapped file are not needed again; don't let them
+        # pile up in the resident set
+        if pos - self._released >= _RELEASE_EVERY and isinstance(self.buf, mmap.mmap) \
+                and hasattr(mmap, 'MADV_DONTNEED'):
+            end = pos - pos % mmap.PAGESIZE
+            self.buf.madvise(mmap.MADV_DONTNEED, 0, end)
+            self._released = end
+
+    def _value(self, pos: int, lazy: bool) -> Tuple[Any, int]:
+        buf = self.buf
+        pos = self._ws(pos)
+        if pos >= len(buf):
+            raise self._error("unexpected end of data", pos)
+        c = buf[pos]
+
+        if c == _QUOTE:
+            end = self._string_end(pos)
+            return (Span(pos, end) if lazy else decode_span(buf[pos:end])), end
+
+        if c == _LBRACE or c == _LBRACKET:
+            end = self._container_end(pos)
+            if end >= 0:
+                return json.loads(buf[pos:end]), end
+
+        if c == _LBRACE:
+            obj = {}
+            pos = self._ws(pos + 1)
+            if buf[pos] == _RBRACE:
+                return obj, pos + 1
+            while True:
+                if buf[pos] != _QUOTE:
+                    raise self._error("expected object key", pos)
+                end = self._string_end(pos)
+                key = decode_span(buf[pos:end])
+                pos = self._ws(end)
+                if buf[pos] != _COLON:
+                    raise self._error("expected ':'", pos)
+                obj[key], pos = self._value(pos + 1, key in self.lazy_keys)
+                pos = self._ws(pos)
+                if buf[pos] == _COMMA:
+                    pos = self._ws(pos + 1)
+                elif buf[pos] == _RBRACE:
+                    return obj, pos + 1
+                else:
+                    raise self._error("expected ',' or '}'", pos)
+
+        if c == _LBRACKET:
+            items = []
+            pos = self._ws(pos + 1)
+            if buf[pos] == _RBRACKET:
+                return items, pos + 1
+            while True:
+                item, pos = self._value(pos, False)
+                items.append(item)
+                self._release(pos)
+                pos = self._ws(pos)
+                if buf[pos] == _COMMA:
+                    pos += 1
+                elif buf[pos] == _RBRACKET:
+                    return items, pos + 1
+                else:
+                    raise self._error("expected ',' or ']'", pos)
+
+        m = _SCALAR.match(buf, pos)
+        if not m:
+            raise self._error("unexpected character", pos)
+        return json.loads(buf[pos:m.end()]), m.end()
+
+
+class StoryFileReader:
+    """Memory-mapped reader for JSON .story files.
+
+    Use as a context manager; values must be consumed before it closes::
+
+        with StoryFileReader(path) as reader:
+            for key, value in reader.members(stream_keys=('scenes',)):
+                ...
+    """
+
+    def __init__(self, path: Union[str, Path], lazy_keys: Collection[str] = ()):
+        self.path = Path(path)
+        self.lazy_keys = lazy_keys
+        self._file: Optional[IO[bytes]] = None
+        self._buf: Optional[mmap.mmap] = None
+
+    def __enter__(self) -> "StoryFileReader":
+        self._file = open(self.path, 'rb')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.close()
+            raise ValueError(f"{self.path} is empty")
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._buf.close()
+        self._file.close()
+
+    def members(self, stream_keys: Collection[str] = ()) -> Iterator[Tuple[str, Any]]:
+        return JsonScanner(self._buf, self.lazy_keys).iter_members(0, stream_keys)
+
+    def text(self, span: Span) -> str:
+        """Decode a string left undecoded as a ``Span``"""
+        return decode_span(self._buf[span.start:span.end])
+
+
+class _CountingWriter:
+    def __init__(self, f: IO[bytes]):
+        self.f = f
+        self.pos = 0
+
+    def write(self, text: str) -> None:
+        data = text.encode('utf-8')
+        self.f.write(data)
+        self.pos += len(data)
+
+
+def write_json_stream(f: IO[bytes], members: Iterable[Tuple[str, Any]], pretty: bool = False,
+                      track_keys: Collection[str] = ('content',),
+                      root_section: Optional[str] = None) -> Dict[Tuple[Optional[str], Hashable], Span]:
+    """Write a JSON object to binary file ``f`` from (key, value) members.
+
+    Values that are iterators are written as arrays one element at a time,
+    so the caller can feed entities from generators. The output matches
+    ``json.dumps`` with compact separators (or ``indent=2`` if ``pretty``).
+
+    Returns the byte ``Span`` of every string written under ``track_keys``,
+    keyed by (array member name, element ``id``); members of the root object
+    are keyed by (``root_section``, root ``id``).
+    """
+    out = _CountingWriter(f)
+    spans: Dict[Tuple[Optional[str], Hashable], Span] = {}
+    track = frozenset(track_keys)
+    key_sep = ": " if pretty else ":"
+
+    def newline(depth: int) -> str:
+        return "\n" + "  " * depth if pretty else ""
+
+    def dumps(value: Any, depth: int) -> str:
+        if pretty:
+            return json.dumps(value, indent=2, default=str).replace("\n", newline(depth))
+        return json.dumps(value, separators=(',', ':'), default=str)
+
+    def write_object(items: Iterable[Tuple[str, Any]], depth: int, section: Optional[str], ident: Any) -> None:
+        out.write("{")
+        first = True
+        for key, value in items:
+            out.write(("" if first else ",") + newline(depth + 1) + json.dumps(key) + key_sep)
+            first = False
+            if key == 'id' and ident is None:
+                ident = value
+            if key in track and isinstance(value, str):
+                start = out.pos
+                out.write(json.dumps(value))
+                spans[(section, ident)] = Span(start, out.pos)
+            elif isinstance(value, Iterator):
+                write_array(value, depth + 1, key)
+            else:
+                out.write(dumps(value, depth + 1))
+        out.write(("" if first else newline(depth)) + "}")
+
+    def write_array(items: Iterator[Any], depth: int, section: str) -> None:
+        out.write("[")
+        first = True
+        for item in items:
+            out.write(("" if first else ",") + newline(depth + 1))
+            first = False
+            if isinstance(item, dict) and not track.isdisjoint(item):
+                write_object(item.items(), depth + 1, section, None)
+            else:
+                out.write(dumps(item, depth + 1))
+        out.write(("" if first else newline(depth)) + "]")
+
+    write_object(members, 0, root_section, None)
+    return spans
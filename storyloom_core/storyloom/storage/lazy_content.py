@@ -0,0 +1,239 @@
+"""
+Lazy text fields - scene and project bodies fetched from disk on first
+access and evicted again under a memory budget.
+"""
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple, Union
+from .json_stream import Span, decode_span
+
+# Default resident budget for lazily loaded bodies (in characters)
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+
+_MISSING = object()
+
+
+class LazyText:
+    """Descriptor for text that may live in a ``ContentStore``.
+
+    Installed on a (dataclass) model by ``lazy_text_fields``. Until loaded,
+    the instance holds no value and reading the field asks the store bound
+    by ``bind_lazy``. Assigning the field works as usual and detaches it
+    from the store. The value itself is kept in the instance ``__dict__``,
+    or in the field's own slot on ``__slots__`` classes.
+    """
+
+    def __init__(self, name: str, default: str = "", slot=None):
+        self.name = name
+        self.default = default
+        self.slot = slot
+
+    def peek(self, obj) -> Any:
+        """The resident value, or ``_MISSING`` - never loads"""
+        if self.slot is None:
+            return obj.__dict__.get(self.name, _MISSING)
+        try:
+            return self.slot.__get__(obj, type(obj))
+        except AttributeError:
+            return _MISSING
+
+    def put(self, obj, value: str) -> None:
+        if self.slot is None:
+            obj.__dict__[self.name] = value
+        else:
+            self.slot.__set__(obj, value)
+
+    def drop(self, obj) -> None:
+        if self.slot is None:
+            obj.__dict__.pop(self.name, None)
+        elif self.peek(obj) is not _MISSING:
+            self.slot.__delete__(obj)
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = self.peek(obj)
+        if value is not _MISSING:
+            return value
+        sources = getattr(obj, '_lazy_sources', None)
+        source = sources.get(self.name) if sources else None
+        if source is None:
+            return self.default
+        store, key = source
+        return store.load(obj, self.name, key)
+
+    def __set__(self, obj, value):
+        self.put(obj, value)
+
+
+def lazy_text_fields(*names: str):
+    """Class decorator (applied above ``@dataclass``) making text fields lazy
+
+    The class needs a ``_lazy_sources`` attribute (a field or class-level
+    ``None`` default) for ``bind_lazy`` to record where values live.
+    """
+    def decorate(cls):
+        for name in names:
+            attr = cls.__dict__.get(name, "")
+            if isinstance(attr, str):
+                setattr(cls, name, LazyText(name, default=attr))
+            else:
+                # Slot member descriptor created by @slotted
+                setattr(cls, name, LazyText(name, slot=attr))
+        return cls
+    return decorate
+
+
+def lazy_field(obj, name: str) -> LazyText:
+    descriptor = getattr(type(obj), name)
+    if not isinstance(descriptor, LazyText):
+        raise TypeError(f"{type(obj).__name__}.{name} is not a lazy text field")
+    return descriptor
+
+
+def bind_lazy(obj, name: str, store: "ContentStore", key: Hashable) -> None:
+    """Drop ``obj.<name>`` from memory and fetch it from ``store`` on access"""
+    lazy_field(obj, name).drop(obj)
+    if getattr(obj, '_lazy_sources', None) is None:
+        object.__setattr__(obj, '_lazy_sources', {})
+    obj._lazy_sources[name] = (store, key)
+
+
+def is_loaded(obj, name: str) -> bool:
+    """True if ``obj.<name>`` is currently resident (or held by an in-memory source such as a rope)"""
+    if lazy_field(obj, name).peek(obj) is not _MISSING:
+        return True
+    sources = getattr(obj, '_lazy_sources', None)
+    source = sources.get(name) if sources else None
+    return source is not None and getattr(source[0], 'in_memory', False)
+
+
+class ContentStore:
+    """Base class for lazy text back-ends with an LRU memory budget.
+
+    Subclasses implement ``_fetch(key)``. Loaded values are kept on the
+    owning object until the budget is exceeded, then evicted oldest-loaded
+    first (``touch`` refreshes an entry). Values replaced since loading are
+    never evicted, as they are no longer backed by the store.
+    """
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self.resident = 0
+        self.loads = 0
+        self._lru: "OrderedDict[Tuple[int, str], Tuple[Any, str, str]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def load(self, obj, name: str, key: Hashable) -> str:
+        with self._lock:
+            field = lazy_field(obj, name)
+            value = field.peek(obj)
+            if value is not _MISSING:
+                return value
+            value = self._fetch(key)
+            self.loads += 1
+            field.put(obj, value)
+            self._lru[(id(obj), name)] = (obj, name, value)
+            self.resident += len(value)
+            self._evict()
+            return value
+
+    def touch(self, obj, name: str) -> None:
+        """Mark a loaded value as recently used"""
+        with self._lock:
+            if (id(obj), name) in self._lru:
+                self._lru.move_to_end((id(obj), name))
+
+    def evict_all(self) -> None:
+        """Drop every resident, unmodified value"""
+        with self._lock:
+            budget, self.memory_budget = self.memory_budget, 0
+            try:
+                self._evict()
+            finally:
+                self.memory_budget = budget
+
+    def _evict(self) -> None:
+        while self.resident > self.memory_budget and self._lru:
+            _, (obj, name, value) = self._lru.popitem(last=False)
+            self.resident -= len(value)
+            field = lazy_field(obj, name)
+            if field.peek(obj) is value:
+                field.drop(obj)
+            else:
+                # Replaced since loading: the object owns its value now
+                sources = getattr(obj, '_lazy_sources', None)
+                if sources and sources.get(name, (None,))[0] is self:
+                    sources.pop(name, None)
+
+    def _fetch(self, key: Hashable) -> str:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteContentStore(ContentStore):
+    """Fetches scene and project bodies from a ``ProjectDatabase`` file.
+
+    Keys are ``('scenes', scene_id)`` or ``('projects', project_id)``.
+    """
+
+    def __init__(self, path: Union[str, Path], memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        super().__init__(memory_budget)
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _fetch(self, key: Tuple[str, str]) -> str:
+        table, row_id = key
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        row = self._conn.execute(f"SELECT content FROM {table} WHERE id = ?", (row_id,)).fetchone()
+        return (row[0] or "") if row else ""
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class JsonContentStore(ContentStore):
+    """Fetches bodies from byte offsets inside a JSON .story file.
+
+    Keys are ``('scenes', scene_id)`` or ``('projects', project_id)``;
+    ``spans`` maps them to the byte range of the JSON string literal. After
+    the file is rewritten, ``reindex`` must be given the new spans.
+    """
+
+    def __init__(self, path: Union[str, Path], spans: Dict[Hashable, Span],
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        super().__init__(memory_budget)
+        self.path = Path(path)
+        self.spans = spans
+        self._signature = self._stat()
+
+    def reindex(self, spans: Dict[Hashable, Span]) -> None:
+        with self._lock:
+            self.spans = spans
+            self._signature = self._stat()
+
+    def _stat(self) -> Tuple[int, int]:
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def _fetch(self, key: Hashable) -> str:
+        span = self.spans.get(key)
+        if span is None:
+            return ""
+        if self._stat() != self._signature:
+            raise RuntimeError(f"{self.path} changed on disk since it was opened")
+        with open(self.path, 'rb') as f:
+            f.seek(span.start)
+            return decode_span(f.read(span.end - span.start))
+
@@ -0,0 +1,312 @@
+"""
+Rope - an immutable text buffer with O(log n) edits and line/offset mapping
+
+Text is held in leaves of about ``LEAF_SIZE`` characters under a balanced
+(AVL) binary tree whose nodes cache their length and newline count. An
+edit copies only the path to the leaves it touches and shares everything
+else with the rope it came from, so every Rope is a cheap snapshot that
+later edits never change.
+
+``edit_content`` makes the ``content`` field of a Project or Scene
+editable through its rope: the str value is dropped on each edit and
+joined again only when something reads the field.
+"""
+
+from typing import Iterator, List, Tuple, Union
+from .lazy_content import _MISSING, bind_lazy, lazy_field
+
+# Leaves are built this size and split once an edit grows them past LEAF_MAX
+LEAF_SIZE = 1024
+LEAF_MAX = 2 * LEAF_SIZE
+
+
+class _Leaf:
+    __slots__ = ('text', 'length', 'newlines')
+    height = 0
+
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text)
+        self.newlines = text.count("\n")
+
+
+class _Node:
+    __slots__ = ('left', 'right', 'length', 'newlines', 'height')
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+        self.length = left.length + right.length
+        self.newlines = left.newlines + right.newlines
+        self.height = max(left.height, right.height) + 1
+
+
+def _balance(left, right):
+    """Node over left and right, rotated back into balance (their heights differ by at most 2)"""
+    if left.height > right.height + 1:
+        if left.left.height >= left.right.height:
+            return _Node(left.left, _Node(left.right, right))
+        middle = left.right
+        return _Node(_Node(left.left, middle.left), _Node(middle.right, right))
+    if right.height > left.height + 1:
+        if right.right.height >= right.left.height:
+            return _Node(_Node(left, right.left), right.right)
+        middle = right.left
+        return _Node(_Node(left, middle.left), _Node(middle.right, right.right))
+    return _Node(left, right)
+
+
+def _concat(left, right):
+    """Balanced tree holding left's text followed by right's (either may be None)"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.height > right.height + 1:
+        return _balance(left.left, _concat(left.right, right))
+    if right.height > left.height + 1:
+        return _balance(_concat(left, right.left), right.right)
+    if not left.height and not right.height and left.length + right.length <= LEAF_MAX:
+        return _Leaf(left.text + right.text)
+    return _Node(left, right)
+
+
+def _split(node, pos: int):
+    """(before, after) trees of node's text split at pos"""
+    if node is None or pos <= 0:
+        return None, node
+    if pos >= node.length:
+        return node, None
+    if not node.height:
+        return _Leaf(node.text[:pos]), _Leaf(node.text[pos:])
+    left = node.left
+    if pos <= left.length:
+        before, after = _split(left, pos)
+        return before, _concat(after, node.right)
+    before, after = _split(node.right, pos - left.length)
+    return _concat(left, before), after
+
+
+def _build(text: str):
+    """Balanced tree over text cut into LEAF_SIZE leaves (None if empty)"""
+    if len(text) <= LEAF_MAX:
+        return _Leaf(text) if text else None
+    return _join_leaves([_Leaf(text[i:i + LEAF_SIZE]) for i in range(0, len(text), LEAF_SIZE)])
+
+
+def _join_leaves(leaves: List[_Leaf]):
+    if len(leaves) == 1:
+        return leaves[0]
+    middle = len(leaves) // 2
+    return _Node(_join_leaves(leaves[:middle]), _join_leaves(leaves[middle:]))
+
+
+def _replace(node, start: int, end: int, text: str):
+    """Tree with node's [start:end) replaced by text, copying only the touched path"""
+    if not node.height:
+        return _build(node.text[:start] + text + node.text[end:])
+    left = node.left
+    middle = left.length
+    if end <= middle:
+        return _concat(_replace(left, start, end, text), node.right)
+    if start >= middle:
+        return _concat(left, _replace(node.right, start - middle, end - middle, text))
+    # The edit spans both children: keep what is outside it and put the text between
+    before = _split(left, start)[0]
+    after = _split(node.right, end - middle)[1]
+    return _concat(_concat(before, _build(text)), after)
+
+
+def _leaves(node) -> Iterator[_Leaf]:
+    stack = [node] if node is not None else []
+    while stack:
+        node = stack.pop()
+        if node.height:
+            stack.append(node.right)
+            stack.append(node.left)
+        else:
+            yield node
+
+
+class Rope:
+    """Immutable text; ``insert``, ``delete`` and ``replace`` return a new Rope in O(log n)"""
+
+    __slots__ = ('_root',)
+
+    def __init__(self, text: str = ""):
+        self._root = _build(text)
+
+    @classmethod
+    def _of(cls, root) -> "Rope":
+        rope = cls.__new__(cls)
+        rope._root = root
+        return rope
+
+    def __len__(self) -> int:
+        return self._root.length if self._root else 0
+
+    def __str__(self) -> str:
+        return "".join(leaf.text for leaf in _leaves(self._root))
+
+    def __repr__(self) -> str:
+        return f"Rope({len(self)} chars)"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Rope):
+            return self._root is other._root or str(self) == str(other)
+        if isinstance(other, str):
+            return len(self) == len(other) and str(self) == other
+        return NotImplemented
+
+    def __getitem__(self, index: Union[int, slice]) -> str:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return str(self)[index]
+            return self._slice(start, stop)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("rope index out of range")
+        return self._slice(index, index + 1)
+
+    def chunks(self) -> Iterator[str]:
+        """The text, leaf by leaf"""
+        return (leaf.text for leaf in _leaves(self._root))
+
+    # Editing
+
+    def replace(self, start: int, end: int, text: str) -> "Rope":
+        """Rope with self[start:end] replaced by text"""
+        if not 0 <= start <= end <= len(self):
+            raise ValueError(f"Edit range {start}:{end} outside text of length {len(self)}")
+        if start == end and not text:
+            return self
+        if self._root is None:
+            return Rope(text)
+        return Rope._of(_replace(self._root, start, end, text))
+
+    def insert(self, pos: int, text: str) -> "Rope":
+        return self.replace(pos, pos, text)
+
+    def delete(self, start: int, end: int) -> "Rope":
+        return self.replace(start, end, "")
+
+    # Lines
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines (one more than the number of newlines)"""
+        return (self._root.newlines if self._root else 0) + 1
+
+    def line_of(self, offset: int) -> int:
+        """Zero-based line holding the character at offset"""
+        node, line = self._root, 0
+        offset = min(max(offset, 0), len(self))
+        while node is not None and node.height:
+            if offset <= node.left.length:
+                node = node.left
+            else:
+                line += node.left.newlines
+                offset -= node.left.length
+                node = node.right
+        return line + (node.text.count("\n", 0, offset) if node is not None else 0)
+
+    def line_start(self, line: int) -> int:
+        """Offset of the first character of a zero-based line"""
+        if not 0 <= line < self.line_count:
+            raise IndexError(f"line {line} out of range")
+        if line == 0:
+            return 0
+        # Offset just past the line-th newline
+        node, offset, remaining = self._root, 0, line
+        while node.height:
+            if remaining <= node.left.newlines:
+                node = node.left
+            else:
+                remaining -= node.left.newlines
+                offset += node.left.length
+                node = node.right
+        pos = -1
+        for _ in range(remaining):
+            pos = node.text.index("\n", pos + 1)
+        return offset + pos + 1
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """(line, column) of offset"""
+        line = self.line_of(offset)
+        return line, offset - self.line_start(line)
+
+    def offset(self, line: int, column: int = 0) -> int:
+        """Offset of (line, column)"""
+        return self.line_start(line) + column
+
+    def line(self, line: int) -> str:
+        """Text of a zero-based line, without its newline"""
+        start = self.line_start(line)
+        end = self.line_start(line + 1) - 1 if line + 1 < self.line_count else len(self)
+        return self._slice(start, end)
+
+    # Internals
+
+    def _slice(self, start: int, stop: int) -> str:
+        parts: List[str] = []
+        node = self._root
+        stack = [(node, 0)] if node is not None and start < stop else []
+        while stack:
+            node, offset = stack.pop()
+            if offset >= stop or offset + node.length <= start:
+                continue
+            if node.height:
+                stack.append((node.right, offset + node.left.length))
+                stack.append((node.left, offset))
+            else:
+                parts.append(node.text[max(start - offset, 0):stop - offset])
+        return "".join(parts)
+
+
+class RopeSource:
+    """Lazy source (see ``bind_lazy``) joining a field's value from its rope on first read"""
+
+    # The text is in memory, so is_loaded() reports the field as loaded
+    in_memory = True
+
+    def __init__(self, rope: Rope):
+        self.rope = rope
+
+    def load(self, obj, name: str, key) -> str:
+        value = str(self.rope)
+        lazy_field(obj, name).put(obj, value)
+        obj._rope = (self.rope, value)
+        return value
+
+
+def content_rope(obj) -> Rope:
+    """obj.content as a Rope, rebuilt only if the field was assigned a new str since"""
+    rope, text = getattr(obj, '_rope', None) or (None, None)
+    if rope is not None:
+        value = lazy_field(obj, 'content').peek(obj)
+        if value is _MISSING:
+            source = (getattr(obj, '_lazy_sources', None) or {}).get('content')
+            if source and isinstance(source[0], RopeSource) and source[0].rope is rope:
+                return rope
+        elif value is text:
+            return rope
+    text = obj.content
+    rope = Rope(text)
+    obj._rope = (rope, text)
+    return rope
+
+
+def set_content_rope(obj, rope: Rope) -> None:
+    """Make rope the content of obj (a snapshot from content_rope or an edit of one)"""
+    bind_lazy(obj, 'content', RopeSource(rope), None)
+    obj._rope = (rope, None)
+    obj.mark_dirty()
+
+
+def edit_content(obj, start: int, end: int, text: str) -> Rope:
+    """Replace obj.content[start:end] with text in O(log n); returns the new rope"""
+    rope = content_rope(obj).replace(start, end, text)
+    set_content_rope(obj, rope)
+    return rope
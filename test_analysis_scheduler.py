@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for the debounced background analysis scheduler
+"""
+
+import sys
+import os
+import tempfile
+import threading
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.services.analysis_scheduler import AnalysisScheduler, TextAnalysis
+from storyloom.services.character_detection import IncrementalCharacterDetector
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_rapid_edits_are_coalesced():
+    """Only the last text inside the debounce window is analysed"""
+    clock = FakeClock()
+    analysed, delivered = [], []
+
+    def analyze(text):
+        analysed.append(text)
+        return TextAnalysis(word_count=len(text.split()))
+
+    scheduler = AnalysisScheduler(analyze, delivered.append, debounce=0.3, clock=clock)
+    for text in ["A", "A b", "A b c"]:
+        scheduler.submit(text)
+        clock.advance(0.1)
+        assert scheduler.poll() is None
+
+    clock.advance(0.3)
+    result = scheduler.poll()
+    assert analysed == ["A b c"]
+    assert delivered == [result]
+    assert result.word_count == 3
+    assert result.revision == scheduler.revision == 3
+    assert not scheduler.pending()
+    assert scheduler.poll() is None
+
+
+def test_flush_ignores_debounce_window():
+    clock = FakeClock()
+    delivered = []
+    scheduler = AnalysisScheduler(lambda text: TextAnalysis(), delivered.append, debounce=5, clock=clock)
+    assert scheduler.flush() is None
+    scheduler.submit("Hello")
+    assert scheduler.flush() is not None
+    assert len(delivered) == 1
+
+
+def test_worker_thread_delivers_project_analysis():
+    """The worker runs ProjectService.analyze_text and calls back once"""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        service.create_project("Scheduler")
+
+        done = threading.Event()
+        delivered = []
+
+        def on_result(result):
+            delivered.append(result)
+            done.set()
+
+        scheduler = AnalysisScheduler(service.analyze_text, on_result, debounce=0.05)
+        scheduler.start()
+        try:
+            scheduler.submit("Alice")
+            scheduler.submit("Alice met Bob")
+            assert done.wait(5)
+        finally:
+            scheduler.stop(timeout=5)
+
+        assert len(delivered) == 1
+        assert delivered[0].word_count == 3
+        assert [c.name for c in delivered[0].new_characters] == ['Alice', 'Bob']
+
+
+def test_detector_reset_while_analysing():
+    """Creating a project while the worker analyses leaves the detector consistent"""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(projects_dir=tmp)
+        service.create_project("Race")
+        paragraphs = [f"Alice met Bob{i % 7}.\n\nCarol left." for i in range(50)]
+        stop, errors = threading.Event(), []
+
+        def analyse():
+            try:
+                while not stop.is_set():
+                    for n in range(1, len(paragraphs), 7):
+                        service.analyze_text("\n\n".join(paragraphs[:n]))
+            except Exception as e:
+                errors.append(e)
+
+        # Switch threads often so unguarded detector updates would interleave
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        worker = threading.Thread(target=analyse)
+        worker.start()
+        try:
+            for _ in range(200):
+                service.create_project("Race")
+        finally:
+            stop.set()
+            worker.join()
+            sys.setswitchinterval(interval)
+
+        assert not errors
+        detector = service.character_detector
+        assert len(detector._starts) == len(detector._counts)
+        assert detector.totals == IncrementalCharacterDetector(detector.text).totals
+
+if __name__ == "__main__":
+    test_rapid_edits_are_coalesced()
+    test_flush_ignores_debounce_window()
+    test_worker_thread_delivers_project_analysis()
+    test_detector_reset_while_analysing()
+    print("✓ Analysis scheduler works")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the autosave journal and crash recovery
+"""
+
+import sys
+import os
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.services.autosave import journal_path, read_journal
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+
+
+def start_project(tmp, **autosave):
+    service = ProjectService(tmp)
+    autosave = service.enable_autosave(interval=60, **autosave)
+    project = service.create_project("Journaled")
+    project.file_path = os.path.join(tmp, "journaled.story")
+    service.update_project_content("Frodo left the Shire.\n\n" * 5000)
+    service.add_character(Character(name="Frodo"))
+    service.add_location(Location(name="Bree"))
+    assert service.save_project()
+    return service, autosave, project
+
+
+def state(project):
+    return (project.title, project.content,
+            [(c.id, c.name, c.role) for c in project.characters],
+            [(l.id, l.name) for l in project.locations])
+
+
+def test_unclean_shutdown_is_recovered():
+    with tempfile.TemporaryDirectory() as tmp:
+        service, autosave, project = start_project(tmp)
+        size = os.path.getsize(project.file_path)
+
+        text = project.content
+        service.update_project_content(text[:100] + "Sam followed. " + text[100:])
+        service.update_project_content(project.content.replace("Shire", "Hills", 1))
+        sam = Character(name="Sam")
+        service.add_character(sam)
+        sam.role = "gardener"
+        service.update_character(sam)
+        service.remove_location(project.locations[0].id)
+        project.title = "Renamed"
+        service.update_project_content(project.content + "The end.")
+        autosave.flush()
+
+        # Each op costs about its own size, not the project's
+        journal = journal_path(project.file_path)
+        assert os.path.getsize(journal) < 2000 < size
+        assert os.path.getsize(project.file_path) == size
+
+        # The process dies here: nothing is saved or closed
+        recovered = ProjectService(tmp).open_project(project.file_path)
+        assert state(recovered) == state(project)
+        assert recovered.dirty
+
+        # A torn last write is ignored
+        with open(journal, 'ab') as f:
+            f.write(b'{"op": "content", "at": 0, "en')
+        assert state(ProjectService(tmp).open_project(project.file_path)) == state(project)
+
+
+def test_compaction_save_and_clean_close():
+    with tempfile.TemporaryDirectory() as tmp:
+        service, autosave, project = start_project(tmp, compact_bytes=2000)
+        for i in range(100):
+            service.update_project_content(project.content + f" edit {i}")
+            if i % 10 == 0:
+                service.add_character(Character(name=f"Extra {i}"))
+        autosave.flush()
+
+        # The journal was compacted into a snapshot and restarted from it
+        base, ops = read_journal(journal_path(project.file_path))
+        assert base['base'] and len(ops) < 100
+        assert os.path.exists(os.path.join(tmp, base['base']))
+        assert state(ProjectService(tmp).open_project(project.file_path)) == state(project)
+
+        # Saving restarts the journal from the file and drops the snapshot
+        assert service.save_project()
+        autosave.flush()
+        base, ops = read_journal(journal_path(project.file_path))
+        assert base['base'] is None and ops == []
+        assert not [name for name in os.listdir(tmp) if ".autosave-" in name]
+        reopened = ProjectService(tmp).open_project(project.file_path)
+        assert state(reopened) == state(project) and not reopened.dirty
+
+        # A clean shutdown leaves nothing to recover
+        service.update_project_content("Unsaved")
+        service.close()
+        assert not os.path.exists(journal_path(project.file_path))
+        assert ProjectService(tmp).open_project(project.file_path).content != "Unsaved"
+
+
+def test_stale_journal_is_ignored():
+    with tempfile.TemporaryDirectory() as tmp:
+        service, autosave, project = start_project(tmp)
+        service.update_project_content("Journaled edit")
+        autosave.flush()
+
+        # The file is saved by a process that isn't journaling
+        other = ProjectService(tmp)
+        copy = other._read_project(project.file_path)
+        copy.file_path = project.file_path
+        copy.content = "Saved elsewhere"
+        other.save_project(copy)
+
+        assert ProjectService(tmp).open_project(project.file_path).content == "Saved elsewhere"
+
+
+if __name__ == "__main__":
+    print("Running autosave tests...")
+    test_unclean_shutdown_is_recovered()
+    test_compaction_save_and_clean_close()
+    test_stale_journal_is_ignored()
+    print("✓ Autosave tests passed")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch analysis command line
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.batch import analyze_file, main, read_results
+from storyloom.services.project_service import ProjectService
+from storyloom.models.location import Location
+
+
+def write_projects(directory):
+    service = ProjectService(directory)
+    stories = {
+        "one": "Aragorn met Gandalf in Bree.\n\nGandalf spoke of Mordor while Aragorn listened.",
+        "two": "Frodo left the Shire.\n\nSam followed Frodo into the night.",
+        "three": "Nobody was home.",
+    }
+    for name, text in stories.items():
+        project = service.create_project(name.title())
+        project.file_path = os.path.join(directory, f"{name}.story")
+        service.update_project_content(text)
+        for character in service.detect_characters_in_text(text):
+            service.add_character(character)
+        if name == "one":
+            # Shares its name with the detected character
+            service.add_location(Location(name="Bree"))
+        assert service.save_project()
+    with open(os.path.join(directory, "broken.story"), "w") as f:
+        f.write('{"id": "x", "title": ')
+
+
+def test_analyze_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        write_projects(tmp)
+        record = analyze_file(os.path.join(tmp, "one.story"))
+        assert record['title'] == "One" and record['words'] == 12 and record['paragraphs'] == 2
+        assert record['detected'] == ["Aragorn", "Bree", "Gandalf", "Mordor"]
+        names = [[name, count] for _, name, count in record['mentions']]
+        assert names[:2] == [["Aragorn", 2], ["Gandalf", 2]] and names.count(["Bree", 1]) == 2
+        project = ProjectService(tmp).open_project(os.path.join(tmp, "one.story"))
+        ids = {entity_id for entity_id, _, _ in record['mentions']}
+        assert ids == {e.id for e in list(project.characters) + list(project.locations)}
+        pairs = {tuple(sorted(pair[:2])): pair[2] for pair in record['cooccurrence']}
+        assert pairs[("Aragorn", "Gandalf")] == 2 and pairs[("Gandalf", "Mordor")] == 1
+        assert 'error' in analyze_file(os.path.join(tmp, "broken.story"))
+
+
+def test_batch_streams_and_resumes():
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = os.path.join(tmp, "archive")
+        os.mkdir(archive)
+        write_projects(archive)
+        output = os.path.join(tmp, "results.jsonl")
+
+        assert main([archive, "-o", output, "-j", "2", "-q"]) == 0
+        results = read_results(output)
+        assert len(results) == 4
+        assert 'error' in results[os.path.join(archive, "broken.story")]
+        assert results[os.path.join(archive, "two.story")]['detected'] == ["Frodo", "Sam", "Shire"]
+
+        # Resuming skips finished files; failed and changed files are retried
+        with open(output) as f:
+            lines = f.readlines()
+        with open(output, "w") as f:
+            f.writelines(lines[:-1])
+            f.write(lines[-1][:10])  # killed mid-write
+        service = ProjectService(archive)
+        service.open_project(os.path.join(archive, "three.story"))
+        service.update_project_content("Still nobody here, said Legolas.")
+        assert service.save_project()
+
+        main([archive, "-o", output, "-q"])
+        results = read_results(output)
+        assert len(results) == 4
+        assert results[os.path.join(archive, "three.story")]['detected'] == ["Legolas", "Still"]
+        with open(output) as f:
+            redone = [json.loads(line)['path'] for line in f.readlines()[len(lines):]]
+        torn = json.loads(lines[-1])['path']
+        assert sorted(redone) == sorted({torn, os.path.join(archive, "broken.story"),
+                                         os.path.join(archive, "three.story")})
+
+
+if __name__ == "__main__":
+    print("Running batch analysis tests...")
+    test_analyze_file()
+    test_batch_streams_and_resumes()
+    print("✓ Batch analysis tests passed")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the binary project container
+"""
+
+import sys
+import os
+import struct
+import tempfile
+import zlib
+from datetime import datetime, timezone
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+from storyloom.models.scene import Scene
+from storyloom.storage.binary_format import (BinaryProjectReader, is_binary_project, read_binary_header,
+                                             read_binary_metadata, read_binary_project)
+
+
+def make_project(service: ProjectService):
+    project = service.create_project("Binary Zoë")
+    project.description = "A test"
+    service.update_project_content("Opening line.\n\nSecond paragraph with ünïcode.")
+    alice = Character(name="Alice", role="Hero", goals=["win", "escape", "win"])
+    service.add_character(alice)
+    service.add_character(Character(id="legacy-id", name="Bob"))
+    harbor = Location(name="Harbor", type="port")
+    service.add_location(harbor)
+    project.scenes = [
+        Scene(title="One", summary="Start", content="Alice arrives.",
+              character_ids=[alice.id, "legacy-id"], location_id=harbor.id, order_index=0),
+        Scene(title="Two", content="", order_index=1,
+              created_at=datetime(1969, 7, 20, 20, 17, 40, 123456)),
+    ]
+    return project
+
+
+def as_version_1(data: bytes) -> bytes:
+    """The same container as version 1 wrote it: string lengths in characters, no counts in PROJ"""
+    reader = BinaryProjectReader(data)
+    strings = reader.strings
+    table = (struct.pack(f'<I{len(strings)}I', len(strings), *map(len, strings))
+             + "".join(strings).encode('utf-8'))
+    sections = []
+    for tag, (offset, length, flags) in reader.directory.items():
+        payload = zlib.compress(table) if tag == 'STRS' else data[offset:offset + length]
+        if tag == 'PROJ':
+            payload = payload[:struct.calcsize('<iIIIIqq')]
+        sections.append((tag.encode('ascii'), payload, flags))
+    out = [struct.pack('<8sHH', b"STORYBIN", 1, len(sections))]
+    offset = struct.calcsize('<8sHH') + struct.calcsize('<4sQQI') * len(sections)
+    for tag, payload, flags in sections:
+        out.append(struct.pack('<4sQQI', tag, offset, len(payload), flags))
+        offset += len(payload)
+    return b"".join(out + [payload for _, payload, _ in sections])
+
+
+def test_round_trip_and_detection():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = make_project(service)
+        expected = service._serialize_project(project)
+
+        path = os.path.join(tmp, "quick.storyb")
+        project.file_path = path
+        assert service.save_project()
+        assert is_binary_project(path)
+
+        reopened = ProjectService(tmp).open_project(path)
+        assert service._serialize_project(reopened) == expected
+
+        # The format is detected by magic bytes, not by extension
+        renamed = os.path.join(tmp, "renamed.story")
+        os.rename(path, renamed)
+        assert service._serialize_project(ProjectService(tmp).open_project(renamed)) == expected
+
+        # JSON files are still read as JSON
+        json_path = os.path.join(tmp, "plain.story")
+        assert service.export_project(json_path, project)
+        assert not is_binary_project(json_path)
+        assert service._serialize_project(ProjectService(tmp).open_project(json_path)) == expected
+
+
+def test_skipping_sections():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = make_project(service)
+        project.created_at = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        path = os.path.join(tmp, "quick.storyb")
+        assert service.export_project(path, project)
+
+        meta = read_binary_metadata(path)
+        assert meta['id'] == project.id
+        assert meta['title'] == "Binary Zoë"
+        assert meta['created_at'] == datetime(2024, 1, 2, 3, 4, 5)
+
+        # Header strings are decoded one at a time, from a table decompressed once
+        with open(path, 'rb') as f:
+            data = f.read()
+        reader = BinaryProjectReader(data)
+        assert reader.metadata()['description'] == "A test" and reader._strings is None
+        assert reader.strings[reader.strings.index("Binary Zoë")] == "Binary Zoë"
+
+        # Version 1 files, with string lengths in characters, are still read
+        old = BinaryProjectReader(as_version_1(data))
+        assert old.version == 1 and old.metadata() == reader.metadata()
+        assert service._serialize_project(old.project()) == service._serialize_project(reader.project())
+
+        # Word and entity counts come from the header; older files count them
+        counts = {'words': 6, 'characters': 2, 'locations': 1, 'scenes': 2}
+        assert read_binary_header(path).summary_counts() == counts
+        assert old.summary_counts() == counts
+
+        partial = read_binary_project(path, sections={'SCEN'})
+        assert partial.content == ""
+        assert not partial.characters
+        assert [s.title for s in partial.scenes] == ["One", "Two"]
+        assert all(s.content == "" for s in partial.scenes)
+
+
+if __name__ == "__main__":
+    print("Running binary format tests...")
+    test_round_trip_and_detection()
+    test_skipping_sections()
+    print("✓ Binary format tests passed")
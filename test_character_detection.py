@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental character detection against the full-scan reference
+"""
+
+import sys
+import os
+import random
+import tempfile
+from collections import Counter
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from concurrent.futures import ThreadPoolExecutor
+
+from storyloom.services import project_service as project_service_module
+from storyloom.services.project_service import ProjectService
+from storyloom.services.character_detection import (
+    IncrementalCharacterDetector,
+    NAME_PATTERN,
+    chunk_ranges,
+    count_candidates_parallel,
+)
+
+TOKENS = [
+    'Alice', 'Bob', 'Charlie', 'The', 'When', 'Al', 'Rivendell', 'ABcd',
+    'forest', 'met', 'the', 'x', 'Gandalf', 'Grey', 'a1', '_Zed', 'Ed',
+    ' ', ' ', ' ', '  ', '\n', '\n\n', ' \n ', '\t', '.', ',', '!',
+]
+
+
+def random_text(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(TOKENS) for _ in range(length))
+
+
+def full_scan_names(service: ProjectService, text: str):
+    return [c.name for c in service.detect_characters_in_text(text)]
+
+
+def test_incremental_matches_full_scan_on_random_edits():
+    """Random edit sequences give the same names as the full scan"""
+    rng = random.Random(1234)
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        service.create_project("Detection")
+
+        for _ in range(20):
+            text = random_text(rng, rng.randint(0, 200))
+            detector = IncrementalCharacterDetector(text)
+            for _ in range(100):
+                start = rng.randint(0, len(text))
+                end = rng.randint(start, min(len(text), start + rng.choice([0, 1, 5, 40])))
+                replacement = random_text(rng, rng.choice([0, 1, 2, 8]))
+                text = text[:start] + replacement + text[end:]
+
+                if rng.random() < 0.5:
+                    detector.apply_edit(start, end, replacement)
+                else:
+                    detector.update(text)
+
+                assert detector.text == text
+                assert detector.totals == Counter(NAME_PATTERN.findall(text))
+                assert sorted(detector.names()) == full_scan_names(service, text)
+
+
+def test_service_incremental_detection_skips_existing_characters():
+    """detect_characters_incremental filters names already in the project"""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        service.create_project("Detection")
+
+        text = "Alice met Bob.\n\nLater, Charlie arrived."
+        for char in service.detect_characters_incremental(text):
+            service.add_character(char)
+        assert [c.name for c in service.get_characters()] == ['Alice', 'Bob', 'Charlie', 'Later']
+
+        text += "\n\nDora waved at Alice."
+        assert [c.name for c in service.detect_characters_incremental(text)] == ['Dora']
+        assert full_scan_names(service, text) == ['Dora']
+
+
+def test_chunked_scan_matches_full_scan():
+    """Chunks split at paragraph boundaries give exactly the serial counts"""
+    rng = random.Random(99)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for _ in range(200):
+            text = random_text(rng, rng.randint(0, 400))
+            parts = rng.choice([1, 2, 3, 8, 50])
+            ranges = chunk_ranges(text, parts)
+            assert ranges[0][0] == 0 and ranges[-1][1] == len(text)
+            assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+            assert len(ranges) <= parts
+            assert count_candidates_parallel(text, executor, parts) == Counter(NAME_PATTERN.findall(text))
+
+    # A name running across a blank line is still one candidate
+    text = "x " * 50 + "Alice\n\nBob" + " y" * 50
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert count_candidates_parallel(text, executor, 2) == Counter(["Alice\n\nBob"])
+
+
+def test_service_parallel_detection_matches_serial():
+    rng = random.Random(7)
+    text = "\n\n".join(random_text(rng, 200) for _ in range(200))
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        service.create_project("Detection")
+        serial = full_scan_names(service, text)
+        minimum = project_service_module.PARALLEL_DETECTION_MIN
+        project_service_module.PARALLEL_DETECTION_MIN = 0
+        try:
+            assert [c.name for c in service.detect_characters_in_text(text, workers=2)] == serial
+        finally:
+            project_service_module.PARALLEL_DETECTION_MIN = minimum
+            service.close()
+
+
+if __name__ == "__main__":
+    test_incremental_matches_full_scan_on_random_edits()
+    test_service_incremental_detection_skips_existing_characters()
+    test_chunked_scan_matches_full_scan()
+    test_service_parallel_detection_matches_serial()
+    print("✓ Incremental detection matches the full scan")
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Tests for co-occurrence relationship detection
+"""
+
+import sys
+import os
+import random
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.database.db import ProjectDatabase
+from storyloom.services.cooccurrence import (
+    CHARACTER_CHARACTER, CHARACTER_LOCATION, CooccurrenceBuilder, SCENE,
+)
+from storyloom.services.mention_index import LOCATION, MentionIndex
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+from storyloom.models.scene import Scene
+
+
+def make_index():
+    index = MentionIndex()
+    index.add("a", "Alice")
+    index.add("b", "Bob")
+    index.add("c", "Carol")
+    index.add("h", "Harbor", LOCATION)
+    index.add("m", "Market", LOCATION)
+    return index
+
+
+TEXT = (
+    "Alice met Bob at the Harbor. Alice waved.\n\n"
+    "Bob and Carol walked to the Market, far from the Harbor.\n\n"
+    "Carol slept."
+)
+
+
+def test_window_modes():
+    index = make_index()
+    paragraph = CooccurrenceBuilder(index).count(TEXT)
+    assert paragraph == {
+        ("a", "b", CHARACTER_CHARACTER): 1,
+        ("a", "h", CHARACTER_LOCATION): 1,
+        ("b", "h", CHARACTER_LOCATION): 2,
+        ("b", "c", CHARACTER_CHARACTER): 1,
+        ("b", "m", CHARACTER_LOCATION): 1,
+        ("c", "m", CHARACTER_LOCATION): 1,
+        ("c", "h", CHARACTER_LOCATION): 1,
+    }
+
+    scene = CooccurrenceBuilder(index, window=SCENE).count(TEXT)
+    assert scene[("a", "c", CHARACTER_CHARACTER)] == 1
+    assert ("h", "m", CHARACTER_LOCATION) not in scene
+
+    # Token windows ignore paragraphs: "Alice waved. Bob" is close enough
+    tokens = CooccurrenceBuilder(index, window=3).count(TEXT)
+    assert tokens[("a", "b", CHARACTER_CHARACTER)] == 2
+    assert ("a", "c", CHARACTER_CHARACTER) not in tokens
+    assert ("c", "m", CHARACTER_LOCATION) not in tokens
+
+
+def canonical(graph):
+    return sorted((min(a, b), max(a, b), kind, weight) for a, b, kind, weight in graph.edges())
+
+
+def test_incremental_matches_full_rebuild():
+    rng = random.Random(5)
+    words = "Alice Bob Carol Harbor Market the walked and said".split()
+
+    def paragraph():
+        return " ".join(rng.choice(words) for _ in range(12))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = service.create_project("Graph")
+        for name in ("Alice", "Bob", "Carol"):
+            service.add_character(Character(name=name))
+        for name in ("Harbor", "Market"):
+            service.add_location(Location(name=name))
+        project.scenes = [
+            Scene(title=f"Scene {i}", content="\n\n".join(paragraph() for _ in range(5)))
+            for i in range(20)
+        ]
+        service.build_relationships()
+        assert service.cooccurrence.recounts == 21
+
+        for _ in range(10):
+            scene = rng.choice(project.scenes)
+            scene.content = "\n\n".join(paragraph() for _ in range(5))
+            service.update_scene_relationships(scene)
+        before = service.cooccurrence.recounts
+        assert service.build_relationships() and service.cooccurrence.recounts == before
+
+        fresh = CooccurrenceBuilder(service.mention_index)
+        fresh.build(project)
+        assert canonical(service.story_graph) == canonical(fresh.graph)
+
+        # Renaming an entity rescans the units that mention it
+        alice = service.find_character("Alice")
+        alice.name = "Alicia"
+        service.update_character(alice)
+        service.build_relationships()
+        mentioning = sum("alice" in text.lower() for text in [project.content] + [s.content for s in project.scenes])
+        assert service.cooccurrence.recounts == before + mentioning
+        assert service.story_graph.degree(alice.id) == 0
+
+        # A new name only found in one scene rescans just that scene
+        before = service.cooccurrence.recounts
+        project.scenes[4].content += "\n\nDave met Bob at the Harbor."
+        service.update_scene_relationships(project.scenes[4])
+        service.add_character(Character(name="Dave"))
+        service.add_character(Character(name="Nobody"))
+        service.build_relationships()
+        assert service.cooccurrence.recounts == before + 2
+        fresh = CooccurrenceBuilder(service.mention_index)
+        fresh.build(project)
+        assert canonical(service.story_graph) == canonical(fresh.graph)
+
+
+def test_relationships():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = service.create_project("Graph")
+        service.add_character(Character(name="Alice"))
+        service.add_character(Character(name="Bob"))
+        service.update_project_content("Alice and Bob.\n\nBob and Alice.\n\nAlice alone.")
+        [rel] = service.build_relationships()
+        assert rel.weight == 2
+        assert {service.get_entity_name(rel.source_id), service.get_entity_name(rel.target_id)} == {"Alice", "Bob"}
+        assert service.build_relationships()[0].id == rel.id
+
+        with ProjectDatabase(os.path.join(tmp, "graph.storydb")) as db:
+            db.save_project(project)
+            db.save_relationships(project.id, [rel])
+            assert db.load_relationships(project.id)[0].weight == 2
+
+
+def build_story(service, scenes=12):
+    project = service.create_project("Saved Graph")
+    for name in ("Alice", "Bob", "Carol"):
+        service.add_character(Character(name=name))
+    service.add_location(Location(name="Harbor"))
+    project.scenes = [
+        Scene(title=f"Scene {i}", content=f"Alice and Bob, part {i}.\n\nCarol at the Harbor with Bob.")
+        for i in range(scenes)
+    ]
+    return project
+
+
+def test_unchanged_open_does_no_reanalysis():
+    for extension, lazy in ((".story", False), (".story", True), (".storyb", False), (".storydb", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            service = ProjectService(tmp)
+            project = build_story(service)
+            project.file_path = os.path.join(tmp, "graph" + extension)
+            expected = service.build_relationships()
+            assert service.save_project()
+
+            reopened = ProjectService(tmp)
+            project = reopened.open_project(project.file_path, lazy=lazy)
+            assert [(r.id, r.weight) for r in project.relationships] == [(r.id, r.weight) for r in expected]
+            assert canonical(reopened.story_graph) == canonical(service.story_graph)
+            assert [r.id for r in reopened.build_relationships()] == [r.id for r in expected]
+            assert reopened.cooccurrence.recounts == 0, extension
+            assert not project.dirty
+
+            # Only the edited scene is analyzed again after the next open
+            project.scenes[3].content += "\n\nAlice met Carol."
+            assert reopened.save_project()
+            again = ProjectService(tmp)
+            again.open_project(project.file_path, lazy=lazy)
+            again.build_relationships()
+            assert again.cooccurrence.recounts == 1, extension
+            assert again.story_graph.weight(*[c.id for c in project.characters][::2]) == 1
+
+
+def test_saved_counts_invalidated_by_renames():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = build_story(service, scenes=3)
+        service.build_relationships()
+        assert service.save_project()
+
+        reopened = ProjectService(tmp)
+        project = reopened.open_project(project.file_path)
+        alice = project.characters[0]
+        alice.name = "Alicia"
+        reopened.update_character(alice)
+        reopened.build_relationships()
+        assert reopened.cooccurrence.recounts == 3  # the scenes, not the empty project content
+        assert reopened.save_project()
+
+        # Names added after saving: only the scene mentioning one is rescanned
+        project.scenes[1].content += "\n\nDave waved at Alicia."
+        assert reopened.save_project()
+        project.characters.append(Character(name="Dave"))
+        project.characters.append(Character(name="Nobody"))
+        assert reopened.save_project()
+        again = ProjectService(tmp)
+        project = again.open_project(project.file_path)
+        again.build_relationships()
+        assert again.cooccurrence.recounts == 1
+        fresh = CooccurrenceBuilder(again.mention_index)
+        fresh.build(project)
+        assert canonical(again.story_graph) == canonical(fresh.graph)
+
+        # Saved with another window: counts are not reused
+        other = ProjectService(tmp)
+        other.cooccurrence.window = SCENE
+        other.open_project(project.file_path)
+        other.build_relationships()
+        assert other.cooccurrence.recounts == 4
+
+
+if __name__ == "__main__":
+    print("Running co-occurrence tests...")
+    test_window_modes()
+    test_incremental_matches_full_rebuild()
+    test_relationships()
+    test_unchanged_open_does_no_reanalysis()
+    test_saved_counts_invalidated_by_renames()
+    print("✓ Co-occurrence tests passed")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite project store and JSON <-> database round trips
+"""
+
+import sys
+import os
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.database.db import ProjectDatabase, is_database_file
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+from storyloom.models.relationship import Relationship
+from storyloom.models.scene import Scene
+
+
+def build_project(service: ProjectService):
+    project = service.create_project("Round Trip")
+    project.description = "A test of both backends"
+    service.update_project_content("Aragorn met Gandalf.\n\nThey rode to Rivendell.\n")
+    aragorn = Character(name="Aragorn", role="Ranger", goals=["Reclaim the throne", "Protect Frodo"])
+    gandalf = Character(name="Gandalf", role="Wizard", description="Grey, then white")
+    service.add_character(aragorn)
+    service.add_character(gandalf)
+    rivendell = Location(name="Rivendell", type="Elven refuge")
+    service.add_location(rivendell)
+    project.scenes = [
+        Scene(title="Meeting", content="Aragorn met Gandalf.", character_ids=[aragorn.id, gandalf.id],
+              order_index=0),
+        Scene(title="Ride", summary="To the valley", location_id=rivendell.id,
+              character_ids=[gandalf.id], order_index=1),
+    ]
+    return project
+
+
+def test_json_database_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = build_project(service)
+        expected = service._serialize_project(project)
+
+        json_path = os.path.join(tmp, "round_trip.story")
+        db_path = os.path.join(tmp, "round_trip.storydb")
+        back_path = os.path.join(tmp, "round_trip_back.story")
+
+        project.file_path = json_path
+        assert service.save_project()
+        opened = service.open_project(json_path)
+        assert service.export_project(db_path, opened)
+        assert is_database_file(db_path) and not is_database_file(json_path)
+
+        from_db = service.open_project(db_path)
+        assert service._serialize_project(from_db) == expected
+        assert service.export_project(back_path, from_db)
+        assert service._serialize_project(service.open_project(back_path)) == expected
+
+        with ProjectDatabase(db_path) as db:
+            assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert [p['title'] for p in db.list_projects()] == ["Round Trip"]
+
+
+def test_incremental_database_saves():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = build_project(service)
+        project.file_path = os.path.join(tmp, "incremental.storydb")
+        assert service.save_project()
+
+        project = service.open_project(project.file_path)
+        aragorn, gandalf = project.characters
+        aragorn.role = "King"
+        service.remove_character(gandalf.id)
+        service.add_character(Character(name="Legolas"))
+        project.scenes[1].character_ids = [aragorn.id]
+        project.scenes.reverse()
+        assert service.save_project()
+
+        expected = service._serialize_project(project)
+        reopened = service.open_project(project.file_path)
+        assert service._serialize_project(reopened) == expected
+        assert [c.name for c in reopened.characters] == ["Aragorn", "Legolas"]
+        assert [s.title for s in reopened.scenes] == ["Ride", "Meeting"]
+
+
+def test_relationships_are_stored():
+    with tempfile.TemporaryDirectory() as tmp:
+        with ProjectDatabase(os.path.join(tmp, "rel.storydb")) as db:
+            service = ProjectService(tmp)
+            project = build_project(service)
+            db.save_project(project)
+            a, b = project.characters
+            rel = Relationship(source_id=a.id, target_id=b.id, type="character_character")
+            db.save_relationships(project.id, [rel])
+            assert db.load_relationships(project.id) == [rel]
+
+
+if __name__ == "__main__":
+    test_json_database_round_trip()
+    test_incremental_database_saves()
+    test_relationships_are_stored()
+    print("✓ Database store works")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the indexed character/location registry behind Project
+"""
+
+import sys
+import os
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+from storyloom.models.project import Project
+from storyloom.models.registry import EntityRegistry
+
+
+def test_project_wraps_lists_in_registries():
+    project = Project(characters=[Character(name="Alice")])
+    assert isinstance(project.characters, EntityRegistry)
+    project.locations = [Location(name="Rivendell")]
+    assert isinstance(project.locations, EntityRegistry)
+    assert project.locations.find_by_name("rivendell").name == "Rivendell"
+
+
+def test_indexes_stay_consistent_through_service_operations():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        service.create_project("Registry")
+
+        alice, bob, carol = Character(name="Alice"), Character(name="Bob"), Character(name="Carol")
+        for char in (alice, bob, carol):
+            assert service.add_character(char)
+        assert not service.add_character(Character(name=" alice "))
+        assert [c.name for c in service.get_characters()] == ["Alice", "Bob", "Carol"]
+
+        # Rename in place, as the UIs do, then update
+        bob.name = "Robert"
+        assert service.update_character(bob)
+        assert service.find_character("Bob") is None
+        assert service.find_character("robert") is bob
+        assert service.get_characters()[1] is bob
+
+        # Replace with a new object carrying the same id
+        alice2 = Character(id=alice.id, name="Alicia")
+        assert service.update_character(alice2)
+        assert service.get_character(alice.id) is alice2
+        assert not service.update_character(Character(name="Stranger"))
+
+        assert service.remove_character(carol.id)
+        assert service.find_character("Carol") is None
+        assert [c.name for c in service.get_characters()] == ["Alicia", "Robert"]
+        assert [c.name for c in service.detect_characters_in_text("Carol met Robert")] == ["Carol"]
+
+
+if __name__ == "__main__":
+    test_project_wraps_lists_in_registries()
+    test_indexes_stay_consistent_through_service_operations()
+    print("✓ Entity registry works")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for SQLite FTS5 search in the database store
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.services.search_index import fts_query, make_snippet
+from storyloom.database.db import ProjectDatabase
+from storyloom.storage.lazy_content import is_loaded
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+from storyloom.models.scene import Scene
+
+
+def build_project(service, path):
+    project = service.create_project("Search")
+    project.file_path = path
+    service.update_project_content("The ranger crossed the river at dawn.")
+    service.add_character(Character(name="Aragorn", description="A ranger from the north"))
+    service.add_location(Location(name="Bree", description="A village with an old inn"))
+    project.scenes = [
+        Scene(title="The Prancing Pony", summary="Meeting at the inn",
+              content="Frodo met Strider in the common room. Strider watched the door."),
+        Scene(title="Weathertop", summary="Attack on the hill",
+              content="The riders came at night. Strider fought them with fire."),
+    ]
+    assert service.save_project()
+    return project
+
+
+def test_query_translation():
+    assert fts_query('storm "dark night" rang*') == '"storm" "dark night" "rang"*'
+    assert fts_query('well-known AND (x') == '"well known" "and" "x"'
+    assert make_snippet("One two three four five six", [2], tokens=4) == "…two [three] four five…"
+
+
+def test_fts_search():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = build_project(service, os.path.join(tmp, "search.storydb"))
+
+        hits = service.search("strider")
+        assert [(h.section, h.field) for h in hits] == [('scenes', 'content')] * 2
+        # Two mentions in the shorter scene rank it first
+        assert hits[0].entity_id == project.scenes[0].id
+        assert "[Strider]" in hits[0].snippet and hits[0].score > hits[1].score
+
+        assert {(h.section, h.field) for h in service.search("ranger")} == {
+            ('projects', 'content'), ('characters', 'description')}
+        assert [h.field for h in service.search("weather*")] == ['title']
+        assert [h.entity_id for h in service.search('"old inn"')] == [project.locations[0].id]
+        assert service.search('"inn old"') == []
+
+        # Triggers follow upserts and deletes
+        project.scenes[1].content = "The riders came at night. Sam drew his sword."
+        project.scenes.pop(0)
+        assert service.save_project()
+        assert [h.entity_id for h in service.search("strider")] == []
+        assert [h.entity_id for h in service.search("sword")] == [project.scenes[0].id]
+
+
+def test_fts_search_loads_no_bodies():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "lazy.storydb")
+        build_project(ProjectService(tmp), path)
+
+        service = ProjectService(tmp)
+        project = service.open_project(path, lazy=True)
+        hits = service.search("strider fire")
+        assert [h.entity_id for h in hits] == [project.scenes[1].id]
+        assert "[fire]" in hits[0].snippet
+        assert not any(is_loaded(s, 'content') for s in project.scenes)
+        assert not is_loaded(project, 'content')
+
+        # Unsaved edits are searched too, and the file keeps the saved text
+        project.scenes[0].content = "Gandalf arrived with fireworks."
+        hits = service.search("firew*")
+        assert [h.entity_id for h in hits] == [project.scenes[0].id]
+        assert "[fireworks]" in hits[0].snippet
+        with ProjectDatabase(path) as db:
+            assert db.search("firew*") == []
+
+
+def test_dirty_search_matches_clean_search():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "lazy.storydb")
+        build_project(ProjectService(tmp), path)
+
+        service = ProjectService(tmp)
+        project = service.open_project(path, lazy=True)
+        queries = ("weather*", "aragorn", "bree", "strider", "ranger")
+        clean = {q: [(h.section, h.entity_id, h.field) for h in service.search(q)] for q in queries}
+        assert all(clean.values())
+
+        # A title edit neither hides the other fields nor loads any body
+        project.title = "Search, revised"
+        assert project.dirty
+        for query in queries:
+            assert [(h.section, h.entity_id, h.field) for h in service.search(query)] == clean[query]
+        assert [h.field for h in service.search("revised")] == ['title']
+        assert project._content_store.loads == 0
+        assert not is_loaded(project, 'content')
+
+        # The in-memory index covers the same fields
+        memory = ProjectService(tmp)
+        memory.current_project = project
+        project.file_path = None
+        for query in queries:
+            assert sorted(clean[query]) == sorted(
+                (h.section, h.entity_id, h.field) for h in memory.search(query, 100)), query
+
+
+def test_existing_database_gets_indexed():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "old.storydb")
+        build_project(ProjectService(tmp), path)
+        conn = sqlite3.connect(path)
+        for table in ("projects_fts", "characters_fts", "locations_fts", "scenes_fts"):
+            conn.execute(f"DROP TABLE {table}")
+        conn.commit()
+        conn.close()
+
+        with ProjectDatabase(path) as db:
+            assert db.has_fts
+            assert [h.section for h in db.search("weathertop")] == ['scenes']
+
+
+if __name__ == "__main__":
+    print("Running FTS search tests...")
+    test_query_translation()
+    test_fts_search()
+    test_fts_search_loads_no_bodies()
+    test_dirty_search_matches_clean_search()
+    test_existing_database_gets_indexed()
+    print("✓ FTS search tests passed")
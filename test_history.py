@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for undo/redo history
+"""
+
+import dataclasses
+import sys
+import os
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+
+
+def type_text(service, position, text):
+    for i, char in enumerate(text):
+        service.update_project_content(edits=[(position + i, position + i, char)])
+
+
+def test_typing_is_coalesced():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = service.create_project("History")
+        service.update_project_content("Frodo left.")
+        type_text(service, 5, " Baggins")
+        assert project.content == "Frodo Baggins left." and len(service.history) == 2
+
+        assert service.undo() and project.content == "Frodo left."
+        # The editor writing back the text it shows after undo (no final newline) records nothing
+        service.update_project_content("Frodo left.")
+        assert service.history.can_redo
+        assert service.redo() and project.content == "Frodo Baggins left."
+        assert not service.redo()
+
+        # Backspacing is one step too; a pause starts a new one
+        for end in range(13, 5, -1):
+            service.update_project_content(edits=[(end - 1, end, "")])
+        assert project.content == "Frodo left." and len(service.history) == 3
+        service.history.coalesce_seconds = 0
+        type_text(service, 0, "So")
+        assert len(service.history) == 5
+
+        service.undo()
+        service.undo()
+        service.undo()
+        assert project.content == "Frodo Baggins left."
+        # A new edit drops what could have been redone
+        service.update_project_content("Frodo Baggins left the Shire.")
+        assert service.history.can_undo and not service.history.can_redo
+        service.undo()
+        assert project.content == "Frodo Baggins left."
+
+
+def test_entity_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        autosave = service.enable_autosave(interval=60)
+        project = service.create_project("History")
+        project.file_path = os.path.join(tmp, "history.story")
+        service.add_character(Character(name="Frodo"))
+        assert service.save_project()
+        service.open_project(project.file_path)
+        project = service.current_project
+
+        frodo = service.find_character("Frodo")
+        sam = Character(name="Sam")
+        service.add_character(sam)
+        service.add_character(Character(name="Merry"))
+        service.add_location(Location(name="Bree"))
+        # Editors save a changed copy; the object it replaces is the state undo goes back to
+        frodo = dataclasses.replace(frodo, name="Mr. Frodo", role="ring-bearer", goals=["Mordor"])
+        service.update_character(frodo)
+        service.remove_character(sam.id)
+        names = [c.name for c in project.characters]
+
+        service.undo()
+        assert [c.name for c in project.characters] == ["Mr. Frodo", "Sam", "Merry"]
+        service.undo()
+        # Restored in place: the object views hold sees the old state
+        assert frodo.name == "Frodo" and frodo.role == "" and service.find_character("Frodo") is frodo
+        assert frodo.goals == []
+        service.undo()
+        service.undo()
+        assert [c.name for c in project.characters] == ["Frodo", "Sam"] and not project.locations
+
+        for _ in range(4):
+            service.redo()
+        assert [c.name for c in project.characters] == names and frodo.name == "Mr. Frodo"
+        # Snapshots keep their own lists
+        frodo.goals.append("Shire")
+        service.undo()
+        service.undo()
+        service.redo()
+        assert frodo.goals == ["Mordor"]
+        service.redo()
+        assert service.find_location("Bree") is not None
+
+        # Undo and redo are journaled like any other edit
+        service.undo()
+        autosave.flush()
+        recovered = ProjectService(tmp).open_project(project.file_path)
+        assert [c.name for c in recovered.characters] == ["Mr. Frodo", "Sam", "Merry"]
+
+
+def test_steps_are_small_and_capped():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        service.history.coalesce_seconds = 0
+        project = service.create_project("History")
+        service.update_project_content("word " * 1_000_000)
+        service.history.reset()
+
+        base = project.content
+        for i in range(1_000):
+            service.update_project_content(edits=[(i * 7, i * 7, "x")])
+        # Each step holds the one inserted character, not a copy of the 5 MB text
+        assert len(service.history) == 1_000
+        assert service.history.size < 1_000 * 400
+
+        service.history.memory_limit = 50_000
+        service.update_project_content(edits=[(0, 5, "")])
+        kept = len(service.history)
+        assert service.history.size <= 50_000 and kept < 1_000
+
+        # Undoing everything kept goes back to before the oldest kept step
+        while service.undo():
+            pass
+        expected = base
+        for i in range(1_000 - (kept - 1)):
+            expected = expected[:i * 7] + "x" + expected[i * 7:]
+        assert project.content == expected
+
+
+if __name__ == "__main__":
+    print("Running history tests...")
+    test_typing_is_coalesced()
+    test_entity_changes()
+    test_steps_are_small_and_capped()
+    print("✓ History tests passed")
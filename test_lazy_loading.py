@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for lazy scene/project body loading from JSON and database files
+"""
+
+import sys
+import os
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.models.scene import Scene
+from storyloom.storage.lazy_content import is_loaded
+
+
+def make_project(service: ProjectService, path: str):
+    project = service.create_project("Serial")
+    service.update_project_content("Chapter one.\n\n\"Quoted\" text with \\ and ünïcode.\n")
+    project.scenes = [
+        Scene(title=f"Scene {i}", summary=f"Summary {i}", content=f"Body of scene {i}. " * 50,
+              character_ids=[f"c{i}"], order_index=i)
+        for i in range(10)
+    ]
+    project.file_path = path
+    assert service.save_project()
+    return service._serialize_project(project)
+
+
+def check_lazy_open(path: str):
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        expected = make_project(service, os.path.join(tmp, path))
+
+        project = service.open_project(os.path.join(tmp, path), lazy=True, memory_budget=2500)
+        store = project._content_store
+        assert store is not None
+
+        # Metadata is resident, bodies are not
+        assert [s.title for s in project.scenes] == [f"Scene {i}" for i in range(10)]
+        assert [s.character_ids for s in project.scenes] == [[f"c{i}"] for i in range(10)]
+        assert not any(is_loaded(s, 'content') for s in project.scenes)
+        assert not is_loaded(project, 'content')
+        assert not project.dirty
+
+        # Bodies load on access and are evicted past the budget
+        assert project.scenes[3].content == expected['scenes'][3]['content']
+        assert is_loaded(project.scenes[3], 'content')
+        for scene in project.scenes:
+            assert scene.content
+        assert store.resident <= 2500
+        assert not is_loaded(project.scenes[3], 'content')
+        assert project.scenes[3].content == expected['scenes'][3]['content']
+        assert not project.dirty
+
+        # Edits survive eviction and saves; untouched bodies stay readable
+        project.scenes[0].content = "Rewritten."
+        store.evict_all()
+        assert project.scenes[0].content == "Rewritten."
+        project.title = "Serial, revised"
+        assert service.save_project()
+        assert project.scenes[5].content == expected['scenes'][5]['content']
+        assert project.content == expected['content']
+
+        reopened = service.open_project(project.file_path)
+        assert reopened.title == "Serial, revised"
+        assert reopened.scenes[0].content == "Rewritten."
+        assert reopened.scenes[9].content == expected['scenes'][9]['content']
+        assert reopened.content == expected['content']
+
+
+def test_lazy_json_open():
+    check_lazy_open("serial.story")
+
+
+def test_lazy_database_open():
+    check_lazy_open("serial.storydb")
+
+
+if __name__ == "__main__":
+    test_lazy_json_open()
+    test_lazy_database_open()
+    print("✓ Lazy loading works")
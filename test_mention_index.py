@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the Aho-Corasick mention index
+"""
+
+import sys
+import os
+import random
+import re
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.services.mention_index import AhoCorasick, LOCATION, MentionIndex
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+
+
+def test_automaton_matches_naive_search():
+    rng = random.Random(3)
+    for _ in range(200):
+        patterns = {"".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(6)}
+        text = "".join(rng.choice("abcd") for _ in range(60))
+        automaton = AhoCorasick(patterns)
+        expected = sorted(
+            (m.start(), m.start() + len(p))
+            for p in patterns for m in re.finditer(f"(?={re.escape(p)})", text)
+        )
+        assert sorted(automaton.iter_matches(text)) == expected
+
+        # Removing a pattern and adding another keeps it consistent
+        gone = patterns.pop()
+        automaton.remove(gone)
+        automaton.add("dd")
+        patterns.add("dd")
+        expected = sorted(
+            (m.start(), m.start() + len(p))
+            for p in patterns for m in re.finditer(f"(?={re.escape(p)})", text)
+        )
+        assert sorted(automaton.iter_matches(text)) == expected
+
+
+def test_mentions():
+    index = MentionIndex()
+    index.add("mary", "Mary")
+    index.add("mj", "Mary Jane")
+    index.add("jane", "Jane")
+    index.add("riv", "Rivendell", LOCATION)
+    text = "Mary Jane met mary\njane in RIVENDELL. Mary Janet and Jane. Maryland."
+    found = [(text[m.start:m.end], m.entity_id) for m in index.find(text)]
+    assert found == [("Mary Jane", "mj"), ("mary\njane", "mj"), ("RIVENDELL", "riv"),
+                     ("Mary", "mary"), ("Jane", "jane")]
+    assert index.entities_in(text, kind=LOCATION) == {"riv"}
+
+    index.rename("riv", "Bree")
+    assert index.counts(text)["riv"] == 0
+    assert index.counts("Bree and bree")["riv"] == 2
+
+
+def test_whitespace_runs_and_folding_offsets():
+    index = MentionIndex()
+    index.add("mj", "Mary Jane")
+    index.add("ist", "İstanbul", LOCATION)
+    index.add("bob", "Bob")
+    text = "Mary  Jane\tin İstanbul\n\nwith Mary\n\n  Jane, then\u2003Bob and MARY\u00a0JANE."
+    found = [(text[m.start:m.end], m.entity_id) for m in index.find(text)]
+    assert found == [("Mary  Jane", "mj"), ("İstanbul", "ist"), ("Mary\n\n  Jane", "mj"),
+                     ("Bob", "bob"), ("MARY\u00a0JANE", "mj")]
+
+    # Offsets after a character that lower-cases to two stay exact
+    text = "İİ İstanbul, Bob"
+    assert [text[m.start:m.end] for m in index.find(text)] == ["İstanbul", "Bob"]
+    assert index.find("Bobİ") == [] and index.find("xİstanbul") == []
+
+
+def test_service_resyncs_on_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        service.create_project("Mentions")
+        alice = Character(name="Alice")
+        service.add_character(alice)
+        service.add_location(Location(name="Harbor"))
+        service.update_project_content("Alice walked to the Harbor. Alice waited.")
+        assert service.count_mentions()[alice.id] == 2
+
+        alice.name = "Alicia"
+        service.update_character(alice)
+        assert service.count_mentions()[alice.id] == 0
+        assert len(service.find_mentions("Alicia and ALICIA")) == 2
+
+        service.remove_character(alice.id)
+        assert [m.kind for m in service.find_mentions("Alicia at the harbor")] == [LOCATION]
+
+
+if __name__ == "__main__":
+    print("Running mention index tests...")
+    test_automaton_matches_naive_search()
+    test_mentions()
+    test_whitespace_runs_and_folding_offsets()
+    test_service_resyncs_on_changes()
+    print("✓ Mention index tests passed")
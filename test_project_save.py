@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for dirty tracking and atomic .story saves
+"""
+
+import sys
+import os
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.models.character import Character
+from storyloom.models.scene import Scene
+from storyloom.storage.atomic import atomic_open
+
+
+def test_dirty_tracking():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = service.create_project("Dirty")
+        alice = Character(name="Alice")
+        service.add_character(alice)
+        assert project.dirty
+
+        assert service.save_project()
+        assert not project.dirty
+        inode = os.stat(project.file_path).st_ino
+
+        # Unchanged projects (and no-op assignments) are not rewritten
+        project.title = "Dirty"
+        assert not project.dirty
+        assert service.save_project()
+        assert os.stat(project.file_path).st_ino == inode
+
+        alice.role = "Hero"
+        assert project.dirty
+        assert service.save_project()
+        assert not project.dirty
+
+        project.scenes.append(Scene(title="Opening"))
+        assert project.dirty
+        assert service.save_project()
+
+        service.remove_character(alice.id)
+        assert project.dirty
+        assert service.save_project()
+
+        reopened = service.open_project(project.file_path)
+        assert not reopened.dirty
+        assert [s.title for s in reopened.scenes] == ["Opening"]
+        assert len(reopened.characters) == 0
+
+
+def test_compact_and_pretty_encoding():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = service.create_project("Encoding")
+        service.update_project_content("Zoë walked to Bjørn's house.\n")
+
+        assert service.save_project()
+        with open(project.file_path, encoding='utf-8') as f:
+            compact = f.read()
+        assert "\n  " not in compact
+
+        assert service.save_project(pretty=True, force=True)
+        with open(project.file_path, encoding='utf-8') as f:
+            assert '\n  "title": "Encoding"' in f.read()
+
+        assert service.open_project(project.file_path).content == project.content
+
+
+def test_failed_write_keeps_previous_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "story.story")
+        with atomic_open(path) as f:
+            f.write("original")
+
+        try:
+            with atomic_open(path) as f:
+                f.write("partial")
+                raise RuntimeError("crash mid-write")
+        except RuntimeError:
+            pass
+
+        with open(path) as f:
+            assert f.read() == "original"
+        assert os.listdir(tmp) == ["story.story"]
+
+
+if __name__ == "__main__":
+    test_dirty_tracking()
+    test_compact_and_pretty_encoding()
+    test_failed_write_keeps_previous_file()
+    print("✓ Project saves work")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the Rope text buffer and editing project content through it
+"""
+
+import sys
+import os
+import random
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.storage.lazy_content import is_loaded
+from storyloom.storage.rope import Rope, content_rope, edit_content
+from storyloom.models.scene import Scene
+
+
+def test_random_edits_match_str():
+    rng = random.Random(3)
+    text = "".join(rng.choice("abc de\n") for _ in range(20_000))
+    rope = Rope(text)
+    snapshots = []
+    for i in range(1_000):
+        start = rng.randrange(len(text) + 1)
+        end = min(start + rng.choice([0, 0, 1, 7, 300, 5_000]), len(text))
+        insert = "".join(rng.choice("xy\n") for _ in range(rng.choice([0, 1, 4, 3_000])))
+        text = text[:start] + insert + text[end:]
+        rope = rope.replace(start, end, insert)
+        if i % 100 == 0:
+            snapshots.append((rope, text))
+
+    assert str(rope) == text and len(rope) == len(text)
+    # Earlier ropes are untouched by later edits
+    assert all(str(snapshot) == expected for snapshot, expected in snapshots)
+    for _ in range(200):
+        start = rng.randrange(len(text) + 1)
+        stop = rng.randrange(start, len(text) + 1)
+        assert rope[start:stop] == text[start:stop]
+
+
+def test_line_mapping():
+    text = "first line\nsecond\n\nfourth line here\n" * 500
+    rope = Rope(text)
+    lines = text.split("\n")
+    assert rope.line_count == len(lines)
+    for line in (0, 1, 2, 3, 777, len(lines) - 1):
+        start = rope.line_start(line)
+        assert rope.line(line) == lines[line]
+        assert rope.line_of(start) == line
+        assert rope.position(start + len(lines[line])) == (line, len(lines[line]))
+        assert rope.offset(line) == len("\n".join(lines[:line])) + (1 if line else 0)
+    offset = text.index("fourth", 10_000)
+    assert rope.position(offset) == (text.count("\n", 0, offset), 0)
+
+    rope = rope.insert(0, "title\n")
+    assert rope.line(0) == "title" and rope.line(1) == "first line"
+
+
+def test_project_content_edits():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = service.create_project("Rope")
+        project.file_path = os.path.join(tmp, "rope.story")
+        service.update_project_content("Frodo left the Shire.\n" * 1_000)
+        assert service.save_project()
+        service.open_project(project.file_path, lazy=True)
+        project = service.current_project
+
+        expected = project.content
+        before = content_rope(project)
+        service.update_project_content(edits=[(0, 5, "Bilbo"), (6, 10, "walked out of")])
+        expected = "Bilbo walked out of" + expected[10:]
+        # The text is joined again only when read
+        assert not project.__dict__.get('content') and is_loaded(project, 'content')
+        assert project.dirty and project.content == expected
+        assert content_rope(project) is content_rope(project) and str(before) != expected
+
+        # Assigning a str replaces the rope
+        service.update_project_content(expected + "The end.")
+        service.update_project_content(edits=[(0, 0, "> ")])
+        assert project.content == "> " + expected + "The end."
+        # Editors hand the analysis worker the rope snapshot, joined there
+        assert service.analyze_text(content_rope(project)).word_count == len(project.content.split())
+
+        assert service.save_project()
+        assert ProjectService(tmp).open_project(project.file_path).content == project.content
+
+        scene = Scene(title="Edited", content="A short scene.")
+        edit_content(scene, 2, 7, "long")
+        assert scene.content == "A long scene." and scene.dirty
+
+
+if __name__ == "__main__":
+    print("Running rope tests...")
+    test_random_edits_match_str()
+    test_line_mapping()
+    test_project_content_edits()
+    print("✓ Rope tests passed")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for scene detection in the story content
+"""
+
+import sys
+import os
+import random
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.services.mention_index import LOCATION, MentionIndex
+from storyloom.services.scene_segmenter import SceneSegmenter, iter_scenes
+from storyloom.storage.rope import Rope
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+
+STORY = (
+    "Prologue\n\nThe ring was lost.\n\n\n"
+    "Chapter 1: Bag End\n\nFrodo and Sam talked in Bag End.\nSam left.\n"
+    "* * *\n\nGandalf came to Bag End. Frodo listened to Gandalf.\n"
+    "Chapter Two\n#\n\nPart I remember this line.\n\n\n\n\nThey reached Bree.\n"
+)
+
+
+def test_split_and_analysis():
+    scenes = list(iter_scenes(STORY))
+    assert [title for _, _, title in scenes] == ["Prologue", "Chapter 1: Bag End", "", "Chapter Two", ""]
+    # Headings open their scene; markers and blank lines belong to none
+    assert STORY[scenes[1][0]:scenes[1][1]] == "Chapter 1: Bag End\n\nFrodo and Sam talked in Bag End.\nSam left.\n"
+    assert STORY[scenes[2][0]:scenes[2][1]].startswith("Gandalf came")
+    assert STORY[scenes[3][0]:scenes[3][1]].endswith("Part I remember this line.\n")
+    assert list(iter_scenes("\n\n\n***\n  \n")) == []
+
+    index = MentionIndex()
+    index.add("frodo", "Frodo")
+    index.add("sam", "Sam")
+    index.add("gandalf", "Gandalf")
+    index.add("bag-end", "Bag End", LOCATION)
+    index.add("bree", "Bree", LOCATION)
+    segmenter = SceneSegmenter(index)
+    segmenter.reset(STORY)
+    detected = segmenter.scenes()
+    assert [d.word_count for d in detected] == [5, 13, 9, 8, 3]
+    assert detected[1].scene.character_ids == ["sam", "frodo"] and detected[1].scene.location_id == "bag-end"
+    assert detected[2].scene.character_ids == ["gandalf", "frodo"]
+    assert detected[4].scene.character_ids == [] and detected[4].scene.location_id == "bree"
+    assert detected[2].scene.content == STORY[detected[2].start:detected[2].end]
+    assert [d.scene.order_index for d in detected] == list(range(5))
+
+
+def test_incremental_matches_full_scan():
+    pieces = ["Frodo walked. ", "Sam ran.\n", "\n", "\n\n\n", "***\n", "Chapter 3\n", "# Bree\n", "x", " ", "  \n"]
+    index = MentionIndex()
+    index.add("frodo", "Frodo")
+    index.add("bree", "Bree", LOCATION)
+    rng = random.Random(7)
+    for round in range(60):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 80)))
+        segmenter = SceneSegmenter(index)
+        rope = round % 2 == 1
+        segmenter.reset(Rope(text) if rope else text)
+        for _ in range(30):
+            start = rng.randint(0, len(text))
+            end = min(len(text), start + rng.choice([0, 1, 4, 40]))
+            insert = "".join(rng.choice(pieces) for _ in range(rng.choice([0, 1, 2, 6])))
+            text = text[:start] + insert + text[end:]
+            segmenter.apply_edit(Rope(text) if rope else text, start, end, start + len(insert))
+
+            reference = SceneSegmenter(index)
+            reference.reset(text)
+            state = lambda s: [(d.start, d.end, d.word_count, d.scene.title, d.scene.content,
+                                d.scene.character_ids, d.scene.location_id) for d in s.scenes()]
+            assert state(segmenter) == state(reference), (round, text)
+
+    # Only the scene around an edit is rescanned, and keeps its Scene
+    text = "".join(f"Chapter {i}\n\nFrodo walked on and on.\n\n\n" for i in range(1, 200))
+    segmenter = SceneSegmenter(index)
+    segmenter.reset(text)
+    before = segmenter.scenes()
+    position = text.index("Frodo", before[100].start)
+    rescanned = segmenter.rescanned
+    changed = segmenter.apply_edit(text[:position] + "Bree. " + text[position:], position, position, position + 6)
+    after = segmenter.scenes()
+    assert len(changed) == 1 and segmenter.rescanned - rescanned == 1
+    assert after[100].scene is before[100].scene and after[100].scene.location_id == "bree"
+    assert after[150].start == before[150].start + 6
+
+
+def test_service_scenes():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = service.create_project("Scenes")
+        service.add_character(Character(name="Frodo"))
+        service.add_character(Character(name="Sam"))
+        service.add_location(Location(name="Bag End"))
+        service.update_project_content(STORY)
+        scenes = service.detect_scenes()
+        assert len(scenes) == 5 and not project.scenes
+
+        # Edits through the rope, whole-text updates and undo all keep the scenes in step
+        cut = STORY.index("* * *")
+        service.update_project_content(edits=[(cut, cut + 6, "")])
+        assert len(service.detect_scenes()) == 4
+        service.update_project_content(project.content + "\n\n\nEpilogue\nSam went home.\n")
+        scenes = service.detect_scenes()
+        assert scenes[-1].scene.title == "Epilogue" and scenes[-1].scene.content == "Epilogue\nSam went home.\n"
+        service.undo()
+        service.undo()
+        assert [(d.start, d.end) for d in service.detect_scenes()] == [(s, e) for s, e, _ in iter_scenes(STORY)]
+
+        # Renaming a character re-analyses the scenes naming it
+        sam = service.find_character("Sam")
+        sam.name = "Samwise"
+        service.update_character(sam)
+        assert sam.id not in service.detect_scenes()[1].scene.character_ids
+        service.update_project_content(project.content.replace("Sam ", "Samwise "))
+        assert service.detect_scenes()[1].scene.character_ids[0] == sam.id
+
+        # A newly opened project is split from scratch
+        service.create_project("Empty")
+        assert service.detect_scenes() == []
+
+
+if __name__ == "__main__":
+    print("Running scene detection tests...")
+    test_split_and_analysis()
+    test_incremental_matches_full_scan()
+    test_service_scenes()
+    print("✓ Scene detection tests passed")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for the full-text search index
+"""
+
+import sys
+import os
+import random
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.services.search_index import SearchIndex, make_snippet, parse_query, token_offsets, tokenize
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+from storyloom.models.scene import Scene
+
+
+def keys(hits):
+    return [(h.section, h.entity_id, h.field) for h in hits]
+
+
+def test_terms_phrases_and_prefixes():
+    index = SearchIndex()
+    index.update(('scenes', 's1', 'content'), "The storm broke over the harbor. Aragorn waited.")
+    index.update(('scenes', 's2', 'content'), "A harbor storm? No - the storm was far away. Storm after storm.")
+    index.update(('scenes', 's3', 'content'), "Aragorn rode north through the forest.")
+
+    assert tokenize("Don't STOP") == ["don", "t", "stop"]
+    assert [c.terms for c in parse_query('"the storm" arag* well-known')] == [
+        ("the", "storm"), ("arag",), ("well", "known")]
+
+    # The scene repeating "storm" ranks first
+    assert keys(index.search("storm"))[0] == ('scenes', 's2', 'content')
+    assert {h.entity_id for h in index.search("storm")} == {'s1', 's2'}
+
+    # Every clause must match
+    assert keys(index.search("storm aragorn")) == [('scenes', 's1', 'content')]
+    assert index.search("storm dragon") == []
+
+    # Phrases need adjacent words in order
+    assert keys(index.search('"storm broke"')) == [('scenes', 's1', 'content')]
+    assert index.search('"broke storm"') == []
+    assert keys(index.search('"harbor storm"')) == [('scenes', 's2', 'content')]
+
+    assert {h.entity_id for h in index.search("arag*")} == {'s1', 's3'}
+    assert index.complete("st") == ["storm"]
+
+    # Positions locate the matched words in the original text
+    text = "The storm broke over the harbor. Aragorn waited."
+    [hit] = index.search('"storm broke" harbor')
+    assert [text[a:b] for a, b in token_offsets(text, hit.positions)] == ["storm", "broke", "harbor"]
+
+
+def test_incremental_updates_match_rebuild():
+    rng = random.Random(3)
+    words = "storm harbor night blade Aragorn Gandalf the a of forest road".split()
+
+    def text():
+        return " ".join(rng.choice(words) for _ in range(rng.randint(0, 60)))
+
+    docs = {('scenes', str(i), 'content'): text() for i in range(40)}
+    index = SearchIndex()
+    for key, value in docs.items():
+        index.update(key, value)
+    for _ in range(200):
+        key = rng.choice(list(docs))
+        if rng.random() < 0.2:
+            docs.pop(key)
+            index.remove(key)
+        else:
+            docs[key] = text()
+            index.update(key, docs[key])
+
+    fresh = SearchIndex()
+    for key, value in docs.items():
+        fresh.update(key, value)
+    def results(idx, query):
+        # Document numbers differ between the indexes, so ties may come out in another order
+        return sorted((h.section, h.entity_id, h.field, round(h.score, 9), h.positions)
+                      for h in idx.search(query, 100))
+
+    for query in ("storm", "the storm", '"harbor night"', "for*", "a* gandalf", "nothing"):
+        assert results(index, query) == results(fresh, query), query
+
+
+def test_long_fields_reindex_changed_chunks():
+    rng = random.Random(5)
+    words = "storm harbor night blade Aragorn Gandalf the a of forest road".split()
+    paragraphs = [" ".join(rng.choice(words) for _ in range(rng.randint(20, 120))) for _ in range(3000)]
+    paragraphs[1500] = "The dragon slept under the hill."
+    key = ('projects', 'p', 'content')
+    index = SearchIndex()
+    index.update(key, "\n\n".join(paragraphs))
+    index.update(('scenes', 's', 'content'), "a storm at the harbor")
+
+    chunks = index._chunks[index._docs[key]]
+    assert len(chunks.ids) > 10
+    before = list(chunks.ids)
+
+    # A one-character edit re-tokenizes only the chunk it falls in
+    paragraphs[1500] = "The dragon slept under the hills."
+    text = "\n\n".join(paragraphs)
+    assert index.update(key, text)
+    changed = [chunk for chunk in chunks.ids if chunk not in before]
+    assert len(changed) == 1 and len(chunks.ids) == len(before)
+
+    # Phrases across chunk boundaries, scores and positions match a fresh index
+    boundary = chunks.starts[len(chunks.starts) // 2]
+    phrase = '"%s %s"' % (tokenize(text[:boundary - 1])[-1], tokenize(text[boundary:])[0])
+    fresh = SearchIndex()
+    fresh.update(key, text)
+    fresh.update(('scenes', 's', 'content'), "a storm at the harbor")
+    for query in ("hills", '"slept under the hills"', "storm harbor", phrase, "drag*", "dragon"):
+        hits = index.search(query)
+        assert hits and hits == fresh.search(query), query
+    [hit] = index.search('"under the hills"')
+    assert [text[a:b] for a, b in token_offsets(text, hit.positions)] == ["under", "the", "hills"]
+    assert index.snippet(key, text, hit.positions) == make_snippet(text, hit.positions)
+    assert "dragon slept [under] [the] [hills]" in make_snippet(text, hit.positions)
+
+
+def test_service_search():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = service.create_project("Search")
+        service.update_project_content("Chapter one. The ranger crossed the river.")
+        service.add_character(Character(name="Aragorn", description="A ranger from the north"))
+        service.add_location(Location(name="Bree", description="A village with an inn"))
+        project.scenes = [Scene(title="Inn", summary="Meeting at the inn", content="Frodo met Strider.")]
+
+        assert {(h.section, h.field) for h in service.search("ranger")} == {
+            ('projects', 'content'), ('characters', 'description')}
+        assert {h.section for h in service.search("inn")} == {'scenes', 'locations'}
+        assert service.search_index.sync(project) == 0
+
+        # Editing one scene only re-indexes that field
+        project.scenes[0].content = "Frodo met the ranger."
+        assert service.search_index.sync(project) == 1
+        assert ('scenes', 'content') in {(h.section, h.field) for h in service.search("ranger")}
+
+
+if __name__ == "__main__":
+    print("Running search index tests...")
+    test_terms_phrases_and_prefixes()
+    test_incremental_updates_match_rebuild()
+    test_long_fields_reindex_changed_chunks()
+    test_service_search()
+    print("✓ Search index tests passed")
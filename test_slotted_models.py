@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the slotted entity models
+"""
+
+import sys
+import os
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+from storyloom.models.relationship import Relationship
+from storyloom.models.scene import Scene
+from storyloom.storage.lazy_content import is_loaded
+
+
+def test_no_instance_dict():
+    for entity in (Character(name="Alice"), Location(name="Harbor"), Scene(title="One"),
+                   Relationship(source_id="a", target_id="b")):
+        assert not hasattr(entity, '__dict__')
+
+
+def test_constructor_keywords_and_tracking():
+    scene = Scene(id="s1", title="One", summary="Start", content="Text", character_ids=["c1"],
+                  location_id="l1", order_index=2)
+    assert (scene.title, scene.content, scene.order_index) == ("One", "Text", 2)
+    assert is_loaded(scene, 'content')
+    assert scene.dirty
+
+    scene.mark_clean()
+    scene.content = "Text"
+    scene.character_ids = ["c1"]
+    assert not scene.dirty
+    scene.content = "Changed"
+    assert scene.dirty
+
+
+def test_ids_are_shared():
+    ident = "0f6f6a52-8a3c-4f7e-9d2b-5b8d2a3c9e11"
+    character = Character(id=ident.encode().decode())
+    scene = Scene(character_ids=[ident.encode().decode()], location_id="loc".encode().decode())
+    relationship = Relationship(source_id=ident.encode().decode(), target_id="loc".encode().decode())
+    assert scene.character_ids[0] is character.id
+    assert relationship.source_id is character.id
+    assert relationship.target_id is scene.location_id
+
+
+if __name__ == "__main__":
+    print("Running slotted model tests...")
+    test_no_instance_dict()
+    test_constructor_keywords_and_tracking()
+    test_ids_are_shared()
+    print("✓ Slotted model tests passed")
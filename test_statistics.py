@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for the running text statistics and the words written per day
+"""
+
+import sys
+import os
+import random
+import tempfile
+from datetime import date
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.services.statistics import READING_WPM, TextCounts, TextStatistics, WritingSession, count_text
+from storyloom.storage.rope import Rope
+
+
+class RecordingText(str):
+    """A str that remembers the longest slice taken from it"""
+
+    longest = 0
+
+    def __getitem__(self, key):
+        piece = str.__getitem__(self, key)
+        RecordingText.longest = max(RecordingText.longest, len(piece))
+        return piece
+
+
+def test_count_text():
+    text = 'He ran. "Stop!" she said.\nNobody… \n\n  moved (at all.) The end'
+    assert count_text(text) == TextCounts(words=11, characters=len(text), sentences=6, paragraphs=3)
+    assert count_text("") == TextCounts()
+    assert count_text(" \n\n ") == TextCounts(characters=4)
+    assert count_text("3.14 is pi") == TextCounts(3, 10, 1, 1)
+    assert TextCounts(words=READING_WPM * 3).reading_minutes == 3
+
+
+def test_edits_match_full_recount():
+    pieces = ["word", "Word.", " ", "  ", "\n", "\n\n", "end!", "\"Hi?\"", "(so.)", "…", "x", "\t"]
+    rng = random.Random(11)
+    for round in range(80):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 60)))
+        rope = round % 2 == 1
+        statistics = TextStatistics(Rope(text) if rope else text)
+        for _ in range(40):
+            start = rng.randint(0, len(text))
+            end = min(len(text), start + rng.choice([0, 1, 3, 20]))
+            insert = "".join(rng.choice(pieces) for _ in range(rng.choice([0, 1, 2, 5])))
+            before = statistics.counts
+            new = text[:start] + insert + text[end:]
+            delta = statistics.apply_edit(Rope(new) if rope else new, start, text[start:end], insert)
+            text = new
+            assert statistics.counts == count_text(text), (round, text)
+            assert tuple(b + d for b, d in zip(before, delta)) == statistics.counts
+        # Whole-text updates are diffed first
+        other = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 60)))
+        statistics = TextStatistics(text)
+        statistics.update(other)
+        assert statistics.counts == count_text(other)
+
+
+def test_edit_cost_is_local():
+    text = "All work and no play. " * 50_000 + "\n\n" + "The end. " * 50_000
+    statistics = TextStatistics(RecordingText(text))
+    rng = random.Random(3)
+    for _ in range(200):
+        start = rng.randrange(len(text))
+        insert = rng.choice(["x", " ", ". ", "\n\n"])
+        text = RecordingText(text[:start] + insert + text[start:])
+        RecordingText.longest = 0
+        statistics.apply_edit(text, start, "", insert)
+        # Only the words around the edit were read, never the whole manuscript
+        assert RecordingText.longest < 200
+    assert statistics.counts == count_text(text)
+
+
+def test_writing_session():
+    day = [date(2024, 5, 1)]
+    session = WritingSession(today=lambda: day[0])
+    session.record(3)
+    session.record(-1)
+    session.record(0)
+    assert (session.added, session.deleted, session.written) == (3, 1, 2)
+    day[0] = date(2024, 5, 2)
+    assert session.written == 0
+    session.record(5)
+    assert (session.day, session.added, session.deleted, session.written) == (date(2024, 5, 2), 5, 0, 5)
+
+
+def test_service_statistics():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = service.create_project("Counts")
+        service.history.coalesce_seconds = 0
+        written = service.session.written
+        service.update_project_content("Once upon a time.")
+        service.update_project_content(edits=[(17, 17, " The end.\n\nAgain")])
+        assert service.text_statistics() == count_text(project.content) == TextCounts(7, len(project.content), 3, 2)
+        assert service.session.written - written == 7
+        service.undo()
+        assert service.text_statistics() == count_text("Once upon a time.")
+        assert service.session.written - written == 4
+
+        # The analysis worker's counts follow the text it is given
+        assert service.analyze_text("Alice met Bob").word_count == 3
+        assert service.analyze_text("Alice met Bob twice").word_count == 4
+
+        # Opening another project counts its content afresh
+        service.save_project()
+        service.create_project("Other")
+        assert service.text_statistics() == TextCounts()
+        assert service.open_project(project.file_path)
+        assert service.text_statistics() == count_text("Once upon a time.")
+        service.close()
+
+        # Per-scene counts
+        service = ProjectService(tmp)
+        service.create_project("Scenes")
+        service.update_project_content("Chapter 1\n\nOne. Two.\n\n\nChapter 2\n\nThree!\n")
+        assert [(d.counts.sentences, d.counts.paragraphs) for d in service.detect_scenes()] == [(2, 2), (1, 2)]
+        assert [d.word_count for d in service.detect_scenes()] == [4, 3]
+
+
+if __name__ == "__main__":
+    print("Running text statistics tests...")
+    test_count_text()
+    test_edits_match_full_recount()
+    test_edit_cost_is_local()
+    test_writing_session()
+    test_service_statistics()
+    print("✓ Text statistics tests passed")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the StoryGraph engine
+"""
+
+import sys
+import os
+import random
+from collections import deque
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.graph.story_graph import StoryGraph
+
+
+def bfs_distances(adj, start):
+    dist = {start: 0}
+    queue = deque([start])
+    while queue:
+        u = queue.popleft()
+        for v in adj.get(u, ()):
+            if v not in dist:
+                dist[v] = dist[u] + 1
+                queue.append(v)
+    return dist
+
+
+def test_edges_are_typed_and_deduplicated():
+    graph = StoryGraph()
+    graph.add_edge("alice", "bob", "co_occurs", weight=2)
+    graph.add_edge("bob", "alice", "co_occurs", weight=3)
+    graph.add_weight("alice", "bob", "co_occurs", 1)
+    graph.add_edge("alice", "bob", "rival")
+    graph.add_edge("alice", "harbor", "visits")
+
+    assert graph.edge_count == 3
+    assert graph.weight("alice", "bob", "co_occurs") == 4
+    assert graph.weight("bob", "alice") == 5
+    assert sorted(graph.edge_types("bob", "alice")) == ["co_occurs", "rival"]
+    assert graph.neighbors("alice") == {"bob", "harbor"}
+    assert graph.neighbors("alice", "visits") == {"harbor"}
+
+    assert graph.remove_edge("alice", "bob", "rival")
+    assert graph.has_edge("alice", "bob")
+    assert graph.remove_edge("bob", "alice")
+    assert not graph.has_edge("alice", "bob")
+    assert graph.neighbors("bob") == set()
+
+    assert graph.remove_node("harbor")
+    assert graph.edge_count == 0
+    assert "harbor" not in graph
+
+
+def test_legacy_api():
+    graph = StoryGraph()
+    graph.connect("a", "b", "siblings")
+    graph.connect("a", "b", "siblings")
+    assert graph.connections_for("a") == [("b", "siblings")]
+    assert graph.connections_for("b") == [("a", "siblings")]
+    assert graph.connections_for("missing") == []
+
+
+def test_queries_match_reference_bfs():
+    rng = random.Random(7)
+    graph = StoryGraph()
+    adj = {}
+    nodes = [f"n{i}" for i in range(200)]
+    for _ in range(260):
+        a, b = rng.sample(nodes, 2)
+        graph.add_edge(a, b)
+        adj.setdefault(a, set()).add(b)
+        adj.setdefault(b, set()).add(a)
+
+    for _ in range(100):
+        a, b = rng.sample(sorted(adj), 2)
+        dist = bfs_distances(adj, a)
+        path = graph.shortest_path(a, b)
+        if b not in dist:
+            assert path is None
+            continue
+        assert len(path) == dist[b] + 1
+        assert path[0] == a and path[-1] == b
+        assert all(y in adj[x] for x, y in zip(path, path[1:]))
+
+        hood = graph.neighborhood(a, 2)
+        assert hood == {n: d for n, d in dist.items() if d <= 2}
+
+    components = graph.connected_components()
+    assert sum(map(len, components)) == len(adj)
+    for component in components:
+        start = next(iter(component))
+        assert set(bfs_distances(adj, start)) == component
+
+    centrality = graph.degree_centrality()
+    node = next(iter(adj))
+    assert centrality[node] == len(adj[node]) / (len(adj) - 1)
+
+
+if __name__ == "__main__":
+    print("Running story graph tests...")
+    test_edges_are_typed_and_deduplicated()
+    test_legacy_api()
+    test_queries_match_reference_bfs()
+    print("✓ Story graph tests passed")
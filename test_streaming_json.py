@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming .story reads and writes
+"""
+
+import sys
+import os
+import io
+import json
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+from storyloom.models.scene import Scene
+from storyloom.storage.json_stream import JsonScanner, decode_span, write_json_stream
+
+
+def _sample_project(service):
+    project = service.create_project("Stream")
+    project.content = 'Opening "quoted" line\nwith a backslash \\ and Zoë'
+    service.add_character(Character(name="Alice", goals=["win", "escape"]))
+    service.add_location(Location(name="Harbor"))
+    for i in range(3):
+        project.scenes.append(Scene(title=f"Scene {i}", content=f"Body {i}\n" * 50, order_index=i))
+    return project
+
+
+def test_streamed_output_matches_json_dumps():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = _sample_project(service)
+        data = service._serialize_project(project)
+
+        for pretty in (False, True):
+            buf = io.BytesIO()
+            spans = write_json_stream(buf, service._serialize_members(project), pretty=pretty,
+                                      root_section='projects')
+            if pretty:
+                expected = json.dumps(data, indent=2, default=str)
+            else:
+                expected = json.dumps(data, separators=(',', ':'), default=str)
+            assert buf.getvalue().decode('utf-8') == expected
+
+            # Spans point at the body literals
+            raw = buf.getvalue()
+            span = spans[('projects', project.id)]
+            assert decode_span(raw[span.start:span.end]) == project.content
+            for scene in project.scenes:
+                span = spans[('scenes', scene.id)]
+                assert decode_span(raw[span.start:span.end]) == scene.content
+
+
+def test_streamed_members():
+    raw = json.dumps({'id': 'p', 'scenes': [{'id': 1}, {'id': 2}], 'tail': [1, 2]}).encode()
+    seen = []
+    for key, value in JsonScanner(raw).iter_members(stream_keys=('scenes',)):
+        if key == 'scenes':
+            # Elements arrive one at a time
+            assert not isinstance(value, list)
+            seen.append(next(value))  # leave the rest undrained
+        else:
+            seen.append((key, value))
+    assert seen == [('id', 'p'), {'id': 1}, ('tail', [1, 2])]
+
+
+def test_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        project = _sample_project(service)
+        expected = service._serialize_project(project)
+
+        for pretty in (False, True):
+            assert service.save_project(force=True, pretty=pretty)
+            for lazy in (False, True):
+                reopened = ProjectService(tmp).open_project(project.file_path, lazy=lazy)
+                assert service._serialize_project(reopened) == expected
+
+
+if __name__ == "__main__":
+    print("Running streaming JSON tests...")
+    test_streamed_output_matches_json_dumps()
+    test_streamed_members()
+    test_round_trip()
+    print("✓ Streaming JSON tests passed")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for the virtualized list model (headless - no Tk or Flet widgets)
+"""
+
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from ui.virtual_list import TkListboxView, VirtualList
+
+
+class RecordingView:
+    """Keeps the materialized rows as a list and counts widget operations"""
+
+    def __init__(self):
+        self.rows = []
+        self.hidden = (0, 0)
+        self.ops = 0
+
+    def insert_row(self, index, key, value):
+        self.rows.insert(index, (key, value))
+        self.ops += 1
+
+    def remove_row(self, index):
+        del self.rows[index]
+        self.ops += 1
+
+    def change_row(self, index, key, value):
+        assert self.rows[index][0] == key
+        self.rows[index] = (key, value)
+        self.ops += 1
+
+    def set_hidden(self, before, after):
+        self.hidden = (before, after)
+
+    def count(self):
+        ops, self.ops = self.ops, 0
+        return ops
+
+
+class FakeListbox:
+    """The part of tk.Listbox that TkListboxView uses"""
+
+    def __init__(self):
+        self.items = []
+
+    def insert(self, index, text):
+        self.items.insert(index, text)
+
+    def delete(self, index):
+        del self.items[index]
+
+
+def test_only_window_is_materialized():
+    view = RecordingView()
+    rows = VirtualList(view, window=50)
+    characters = [(f"c{i}", f"Character {i}") for i in range(10_000)]
+    rows.update(characters)
+    assert view.count() == 50
+    assert view.rows == characters[:50] and view.hidden == (0, 9_950)
+
+    # Changes outside the window cost no widget operations
+    characters.append(("new", "Newcomer"))
+    characters[5_000] = ("c5000", "Renamed")
+    rows.update(characters)
+    assert view.count() == 0 and view.hidden == (0, 9_951)
+
+    # A rename in view is one change; a removal in view slides one row in
+    characters[3] = ("c3", "Renamed")
+    rows.update(characters)
+    assert view.count() == 1
+    del characters[10]
+    rows.update(characters)
+    assert view.count() == 2
+    assert view.rows == characters[:50]
+
+    # Scrolling materializes only the rows entering the window
+    rows.scroll_to(10)
+    assert view.count() == 20
+    assert view.rows == characters[10:60] and view.hidden == (10, len(characters) - 60)
+    rows.scroll_to(100_000)
+    assert view.rows == characters[-50:] and view.hidden == (len(characters) - 50, 0)
+
+
+def test_random_updates_match_full_rebuild():
+    rng = random.Random(7)
+    items = [(i, f"row {i}") for i in range(300)]
+    next_key = 300
+    view = RecordingView()
+    rows = VirtualList(view, window=40)
+    rows.update(items)
+    for _ in range(300):
+        action = rng.random()
+        if action < 0.3:
+            items.insert(rng.randrange(len(items) + 1), (next_key, f"row {next_key}"))
+            next_key += 1
+        elif action < 0.5 and items:
+            del items[rng.randrange(len(items))]
+        elif action < 0.7 and items:
+            i = rng.randrange(len(items))
+            items[i] = (items[i][0], items[i][1] + "!")
+        elif action < 0.8:
+            rng.shuffle(items)
+        else:
+            rows.scroll_to(rng.randrange(len(items) + 1))
+        rows.update(items)
+        assert view.rows == items[rows.first:rows.first + 40]
+        assert view.hidden == (rows.first, len(items) - rows.first - len(view.rows))
+
+
+def test_tk_listbox_gets_diffs():
+    listbox = FakeListbox()
+    rows = VirtualList(TkListboxView(listbox), window=None)
+    characters = [(f"c{i}", f"Character {i}") for i in range(10_000)]
+    rows.update(characters)
+    assert listbox.items == [name for _, name in characters]
+
+    calls = []
+    listbox.insert = lambda index, text, insert=listbox.insert: calls.append(index) or insert(index, text)
+    characters.append(("new", "Newcomer"))
+    rows.update(characters)
+    assert calls == [10_000] and listbox.items[-1] == "Newcomer"
+    assert rows.key_at(10_000) == "new"
+
+
+if __name__ == "__main__":
+    print("Running virtual list tests...")
+    test_only_window_is_materialized()
+    test_random_updates_match_full_rebuild()
+    test_tk_listbox_gets_diffs()
+    print("✓ Virtual list tests passed")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-project workspace
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# Add the storyloom_core to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'storyloom_core'))
+
+from storyloom.services.project_service import ProjectService
+from storyloom.services.metadata_index import INDEX_FILENAME, read_project_summary
+from storyloom.services.workspace import Workspace
+from storyloom.models.character import Character
+from storyloom.models.location import Location
+from storyloom.models.scene import Scene
+
+
+def make_projects(service):
+    paths = {}
+    for i, (title, ext) in enumerate([("Book One", ".story"), ("Book Two", ".storyb"),
+                                      ("Book Three", ".storydb")]):
+        project = service.create_project(title)
+        project.file_path = os.path.join(str(service.projects_dir), f"book{i}{ext}")
+        service.update_project_content(" ".join(["word"] * (100 * (i + 1))))
+        service.add_character(Character(name="Aragorn"))
+        service.add_character(Character(name="Frodo"))
+        service.add_location(Location(name="Bree"))
+        project.scenes = [Scene(title="Inn", content="At the inn.")]
+        assert service.save_project()
+        paths[title] = os.path.abspath(project.file_path)
+    return paths
+
+
+def test_summaries_without_loading():
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ProjectService(tmp)
+        paths = make_projects(service)
+        workspace = Workspace(service)
+
+        summaries = {s.title: s for s in workspace.summaries()}
+        assert set(summaries) == set(paths) and workspace.index.reads == 3
+        for i, title in enumerate(["Book One", "Book Two", "Book Three"]):
+            summary = summaries[title]
+            assert summary.path == paths[title]
+            assert summary.word_count == 100 * (i + 1)
+            assert (summary.character_count, summary.location_count, summary.scene_count) == (2, 1, 1)
+
+        # Unchanged files are not read again, in this session or the next
+        workspace.summaries()
+        assert workspace.index.reads == 0
+        workspace.close()
+        workspace = Workspace(service)
+        assert workspace.summaries() == sorted(summaries.values(), key=lambda s: s.updated_at, reverse=True)
+        assert workspace.index.reads == 0
+
+        service.open_project(paths["Book One"])
+        service.update_project_content("Just four words here")
+        assert service.save_project()
+        os.remove(paths["Book Two"])
+        assert {s.title: s.word_count for s in workspace.summaries()} == {"Book One": 4, "Book Three": 300}
+        assert workspace.index.reads == 1
+        workspace.close()
+
+        # An unreadable index is rebuilt
+        with open(os.path.join(tmp, INDEX_FILENAME), 'wb') as f:
+            f.write(b"not a database" * 100)
+        workspace = Workspace(service)
+        assert len(workspace.summaries()) == 2 and workspace.index.reads == 2
+        workspace = Workspace(service)
+        assert len(workspace.summaries()) == 2 and workspace.index.reads == 0
+
+        # Files written before the header carried counts are scanned instead
+        data = service._serialize_project(service.current_project)
+        del data['summary']
+        old = os.path.join(tmp, "old.story")
+        with open(old, 'w') as f:
+            json.dump(data, f)
+        summary = read_project_summary(old)
+        assert (summary.title, summary.word_count, summary.character_count) == ("Book One", 4, 2)
+
+
+def test_switching_uses_cache_and_preloading():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_projects(ProjectService(tmp))
+        service = ProjectService(tmp)
+        workspace = Workspace(service)
+
+        reads = []
+        original = service._read_project
+        service._read_project = lambda path, **kw: reads.append(os.path.abspath(path)) or original(path, **kw)
+
+        one = workspace.open(paths["Book One"])
+        two = workspace.open(paths["Book Two"])
+        assert service.current_project is two and reads == [paths["Book One"], paths["Book Two"]]
+
+        # Switching back is a cache hit and keeps unsaved edits
+        two.title = "Book Two, revised"
+        assert workspace.open(paths["Book One"]) is one
+        assert workspace.open(paths["Book Two"]) is two and two.title == "Book Two, revised"
+        assert len(reads) == 2
+
+        # Preloading reads on a background thread; opening then costs nothing
+        for future in workspace.preload():
+            future.result()
+        assert reads[-1] == paths["Book Three"]
+        three = workspace.open(paths["Book Three"])
+        assert three.title == "Book Three" and len(reads) == 3
+        assert workspace.open(paths["Book Three"]) is three
+        workspace.close()
+
+
+def test_cache_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_projects(ProjectService(tmp))
+        service = ProjectService(tmp)
+        workspace = Workspace(service, cache_budget=1)
+
+        one = workspace.open(paths["Book One"])
+        one.title = "Unsaved"
+        workspace.open(paths["Book Two"])
+        workspace.open(paths["Book Three"])
+        # Book Two is over budget; Book One has unsaved changes and stays
+        assert workspace.cached_paths() == [paths["Book One"]]
+        assert workspace.open(paths["Book One"]) is one
+
+
+if __name__ == "__main__":
+    print("Running workspace tests...")
+    test_summaries_without_loading()
+    test_switching_uses_cache_and_preloading()
+    test_cache_evicts_least_recently_used()
+    print("✓ Workspace tests passed")
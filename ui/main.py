@@ -3,20 +3,76 @@ StoryPro - Tkinter UI Main Application
 A simple, powerful writing app for authors - NO DEPENDENCIES!
 """
 
+import dataclasses
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+from tkinter import ttk, scrolledtext, messagebox, filedialog
 import sys
 import os
+import queue
 
 # Add parent directories to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../storyloom_core'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from storyloom.services.project_service import ProjectService
+from storyloom.services.analysis_scheduler import AnalysisScheduler
+from storyloom.services.metadata_index import PROJECT_EXTENSIONS
+from storyloom.services.workspace import Workspace
+from storyloom.storage.rope import Rope, content_rope
 from storyloom.models.character import Character
 from storyloom.models.location import Location
+from ui.virtual_list import TkListboxView, VirtualList
 
 # Global project service instance
 project_service = ProjectService()
+# Projects opened before stay cached so switching back is instant
+workspace = Workspace(project_service)
+
+
+class EditTrackingText(scrolledtext.ScrolledText):
+    """ScrolledText that reports every insert, delete and replace to ``on_edit``
+    
+    The Tk widget command is renamed and replaced by a proxy, so typing,
+    pasting and the program's own calls all pass through it. ``on_edit``
+    gets the (start, end) Tk indexes of the replaced range, as they were
+    before the edit, and the inserted text - or (None, None, None) when the
+    range cannot be told. Set ``tracking`` False to change the text without
+    reporting it.
+    """
+    
+    def __init__(self, master=None, on_edit=None, **kw):
+        super().__init__(master, **kw)
+        self.on_edit = on_edit
+        self.tracking = True
+        self._widget = self._w + "_widget"
+        self.tk.call("rename", self._w, self._widget)
+        self.tk.createcommand(self._w, self._dispatch)
+    
+    def _dispatch(self, operation, *args):
+        call = self.tk.call
+        if not self.tracking or operation not in ("insert", "delete", "replace") or not args:
+            return call((self._widget, operation) + args)
+        if operation == "insert":
+            start = end = str(call(self._widget, "index", args[0]))
+            text = "".join(args[1::2])
+        elif (operation == "delete" and len(args) > 2) or (operation == "replace" and len(args) < 3):
+            # Several ranges at once (or an error Tk reports itself)
+            start = end = text = None
+        else:
+            start = str(call(self._widget, "index", args[0]))
+            end = str(call(self._widget, "index", args[1] if len(args) > 1 else args[0] + "+1c"))
+            text = "".join(args[2::2]) if operation == "replace" else ""
+            # Tk never deletes the final newline: a range up to "end" that
+            # starts at a line start takes the newline before it instead
+            if self.compare(start, "<", end) and end == str(call(self._widget, "index", "end")) \
+                    and start.endswith(".0") and start != "1.0":
+                start = str(call(self._widget, "index", start + "-1c"))
+                if operation == "replace":
+                    start = end = text = None
+        result = call((self._widget, operation) + args)
+        if self.on_edit:
+            self.on_edit(start, end, text)
+        return result
 
 
 class StoryProApp:
@@ -47,6 +103,21 @@ class StoryProApp:
         self.setup_editor_tab()
         self.setup_characters_tab()
         self.setup_world_tab()
+        
+        # Stats and character detection run on a background worker; results
+        # come back through a queue drained on the Tk event loop
+        self.analysis_results = queue.Queue()
+        self.analysis = AnalysisScheduler(project_service.analyze_text, self.analysis_results.put)
+        self.analysis.start()
+        self.root.after(50, self.process_analysis_results)
+        
+        # Read the most recently updated projects in the background
+        workspace.preload()
+        
+        # Edits are journaled next to the project file as they happen and
+        # replayed when a project is reopened after a crash
+        project_service.enable_autosave()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
     
     def setup_editor_tab(self):
         """Setup editor tab"""
@@ -56,6 +127,8 @@ class StoryProApp:
         
         ttk.Button(toolbar, text="Save", command=self.save_project).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Open", command=self.open_project).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Undo", command=self.undo).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Redo", command=self.redo).pack(side=tk.LEFT, padx=2)
         self.status_label = ttk.Label(toolbar, text="Ready", foreground="green")
         self.status_label.pack(side=tk.LEFT, padx=10)
         
@@ -70,19 +143,20 @@ class StoryProApp:
         editor_frame = ttk.Frame(self.editor_tab)
         editor_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        self.text_editor = scrolledtext.ScrolledText(editor_frame, font=("Arial", 10), height=15)
+        self.text_editor = EditTrackingText(editor_frame, on_edit=self.on_text_edit, font=("Arial", 10), height=15)
         self.text_editor.pack(fill=tk.BOTH, expand=True)
-        self.text_editor.bind("<<Change>>", self.on_text_change)
-        self.text_editor.bind("<KeyRelease>", self.on_text_change)
+        # The project's history replaces the Text widget's own undo
+        for sequence, handler in (("<Control-z>", self.undo), ("<Control-y>", self.redo),
+                                  ("<Control-Z>", self.redo)):
+            self.root.bind_all(sequence, lambda e, handler=handler: handler() or "break")
         
         # Character chips
         chips_frame = ttk.LabelFrame(self.editor_tab, text="Detected Characters")
         chips_frame.pack(fill=tk.X, padx=5, pady=5)
         
-        self.chips_var = tk.StringVar()
-        self.character_chips = tk.Listbox(chips_frame, listvariable=self.chips_var, height=3, 
-                                         font=("Arial", 9))
+        self.character_chips = tk.Listbox(chips_frame, height=3, font=("Arial", 9))
         self.character_chips.pack(fill=tk.BOTH, expand=True)
+        self.chip_rows = VirtualList(TkListboxView(self.character_chips), window=None)
         self.character_chips.bind("<<ListboxSelect>>", self.on_chip_select)
         
         # Stats
@@ -109,6 +183,7 @@ class StoryProApp:
         
         self.char_listbox = tk.Listbox(left_frame, font=("Arial", 10), width=25, height=20)
         self.char_listbox.pack(fill=tk.BOTH, expand=True)
+        self.char_rows = VirtualList(TkListboxView(self.char_listbox), window=None)
         self.char_listbox.bind("<<ListboxSelect>>", self.on_char_select)
         
         # Right: Character details
@@ -156,6 +231,7 @@ class StoryProApp:
         
         self.locations_listbox = tk.Listbox(locations_frame, font=("Arial", 10))
         self.locations_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.location_rows = VirtualList(TkListboxView(self.locations_listbox), window=None)
         self.refresh_locations_list()
         
         # Relationships tab
@@ -165,31 +241,105 @@ class StoryProApp:
         ttk.Label(rel_frame, text="Character & Location Relationships", font=("Arial", 11, "bold")).pack(padx=5, pady=5)
         ttk.Label(rel_frame, text=f"Total Characters: {len(project_service.get_characters())}").pack(anchor=tk.W, padx=5)
         ttk.Label(rel_frame, text=f"Total Locations: {len(project_service.get_locations())}").pack(anchor=tk.W, padx=5)
+        ttk.Button(rel_frame, text="Detect Relationships", command=self.refresh_relationships_list).pack(padx=5, pady=5)
+        
+        self.relationships_listbox = tk.Listbox(rel_frame, font=("Arial", 10))
+        self.relationships_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Story Graph tab
         graph_frame = ttk.Frame(world_notebook)
         world_notebook.add(graph_frame, text="Story Graph")
         ttk.Label(graph_frame, text="Story Graph Visualization", font=("Arial", 11, "bold")).pack(padx=5, pady=5)
         ttk.Label(graph_frame, text="Your story structure will be visualized here").pack(anchor=tk.W, padx=5)
+        self.scenes_label = ttk.Label(graph_frame, text="Detected Scenes: 0")
+        self.scenes_label.pack(anchor=tk.W, padx=5)
+        ttk.Button(graph_frame, text="Detect Scenes", command=self.refresh_scenes_list).pack(padx=5, pady=5)
+        
+        self.scenes_listbox = tk.Listbox(graph_frame, font=("Arial", 10))
+        self.scenes_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.scene_rows = VirtualList(TkListboxView(self.scenes_listbox), window=None)
     
     # Event handlers
-    def on_text_change(self, event=None):
-        """Handle text change"""
-        text = self.text_editor.get("1.0", tk.END)
-        
-        # Update stats
-        word_count = len(text.split())
-        char_count = len(text)
-        self.stats_label.config(text=f"Words: {word_count} | Characters: {char_count}")
-        
-        # Detect characters
-        project_service.update_project_content(text)
-        new_chars = project_service.detect_characters_in_text(text)
-        
-        if new_chars:
-            for char in new_chars:
-                project_service.add_character(char)
+    def on_close(self):
+        """Shut down cleanly, so the autosave journal is not replayed next time"""
+        self.analysis.stop()
+        workspace.close()
+        project_service.close()
+        self.root.destroy()
+    
+    def on_text_edit(self, start, end, text):
+        """Apply one edit of the Text widget to the content, without reading the whole text"""
+        project = project_service.current_project
+        if start is None:
+            # end-1c leaves out the newline the Text widget always keeps at the end
+            project_service.update_project_content(self.text_editor.get("1.0", "end-1c"))
+        else:
+            rope = content_rope(project)
+            project_service.update_project_content(edits=[(self.text_offset(rope, start),
+                                                           self.text_offset(rope, end), text)])
+        self.update_stats()
+        
+        # Detection is debounced onto the analysis worker, which joins the snapshot
+        self.analysis.submit(content_rope(project))
+    
+    @staticmethod
+    def text_offset(rope: Rope, index: str) -> int:
+        """Content offset of a Tk "line.column" index (the widget holds exactly the content)"""
+        line, column = map(int, index.split("."))
+        if line > rope.line_count:
+            return len(rope)
+        return min(rope.offset(line - 1, column), len(rope))
+    
+    def set_editor_text(self, content: str):
+        """Show content in the editor without reporting it as an edit"""
+        self.text_editor.tracking = False
+        try:
+            self.text_editor.delete("1.0", tk.END)
+            self.text_editor.insert("1.0", content)
+        finally:
+            self.text_editor.tracking = True
+    
+    def update_stats(self):
+        """Show the live counts of the story content and the words written today"""
+        counts = project_service.text_statistics()
+        self.stats_label.config(
+            text=f"Words: {counts.words} | Characters: {counts.characters} | Sentences: {counts.sentences}"
+                 f" | Paragraphs: {counts.paragraphs} | {counts.reading_minutes:.0f} min read"
+                 f" | Today: {project_service.session.written:+}")
+    
+    def undo(self):
+        """Undo the last text, character or location edit"""
+        if project_service.undo():
+            self.show_project_state()
+    
+    def redo(self):
+        """Redo the last undone edit"""
+        if project_service.redo():
+            self.show_project_state()
+    
+    def show_project_state(self):
+        """Bring the editor and lists in line with the project after undo or redo"""
+        content = project_service.current_project.content
+        self.set_editor_text(content)
+        self.refresh_character_list()
+        self.refresh_locations_list()
+        self.update_stats()
+        self.analysis.submit(content)
+    
+    def process_analysis_results(self):
+        """Apply finished background analyses on the Tk thread"""
+        refresh = False
+        try:
+            while True:
+                result = self.analysis_results.get_nowait()
+                for char in result.new_characters:
+                    refresh = project_service.add_character(char) or refresh
+        except queue.Empty:
+            pass
+        
+        if refresh:
             self.refresh_character_list()
+        self.root.after(50, self.process_analysis_results)
     
     def on_chip_select(self, event=None):
         """Handle character chip select"""
@@ -225,25 +375,45 @@ class StoryProApp:
         self.current_char = char
     
     def refresh_character_list(self):
-        """Refresh character list"""
-        self.char_listbox.delete(0, tk.END)
+        """Refresh character list (only changed rows are touched)"""
         characters = project_service.get_characters()
-        for char in characters:
-            display = f"{char.name} ({char.role})" if char.role else char.name
-            self.char_listbox.insert(tk.END, display)
+        self.char_rows.update(
+            (char.id, f"{char.name} ({char.role})" if char.role else char.name) for char in characters
+        )
         
         # Update chips
-        chip_names = [c.name for c in characters]
-        self.chips_var.set(" ".join(chip_names))
+        self.chip_rows.update((char.id, char.name) for char in characters)
     
     def refresh_locations_list(self):
-        """Refresh locations list"""
-        self.locations_listbox.delete(0, tk.END)
-        locations = project_service.get_locations()
-        for loc in locations:
-            display = f"{loc.name} ({loc.type})" if loc.type else loc.name
-            self.locations_listbox.insert(tk.END, display)
-    
+        """Refresh locations list (only changed rows are touched)"""
+        self.location_rows.update(
+            (loc.id, f"{loc.name} ({loc.type})" if loc.type else loc.name)
+            for loc in project_service.get_locations()
+        )
+
+    def refresh_relationships_list(self):
+        """Rebuild co-occurrence relationships and list them"""
+        self.relationships_listbox.delete(0, tk.END)
+        name = project_service.get_entity_name
+        for rel in project_service.build_relationships():
+            self.relationships_listbox.insert(tk.END, f"{name(rel.source_id)} - {name(rel.target_id)}: {rel.description}")
+
+    def refresh_scenes_list(self):
+        """List the scenes found in the story (only scenes edited since last time are re-analysed)"""
+        scenes = project_service.detect_scenes()
+        self.scenes_label.config(text=f"Detected Scenes: {len(scenes)}")
+        name = project_service.get_entity_name
+        rows = []
+        for detected in scenes:
+            scene = detected.scene
+            row = f"{scene.title or f'Scene {scene.order_index + 1}'} - {detected.word_count} words"
+            if scene.character_ids:
+                row += " - " + ", ".join(name(i) for i in scene.character_ids[:5])
+            if scene.location_id:
+                row += f" @ {name(scene.location_id)}"
+            rows.append((scene.id, row))
+        self.scene_rows.update(rows)
+
     def add_character(self):
         """Add new character"""
         char = Character(name="New Character")
@@ -261,10 +431,14 @@ class StoryProApp:
     def save_character(self):
         """Save character changes"""
         if hasattr(self, 'current_char'):
-            self.current_char.name = self.char_name_var.get()
-            self.current_char.role = self.char_role_var.get()
-            self.current_char.description = self.char_desc_text.get("1.0", tk.END)
-            self.current_char.goals = [g.strip() for g in self.char_goals_text.get("1.0", tk.END).split(",") if g.strip()]
+            # Saved as a new object, so the history keeps the one it replaces as the previous state
+            self.current_char = dataclasses.replace(
+                self.current_char,
+                name=self.char_name_var.get(),
+                role=self.char_role_var.get(),
+                description=self.char_desc_text.get("1.0", tk.END),
+                goals=[g.strip() for g in self.char_goals_text.get("1.0", tk.END).split(",") if g.strip()],
+            )
             
             project_service.update_character(self.current_char)
             self.refresh_character_list()
@@ -303,7 +477,6 @@ class StoryProApp:
     def save_project(self):
         """Save project"""
         project_service.current_project.title = self.title_var.get()
-        project_service.update_project_content(self.text_editor.get("1.0", tk.END))
         
         if project_service.save_project():
             self.status_label.config(text="✓ Project saved", foreground="green")
@@ -314,7 +487,30 @@ class StoryProApp:
     
     def open_project(self):
         """Open project"""
-        messagebox.showinfo("Info", "Open functionality coming soon!")
+        path = filedialog.askopenfilename(
+            title="Open Project",
+            initialdir=str(project_service.projects_dir),
+            filetypes=[("StoryPro projects", " ".join(f"*{ext}" for ext in PROJECT_EXTENSIONS)),
+                       ("All files", "*.*")],
+        )
+        if not path:
+            return
+        
+        project = workspace.open(path)
+        if project is None:
+            self.status_label.config(text="✗ Open failed", foreground="red")
+            messagebox.showerror("Error", "Failed to open project")
+            return
+        
+        self.title_var.set(project.title)
+        self.set_editor_text(project.content)
+        self.refresh_character_list()
+        self.refresh_locations_list()
+        self.analysis.submit(project.content)
+        if project.dirty:
+            self.status_label.config(text=f"✓ Opened {project.title} (unsaved changes)", foreground="orange")
+        else:
+            self.status_label.config(text=f"✓ Opened {project.title}", foreground="green")
 
 
 def main():
@@ -2,6 +2,7 @@
 Characters Page - Character management and details
 """
 
+import dataclasses
 import flet as ft
 import sys
 import os
@@ -11,6 +12,11 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../storyloom_core
 
 from storyloom.services.project_service import ProjectService
 from storyloom.models.character import Character
+from ui.virtual_list import VirtualList
+from ui.pages.virtual_rows import FletRows
+
+# Height of a character row including the gap below it
+ROW_HEIGHT = 65
 
 
 class CharactersPage:
@@ -21,8 +27,13 @@ class CharactersPage:
         self.selected_character = None
         self.character_list = ft.ListView(
             expand=True,
-            spacing=5,
+            spacing=0,
+            on_scroll_interval=50,
         )
+        # Only the rows in view exist as controls; changes are applied as diffs
+        view = FletRows(self.character_list, self._create_character_item, ROW_HEIGHT)
+        self.character_rows = VirtualList(view)
+        view.attach(self.character_rows)
         self.details_column = ft.Column(
             [
                 ft.Text("Select a character to view details", color=ft.colors.GREY_700),
@@ -74,27 +85,27 @@ class CharactersPage:
     
     def _refresh_character_list(self):
         """Refresh the character list from project"""
-        self.character_list.controls.clear()
-        characters = self.project_service.get_characters()
-        
-        for char in characters:
-            item = self._create_character_item(char)
-            self.character_list.controls.append(item)
+        self.character_rows.update(
+            (char.id, (char.name, char.role)) for char in self.project_service.get_characters()
+        )
     
-    def _create_character_item(self, character: Character) -> ft.Container:
+    def _create_character_item(self, character_id: str, row) -> ft.Container:
         """Create a character list item"""
+        name, role = row
         return ft.Container(
             content=ft.Column(
                 [
-                    ft.Text(character.name, weight=ft.FontWeight.BOLD),
-                    ft.Text(character.role or "No role assigned", size=12, color=ft.colors.GREY_700),
+                    ft.Text(name, weight=ft.FontWeight.BOLD),
+                    ft.Text(role or "No role assigned", size=12, color=ft.colors.GREY_700),
                 ],
                 spacing=2,
             ),
+            height=ROW_HEIGHT - 5,
+            margin=ft.margin.only(bottom=5),
             padding=10,
             border_radius=5,
             bgcolor=ft.colors.GREY_100,
-            on_click=lambda e, char=character: self._select_character(char),
+            on_click=lambda e, cid=character_id: self._select_character(self.project_service.get_character(cid)),
         )
     
     def _select_character(self, character: Character):
@@ -121,12 +132,16 @@ class CharactersPage:
         
         def save_changes(e):
             """Save character changes"""
-            character.name = name_field.value
-            character.role = role_field.value
-            character.description = description_field.value
-            character.goals = [g.strip() for g in goals_field.value.split(",") if g.strip()]
-            
-            self.project_service.update_character(character)
+            # Saved as a new object, so the history keeps the one it replaces as the previous state
+            edited = dataclasses.replace(
+                self.project_service.get_character(character.id) or character,
+                name=name_field.value,
+                role=role_field.value,
+                description=description_field.value,
+                goals=[g.strip() for g in goals_field.value.split(",") if g.strip()],
+            )
+            self.selected_character = edited
+            self.project_service.update_character(edited)
             self._refresh_character_list()
             
             # Show confirmation
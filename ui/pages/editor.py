@@ -3,6 +3,7 @@ Editor Page - Main writing interface with auto character detection
 """
 
 import flet as ft
+import queue
 import re
 from typing import Set
 import sys
@@ -12,7 +13,10 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../storyloom_core'))
 
 from storyloom.services.project_service import ProjectService
+from storyloom.services.analysis_scheduler import AnalysisScheduler, TextAnalysis
 from storyloom.models.character import Character
+from ui.virtual_list import VirtualList
+from ui.pages.virtual_rows import FletChips
 
 
 class EditorPage:
@@ -31,6 +35,8 @@ class EditorPage:
             wrap=True,
             spacing=10,
         )
+        # The first chips are shown, the rest summarized as "+N more"
+        self.chip_rows = VirtualList(FletChips(self.character_chips, self._create_chip))
         self.word_count = ft.Text("Words: 0 | Characters: 0", size=12, color=ft.colors.GREY_700)
         self.title_field = ft.TextField(
             label="Project Title",
@@ -39,6 +45,15 @@ class EditorPage:
         )
         self.status_text = ft.Text("Ready", size=11, color=ft.colors.GREY_700)
         
+        # Stats and character detection run on a background worker; results
+        # are posted back to the page's event loop through a queue
+        self.analysis_results = queue.Queue()
+        self.analysis = AnalysisScheduler(self.project_service.analyze_text, self._post_analysis)
+        self.analysis.start()
+        
+        # Edits are journaled next to the project file and replayed after a crash
+        self.project_service.enable_autosave()
+        
         # Bind text change event
         self.text_editor.on_change = self._on_text_change
     
@@ -46,20 +61,45 @@ class EditorPage:
         """Handle text changes and auto-detect characters"""
         text = self.text_editor.value
         
-        # Update project content
+        # Update project content; its counts follow each edit
         self.project_service.update_project_content(text)
+        self._update_stats()
+        if self.word_count.page:
+            self.word_count.update()
         
-        # Update word and character count
-        word_count = len(text.split())
-        char_count = len(text)
-        self.word_count.value = f"Words: {word_count} | Characters: {char_count}"
-        
-        # Auto-detect character names
-        new_characters = self.project_service.detect_characters_in_text(text)
-        
-        if new_characters:
+        # Detection is debounced onto the analysis worker
+        self.analysis.submit(text)
+    
+    def _update_stats(self):
+        """Show the live counts of the story content and the words written today"""
+        counts = self.project_service.text_statistics()
+        self.word_count.value = (
+            f"Words: {counts.words} | Characters: {counts.characters} | Sentences: {counts.sentences}"
+            f" | Paragraphs: {counts.paragraphs} | {counts.reading_minutes:.0f} min read"
+            f" | Today: {self.project_service.session.written:+}"
+        )
+    
+    def _post_analysis(self, result: TextAnalysis):
+        """Hand a finished analysis from the worker thread to the page's event loop"""
+        self.analysis_results.put(result)
+        page = self.word_count.page
+        if page:
+            page.run_task(self._process_analysis_results)
+    
+    async def _process_analysis_results(self):
+        """Apply queued background analyses on the page's event loop"""
+        while True:
+            try:
+                result = self.analysis_results.get_nowait()
+            except queue.Empty:
+                break
+            self._on_analysis(result)
+    
+    def _on_analysis(self, result: TextAnalysis):
+        """Apply a finished background analysis (on the page's event loop)"""
+        if result.new_characters:
             # Add new characters to project
-            for char in new_characters:
+            for char in result.new_characters:
                 self.project_service.add_character(char)
             
             # Update display
@@ -84,15 +124,15 @@ class EditorPage:
     
     def _update_character_chips(self):
         """Update the character chips display"""
-        self.character_chips.controls.clear()
-        for char_name in sorted(self.detected_characters):
-            chip = ft.Chip(
-                label=ft.Text(char_name),
-                on_click=lambda e, name=char_name: self._on_character_click(name),
-            )
-            self.character_chips.controls.append(chip)
+        self.chip_rows.update((name, name) for name in sorted(self.detected_characters))
         self.character_chips.page.update() if self.character_chips.page else None
     
+    def _create_chip(self, char_name: str, label: str) -> ft.Chip:
+        return ft.Chip(
+            label=ft.Text(label),
+            on_click=lambda e, name=char_name: self._on_character_click(name),
+        )
+    
     def _on_character_click(self, character_name: str):
         """Handle character chip click"""
         print(f"Clicked character: {character_name}")
@@ -120,10 +160,12 @@ class EditorPage:
                             ft.IconButton(
                                 ft.icons.UNDO,
                                 tooltip="Undo",
+                                on_click=self._undo,
                             ),
                             ft.IconButton(
                                 ft.icons.REDO,
                                 tooltip="Redo",
+                                on_click=self._redo,
                             ),
                             ft.Divider(),
                             ft.IconButton(
@@ -177,6 +219,27 @@ class EditorPage:
             expand=True,
         )
     
+    def _undo(self, e):
+        """Undo the last text or character edit"""
+        if self.project_service.undo():
+            self._show_project_state()
+    
+    def _redo(self, e):
+        """Redo the last undone edit"""
+        if self.project_service.redo():
+            self._show_project_state()
+    
+    def _show_project_state(self):
+        """Bring the editor in line with the project after undo or redo"""
+        text = self.project_service.current_project.content
+        self.text_editor.value = text
+        self._update_stats()
+        self.analysis.submit(text)
+        self.detected_characters = {c.name for c in self.project_service.get_characters()}
+        self._update_character_chips()
+        if self.text_editor.page:
+            self.text_editor.page.update()
+    
     def _save_project(self, e):
         """Save project"""
         self.title_field.value = self.project_service.current_project.title
@@ -0,0 +1,71 @@
+"""
+Flet views for VirtualList - only the rows in the window exist as controls
+"""
+
+import flet as ft
+from typing import Any, Callable, Hashable
+
+from ui.virtual_list import VirtualList
+
+
+class FletRows:
+    """VirtualList view over a ListView or Column of fixed-height rows
+
+    Spacer containers above and below the materialized rows stand in for
+    the hidden ones, so the scrollbar covers the whole list. Scrolling moves
+    the window (``on_scroll`` is wired by ``attach``).
+    """
+
+    def __init__(self, container, make_row: Callable[[Hashable, Any], ft.Control], row_height: float):
+        self.container = container
+        self.make_row = make_row
+        self.row_height = row_height
+        self.top = ft.Container(height=0)
+        self.bottom = ft.Container(height=0)
+        container.controls[:] = [self.top, self.bottom]
+
+    def attach(self, rows: VirtualList, overscan: int = 10) -> None:
+        """Move the window of ``rows`` as the container scrolls"""
+        def on_scroll(e: ft.OnScrollEvent):
+            first = max(int(e.pixels // self.row_height) - overscan, 0)
+            if first != rows.first:
+                rows.scroll_to(first)
+                self.container.update()
+
+        self.container.on_scroll = on_scroll
+
+    def insert_row(self, index: int, key: Hashable, value: Any) -> None:
+        self.container.controls.insert(index + 1, self.make_row(key, value))
+
+    def remove_row(self, index: int) -> None:
+        del self.container.controls[index + 1]
+
+    def change_row(self, index: int, key: Hashable, value: Any) -> None:
+        self.container.controls[index + 1] = self.make_row(key, value)
+
+    def set_hidden(self, before: int, after: int) -> None:
+        self.top.height = before * self.row_height
+        self.bottom.height = after * self.row_height
+
+
+class FletChips:
+    """VirtualList view over a wrapping Row of chips, with a "+N more" label for the rest"""
+
+    def __init__(self, row: ft.Row, make_chip: Callable[[Hashable, Any], ft.Control]):
+        self.row = row
+        self.make_chip = make_chip
+        self.more = ft.Text("", size=12, color=ft.colors.GREY_700, visible=False)
+        row.controls[:] = [self.more]
+
+    def insert_row(self, index: int, key: Hashable, value: Any) -> None:
+        self.row.controls.insert(index, self.make_chip(key, value))
+
+    def remove_row(self, index: int) -> None:
+        del self.row.controls[index]
+
+    def change_row(self, index: int, key: Hashable, value: Any) -> None:
+        self.row.controls[index] = self.make_chip(key, value)
+
+    def set_hidden(self, before: int, after: int) -> None:
+        self.more.value = f"+{after} more"
+        self.more.visible = after > 0
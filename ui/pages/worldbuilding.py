@@ -2,6 +2,7 @@
 World Building Page - Story graph and world elements visualization
 """
 
+import dataclasses
 import flet as ft
 import sys
 import os
@@ -11,6 +12,11 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../storyloom_core
 
 from storyloom.services.project_service import ProjectService
 from storyloom.models.location import Location
+from ui.virtual_list import VirtualList
+from ui.pages.virtual_rows import FletRows
+
+# Height of a location row (the card and its margin)
+CARD_HEIGHT = 140
 
 
 class WorldbuildingPage:
@@ -18,8 +24,16 @@ class WorldbuildingPage:
     
     def __init__(self, project_service: ProjectService):
         self.project_service = project_service
-        self.locations_list = ft.Column(expand=True)
+        self.locations_list = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True, spacing=0,
+                                        on_scroll_interval=50)
+        # Only the cards in view exist as controls; changes are applied as diffs
+        view = FletRows(self.locations_list, self._create_location_row, CARD_HEIGHT)
+        self.location_rows = VirtualList(view, window=30)
+        view.attach(self.location_rows)
         self.selected_location = None
+        self.relationships_list = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True)
+        self.scenes_count = ft.Text("Detected Scenes: 0")
+        self.scenes_list = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True)
     
     def build(self) -> ft.Container:
         """Build the world building page UI"""
@@ -67,12 +81,16 @@ class WorldbuildingPage:
     
     def _refresh_locations_list(self):
         """Refresh the locations list"""
-        self.locations_list.controls.clear()
-        locations = self.project_service.get_locations()
-        
-        for loc in locations:
-            card = self._create_location_card(loc)
-            self.locations_list.controls.append(card)
+        self.location_rows.update(
+            (loc.id, (loc.name, loc.type, loc.description)) for loc in self.project_service.get_locations()
+        )
+    
+    def _create_location_row(self, location_id: str, row) -> ft.Container:
+        """A fixed-height list row holding a location card"""
+        return ft.Container(
+            content=self._create_location_card(self.project_service.get_location(location_id)),
+            height=CARD_HEIGHT,
+        )
     
     def _build_locations_tab(self) -> ft.Container:
         """Build locations tab"""
@@ -91,26 +109,62 @@ class WorldbuildingPage:
                     ft.Divider(),
                     ft.Text(f"Total Characters: {len(self.project_service.get_characters())}"),
                     ft.Text(f"Total Locations: {len(self.project_service.get_locations())}"),
+                    ft.ElevatedButton("Detect Relationships", on_click=self._detect_relationships),
+                    self.relationships_list,
                 ],
                 spacing=10,
             ),
         )
     
+    def _detect_relationships(self, e):
+        """Rebuild co-occurrence relationships and list them"""
+        self.relationships_list.controls.clear()
+        name = self.project_service.get_entity_name
+        for rel in self.project_service.build_relationships():
+            self.relationships_list.controls.append(
+                ft.Text(f"{name(rel.source_id)} - {name(rel.target_id)}: {rel.description}", size=12)
+            )
+        self.relationships_list.update()
+    
     def _build_story_graph_tab(self) -> ft.Container:
         """Build story graph tab"""
+        self._refresh_scenes()
         return ft.Container(
             content=ft.Column(
                 [
                     ft.Text("Story Graph Visualization", color=ft.colors.GREY_700),
                     ft.Text("Your story structure will be visualized here", size=12),
                     ft.Divider(),
-                    ft.Text(f"Detected Scenes: 0"),
+                    self.scenes_count,
                     ft.Text(f"Character Appearances: {len(self.project_service.get_characters())}"),
+                    ft.ElevatedButton("Detect Scenes", on_click=self._detect_scenes),
+                    self.scenes_list,
                 ],
                 spacing=10,
             ),
         )
     
+    def _detect_scenes(self, e):
+        """Detect scenes again after the story changed"""
+        self._refresh_scenes()
+        self.scenes_count.update()
+        self.scenes_list.update()
+    
+    def _refresh_scenes(self):
+        """List the story's scenes with their words, characters and location (only edited scenes are re-analysed)"""
+        scenes = self.project_service.detect_scenes()
+        self.scenes_count.value = f"Detected Scenes: {len(scenes)}"
+        self.scenes_list.controls.clear()
+        name = self.project_service.get_entity_name
+        for detected in scenes:
+            scene = detected.scene
+            cast = ", ".join(name(i) for i in scene.character_ids[:5])
+            place = f" @ {name(scene.location_id)}" if scene.location_id else ""
+            self.scenes_list.controls.append(
+                ft.Text(f"{scene.title or f'Scene {scene.order_index + 1}'} - {detected.word_count} words"
+                        f"{' - ' + cast if cast else ''}{place}", size=12)
+            )
+    
     def _create_location_card(self, location: Location) -> ft.Card:
         """Create a location card"""
         def edit_location(e):
@@ -125,13 +179,14 @@ class WorldbuildingPage:
             )
             
             def save_changes(e):
-                location.name = name_field.value
-                location.type = type_field.value
-                location.description = desc_field.value
+                # Saved as a new object, so the history keeps the one it replaces as the previous state
+                current = self.project_service.get_location(location.id) or location
+                self.project_service.update_location(dataclasses.replace(
+                    current, name=name_field.value, type=type_field.value, description=desc_field.value))
                 self._refresh_locations_list()
                 
             def delete_loc(e):
-                self.project_service.current_project.locations.remove(location)
+                self.project_service.remove_location(location.id)
                 self._refresh_locations_list()
             
             dialog = ft.AlertDialog(
@@ -181,7 +236,8 @@ class WorldbuildingPage:
                                 ),
                             ],
                         ),
-                        ft.Text(location.description, size=12),
+                        ft.Text(location.description, size=12, max_lines=2,
+                                overflow=ft.TextOverflow.ELLIPSIS),
                     ],
                     spacing=10,
                 ),
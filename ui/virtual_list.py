@@ -0,0 +1,139 @@
+"""
+Virtualized list model shared by the Tk and Flet UIs
+
+A ``VirtualList`` holds every row of a list as a (key, value) pair but only
+materializes the rows inside its window as widgets. ``update`` takes the
+full new list of rows and applies just the differences (insert, remove,
+change) to the window, so a list of 10k characters costs a handful of
+widget operations per change instead of a rebuild.
+
+Widgets are created and destroyed through a view object with four methods:
+
+    insert_row(index, key, value)   create the widget at window position index
+    remove_row(index)               destroy the widget at window position index
+    change_row(index, key, value)   refresh the widget at window position index
+    set_hidden(before, after)       rows outside the window (for spacers)
+"""
+
+from difflib import SequenceMatcher
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+# Beyond this many differing keys in the middle of a list, replace the
+# span instead of computing a minimal diff
+MAX_DIFF_ROWS = 1000
+
+
+class TkListboxView:
+    """VirtualList view over a ``tk.Listbox`` whose rows are strings
+
+    A Listbox only draws the visible lines of its strings, so Tk lists use a
+    window covering every row and get the benefit from the diffs.
+    """
+
+    def __init__(self, listbox, label=str):
+        self.listbox = listbox
+        self.label = label
+
+    def insert_row(self, index: int, key: Hashable, value: Any) -> None:
+        self.listbox.insert(index, self.label(value))
+
+    def remove_row(self, index: int) -> None:
+        self.listbox.delete(index)
+
+    def change_row(self, index: int, key: Hashable, value: Any) -> None:
+        self.listbox.delete(index)
+        self.listbox.insert(index, self.label(value))
+
+    def set_hidden(self, before: int, after: int) -> None:
+        pass
+
+
+class VirtualList:
+    """Rows of a list view of which only a window is materialized"""
+
+    def __init__(self, view, window: Optional[int] = 50):
+        self.view = view
+        self.window = window                 # rows materialized; None for all of them
+        self.first = 0                       # index of the first materialized row
+        self.keys: List[Hashable] = []
+        self.values: Dict[Hashable, Any] = {}
+        self._shown: List[Hashable] = []     # keys of the materialized rows, in order
+        self._hidden = (0, 0)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def key_at(self, index: int) -> Hashable:
+        """Key of the row at index (in the whole list)"""
+        return self.keys[index]
+
+    def index_of(self, key: Hashable) -> int:
+        return self.keys.index(key)
+
+    def update(self, rows: Iterable[Tuple[Hashable, Any]]) -> None:
+        """Replace the rows with ``rows`` (key, value) pairs, applying only the differences"""
+        old_values = self.values
+        self.values = dict(rows)
+        self.keys = list(self.values)
+        changed = {key for key in self._shown if key in self.values and self.values[key] != old_values[key]}
+        self._show(changed)
+
+    def scroll_to(self, first: int) -> None:
+        """Move the window so that it starts at row ``first``"""
+        self.first = first
+        self._show(())
+
+    # Internals
+
+    def _show(self, changed) -> None:
+        keys = self.keys
+        if self.window is None:
+            self.first, shown = 0, keys
+        else:
+            self.first = max(min(self.first, len(keys) - self.window), 0)
+            shown = keys[self.first:self.first + self.window]
+
+        view = self.view
+        old = self._shown
+        offset = 0
+        for tag, i1, i2, j1, j2 in _diff(old, shown):
+            if tag == 'equal':
+                for j in range(j1, j2):
+                    if shown[j] in changed:
+                        view.change_row(j, shown[j], self.values[shown[j]])
+                continue
+            for _ in range(i1, i2):
+                view.remove_row(i1 + offset)
+            for j in range(j1, j2):
+                view.insert_row(j, shown[j], self.values[shown[j]])
+            offset += (j2 - j1) - (i2 - i1)
+        self._shown = list(shown)
+
+        hidden = (self.first, len(keys) - self.first - len(shown))
+        if hidden != self._hidden:
+            self._hidden = hidden
+            view.set_hidden(*hidden)
+
+
+def _diff(old: Sequence[Hashable], new: Sequence[Hashable]) -> List[Tuple[str, int, int, int, int]]:
+    """SequenceMatcher-style opcodes turning old into new, cheap for edits in one place"""
+    n = min(len(old), len(new))
+    head = 0
+    while head < n and old[head] == new[head]:
+        head += 1
+    tail = 0
+    while tail < n - head and old[len(old) - 1 - tail] == new[len(new) - 1 - tail]:
+        tail += 1
+
+    middle_old, middle_new = old[head:len(old) - tail], new[head:len(new) - tail]
+    ops = [('equal', 0, head, 0, head)] if head else []
+    if len(middle_old) + len(middle_new) > MAX_DIFF_ROWS or not (middle_old and middle_new):
+        if middle_old or middle_new:
+            ops.append(('replace', head, len(old) - tail, head, len(new) - tail))
+    else:
+        matcher = SequenceMatcher(None, middle_old, middle_new, autojunk=False)
+        ops.extend((tag, i1 + head, i2 + head, j1 + head, j2 + head)
+                   for tag, i1, i2, j1, j2 in matcher.get_opcodes())
+    if tail:
+        ops.append(('equal', len(old) - tail, len(old), len(new) - tail, len(new)))
+    return ops